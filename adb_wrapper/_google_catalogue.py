@@ -0,0 +1,129 @@
+# generated from google.json by `python -m adb_wrapper.catalogue`, do not edit
+PACKAGES = (
+    ('com.google.android.apps.accessibility.auditor', 'Accessibility Scanner', 'Tools', 'https://play-lh.googleusercontent.com/HstUa1VemLGLop_1ad8aAviAqEBPynQVqaZAff_0ZiKiAfmPw0DlB7_PWz8X90Kd38w=s180'),
+    ('com.google.android.apps.accessibility.maui.actionblocks', 'Action Blocks', 'Tools', 'https://play-lh.googleusercontent.com/40O3WWGTkjs1JIZS4O1XlACjFED7oB2x1KLRb8YROg9DvpVyRBnEu8SKc2iCW9haIQ=s180'),
+    ('com.google.android.marvin.talkback', 'Android Accessibility Suite', 'Tools', 'https://play-lh.googleusercontent.com/xBFTJQCPqUh0i97AwiPo-tPBndyn9GWwAqeoxPgKEPLdFcCaRsqcBpr6SC4uYgJ6Ew=s180'),
+    ('com.google.android.projection.gearhead', 'Android Auto', 'Auto & Vehicles', 'https://play-lh.googleusercontent.com/drnkC46hMwqPTdRLLLufhKgy_dRhA7uNTN14-tq2NxtI3deDakYOAR_4zeHcqbGg4Q=s180'),
+    ('com.google.android.projection.gearhead.phonescreen', 'Android Auto for phone screens', 'Auto & Vehicles', 'https://play-lh.googleusercontent.com/Zi0RZFKtIFVuDy-BaXkkoU6g_4c_jpYxo4oIrlJQcGeircu0cMowGXBa7NajTydJhw=s180'),
+    ('com.google.android.apps.work.clouddpc', 'Android Device Policy', 'Tools', 'https://play-lh.googleusercontent.com/yv2FTUK7eKV9ZEvdIiMjmruq42wu2cgCgkygTeqkZGn_Y50MEaqlTx3tlYmTvVuo9mY=s180'),
+    ('com.google.android.webview', 'Android System WebView', 'Tools', 'https://play-lh.googleusercontent.com/sMzCSERY-5_8VZ2z9v0kvzM3ZA21uRHMrVGSYMPP499ecagswyzFYUMbfU02wwDnL1k=s180'),
+    ('com.google.android.webview.beta', 'Android System WebView Beta', 'Tools', 'https://play-lh.googleusercontent.com/fRsSM8h8e9hRvPR2IO-Ht-K5D_9ufnnMDeV4wl691zMiALFoNTS6NBqA2JQqydclkNr-=s180'),
+    ('com.google.android.webview.canary', 'Android System WebView Canary', 'Tools', 'https://play-lh.googleusercontent.com/S-wMzJLgCULrqVJPwIzO5QFNGL-2RUqg1d40mj4ObbioHqj3BruFZOWT_3DC6Bp65Q=s180'),
+    ('com.google.android.webview.dev', 'Android System WebView Dev', 'Tools', 'https://play-lh.googleusercontent.com/NfIH6s4kxDVbL7RZSmd168hz-gDhelWpa0qZT-XVXXhLOMdfas2-itIDTdRl_1jEeQ=s180'),
+    ('com.google.android.tvrecommendations', 'Android TV Core Services', 'Tools', 'https://play-lh.googleusercontent.com/k9mlAHQs7g6-nTwUOfWxiV59dDrM1pH5EDkO4R_fhDQZ49O6bS_4ZzoKl1WVrV5Ukbc=s180'),
+    ('com.google.android.tvlauncher', 'Android TV Home', 'Tools', 'https://play-lh.googleusercontent.com/kkSqoj3bYpZHnCkY46t3pMswgSwWB2t6CDjYEXVHrSW19qL95DLE1Zy5KKrWmwPMz0o=s180'),
+    ('com.google.android.leanbacklauncher', 'Android TV Launcher', 'Tools', 'https://play-lh.googleusercontent.com/awItARXnEpTdEoCP7o3aDtMkzRSC5MeLjFHYt5LiUnvtdG0c94f7_2qDeSVEeB_syA=s180'),
+    ('com.google.ar.unity.ddelements', 'ARCore Elements', 'Tools', 'https://play-lh.googleusercontent.com/gbcQLTXdDNlPY1J0davvLFka_T_EJoPYcpTnqMRTSS7ehvmHUcBwF1h_09zQ3ptElLQ=s180'),
+    ('com.google.android.backdrop', 'Backdrop Daydream', 'Tools', 'https://play-lh.googleusercontent.com/5vDnNvm80Wc8OjhaTTMH8P-fdiXGpDqfTIlMUBGwkql3YRvPxH3Xz8uDEISvDTyUFw=s180'),
+    ('com.google.android.apps.blogger', 'Blogger', 'Social', 'https://play-lh.googleusercontent.com/cWG9-bk2_zLdKsN9vsYEdbCReVfzgXU6FeHUmLI8a24FoZ05TpOLYXInCQ278FTwCw=s180'),
+    ('com.google.android.calculator', 'Calculator', 'Tools', 'https://play-lh.googleusercontent.com/POgn4x_Jrz18VxrjbZC88ijwZJwmOjs2flX1KC0Kz7IF1oncFoKOMsWfFKntJjc20BRJ=s180'),
+    ('com.google.samples.apps.cardboarddemo', 'Cardboard', 'Libraries & Demo', 'https://play-lh.googleusercontent.com/OF-_SP5tzFPxK7NBoX7Y-Wsz32Woy_JliL4kZSTdkNz-PyAiHV1znVwjkQgn5vGahA=s180'),
+    ('com.google.vr.cardboard.apps.designlab', 'Cardboard Design Lab', 'Libraries & Demo', 'https://play-lh.googleusercontent.com/vQsijbqA_s23-qu0vd-4Rlw7MHQAF0Gbrtve3VtHT4ztFmkDGXHM2eb1GRC3z0WY-hY=s180'),
+    ('com.google.android.ims', 'Carrier Services', 'Communication', 'https://play-lh.googleusercontent.com/979xjmpI6JBOlxNXQrXuyPRuW7jPOg9258hrKZ6HLXJqskTx8thI8c7EZr_rzlKUBLQ=s180'),
+    ('com.chrome.beta', 'Chrome Beta', 'Productivity', 'https://play-lh.googleusercontent.com/XZB1L7nFZVsMyBGbV1qmf139ijkQLdeyQH-Bh5P9D2mU3vY2oEfoP2mwz0hItjxyxZo=s180'),
+    ('com.chrome.canary', 'Chrome Canary (Unstable)', 'Productivity', 'https://play-lh.googleusercontent.com/-Ch-mlIAoDWCeXdJ-bc8aVSKnwg5xto87Y9tk8BO_p39P5Iu_ORQu7dMO19ngOHvdzQ=s180'),
+    ('com.google.chromeremotedesktop', 'Chrome Remote Desktop', 'Tools', 'https://play-lh.googleusercontent.com/I4DRWoABrUQsaAIQFVSKha98q1u2ilEdrwPJBaf9Mb8KdGZnXzs5DObrwcwUZovgOA=s180'),
+    ('com.google.android.apps.mediashell', 'Chromecast built-in', 'Tools', 'https://play-lh.googleusercontent.com/Kd9NIuzYgDvL40q_lMVUH1vSGXwHsD3G8Un2uDw8K3g0jBuXbUkJ1JSLoJIHjSDJqA=s180'),
+    ('com.google.android.deskclock', 'Clock', 'Tools', 'https://play-lh.googleusercontent.com/k-K6mdmZJZrJiuMJCHILReDGjMl_2ljzFIz3QLULfKL1q0tWtTcAkc0RDsjg9QEuXYw=s180'),
+    ('androidx.compose.material.catalog', 'Compose Material Catalog', 'Libraries & Demo', 'https://play-lh.googleusercontent.com/ljrAb3j0jZ4WnOmwvkU_32vdAJ5mjMkXHAXe2NLRIVPKF7zlHkQE8dxQorl2bkeW29Mc=s180'),
+    ('com.google.android.contacts', 'Contacts', 'Communication', 'https://play-lh.googleusercontent.com/D-haUsSx771Pt4brCyFEJUNKZaC8NUsD2bMB-ZL_yE2LnYdmt3YbgfZwDDM9B-wBHw=s180'),
+    ('com.google.android.apps.audition', 'Creative Preview', 'Tools', 'https://play-lh.googleusercontent.com/Pmtk0ExFZOzSA8zaolSlvYxN5D4Eg7MBYzRBsN8j_bqJjNJLPKf8kgH40rQFSKYHM-5S=s180'),
+    ('com.google.android.apps.village.boond', 'Crowdsource', 'Tools', 'https://play-lh.googleusercontent.com/mR_90d6G3yG85wtSqaIm2NhHNTpXQFDdr0kGyU6JPJ0B0emm1LNmBI_rNcQ-khwcuMeE=s180'),
+    ('com.google.android.apps.plus', 'Currents', 'Social', 'https://play-lh.googleusercontent.com/XmiAY8lW8WYSutAr6OsIMeHmXQ2NNyYWEAwycPhCM62qKm8wjQnzloxyaiICsqdEc8Bl=s180'),
+    ('com.google.android.apps.restore', 'Data Restore Tool', 'Tools', 'https://play-lh.googleusercontent.com/7vcafwoxDSOI87n4F9kFCeeS11F9hujbl2EEqXNSH_3uWR6t8ofsQxLMOv05x1WazQ=s180'),
+    ('com.google.android.apps.pixelmigrate', 'Data Transfer Tool', 'Tools', 'https://play-lh.googleusercontent.com/RDTbzYdc5l5wR_s_WkzaGmWed7pwM8sobk1AJCBWkYWWtttLHbv4MtnXMfnaU14_1rM=s180'),
+    ('com.google.android.vr.home', 'Daydream', 'Tools', 'https://play-lh.googleusercontent.com/jmjFyy5UIa5cXSbK2BZunF8VLMsUyM0tHCIkc6qanfYP6WsBgm0pep-6z9U_0PpCudFI=s180'),
+    ('com.google.android.vr.inputmethod', 'Daydream Keyboard', 'Tools', 'https://play-lh.googleusercontent.com/CtuXFD8EWTpuCJUY90bT830uUTbwYctJrQipLE29tsr23Y5U7H6c6ddeFBhBN51UQg=s180'),
+    ('com.google.android.apps.wellbeing', 'Digital Wellbeing', 'Tools', 'https://play-lh.googleusercontent.com/d74zkuWfVBFWjyhWXz9R2d6wh-WCBWoNB4M0x8iIXHvDOvdYbXJA4ivUQBWTkUjKMso=s180'),
+    ('com.google.android.apps.camera.poseidon', 'Dive Case Connector for Pixel', 'Photography', 'https://play-lh.googleusercontent.com/b1DEBARCtfv3gIcv6ZSe4qpPpG_09MFdVYlkZkQQD1r9VOB2-GkEKJFBwmxGKzonKEY=s180'),
+    ('com.google.android.apps.kids.familylinkhelper', 'Family Link child and teen', 'Tools', 'https://play-lh.googleusercontent.com/rwPp_dwYxzs2NldnzEJWWfDljIfoAxlNK-UFth3c_7Vbf5_vA2HK5Df6pbdQ3Qnmnw=s180'),
+    ('com.google.android.apps.nbu.files', 'Files by Google', 'Tools', 'https://play-lh.googleusercontent.com/1nfAdJs2Ep2q1skM7QwJ1uHooWSbpFkbIBHhAX6EmdzEKmtk42713TiTU28mWlkcFKPA=s180'),
+    ('com.google.android.apps.photosgo', 'Gallery Go', 'Photography', 'https://play-lh.googleusercontent.com/ymegw3qgqrrwF0fDDXB51J-ss5ucNCDMJGuBT3hr4AeG2DyfxWAU8iLRJGrcvwRun-Y=s180'),
+    ('com.google.android.inputmethod.latin', 'Gboard - the Google Keyboard', 'Tools', 'https://play-lh.googleusercontent.com/X64En0aW6jkvDnd5kr16u-YuUsoJ1W2cBzJab3CQ5lObLeQ3T61DpB7AwIoZ7uqgCn4=s180'),
+    ('com.google.android.gm', 'Gmail', 'Communication', 'https://play-lh.googleusercontent.com/KSuaRLiI_FlDP8cM4MzJ23ml3og5Hxb9AapaGTMZ2GgR103mvJ3AAnoOFz1yheeQBBI=s180'),
+    ('com.google.android.googlequicksearchbox', 'Google', 'Tools', 'https://play-lh.googleusercontent.com/aFWiT2lTa9CYBpyPjfgfNHd0r5puwKRGj2rHpdPTNrz2N9LXgN_MbLjePd1OTc0E8Rl1=s180'),
+    ('com.google.android.apps.enterprise.cpanel', 'Google Admin', 'Productivity', 'https://play-lh.googleusercontent.com/UcM7d0MiWFxyZmTpluyrw7otkwV5aJ6Q_EYh2Ftl3EMYz64-JS3n0oNkZPsJYIzX7tw=s180'),
+    ('com.google.android.apps.adwords', 'Google Ads', 'Business', 'https://play-lh.googleusercontent.com/gDLgYeTaZUTQXa9hu0f4OgxAJedWvpcz3puIj3rgWwYhUjsruRfmKWheF1Wm-oVvPgDe=s180'),
+    ('com.google.android.apps.aiy', 'Google AIY Projects', 'Education', 'https://play-lh.googleusercontent.com/yK-SsIOXq8RnwDC18ZZMsBNK3LMi4_3Ztj4_9UMR-LaE-_jOfhtS0KGLM491ZKF_kk8=s180'),
+    ('com.google.android.apps.giant', 'Google Analytics', 'Business', 'https://play-lh.googleusercontent.com/Ac7UebUnwu5-zLt4gN1HlW5KgZhquPJbNhQk2chzdrMjoTPxKJQkxBL5FGAJgp3lCw=s180'),
+    ('com.google.android.katniss', 'Google app for Android TV', 'Tools', 'https://play-lh.googleusercontent.com/4cXfm9YG59lys9woio9JM5qR_bOpCrv0dgJ1XmowbzgRpIzDRyNQQ8vB8yXsz3NQJ9Q=s180'),
+    ('com.google.android.apps.enterprise.dmagent', 'Google Apps Device Policy', 'Productivity', 'https://play-lh.googleusercontent.com/d6Js0wL6riInBUWbxdN5rJjuu_6uygfs-06-8RVRRhDDKC9D4Hs8ZAevLsguTngc0Vkq=s180'),
+    ('com.google.android.apps.cultural', 'Google Arts & Culture', 'Education', 'https://play-lh.googleusercontent.com/0yIxsU6mBbX1aXXWw9kmv3xu_rduwb1HO3byPuawf2Uophei8s7Xgxu4FdjOc_Bi488=s180'),
+    ('com.google.android.apps.googleassistant', 'Google Assistant', 'Productivity', 'https://play-lh.googleusercontent.com/ORzWxi-sIo_hCgSa6uzVvBUE4osKUqRVzHnniUUxA2WXD7BnZ95BNVpWFLUTKRyJRdU=s180'),
+    ('com.google.android.apps.authenticator2', 'Google Authenticator', 'Tools', 'https://play-lh.googleusercontent.com/HPc5gptPzRw3wFhJE1ZCnTqlvEvuVFBAsV9etfouOhdRbkp-zNtYTzKUmUVPERSZ_lAL=s180'),
+    ('com.google.android.apps.automotive.inputmethod', 'Google Automotive Keyboard', 'Productivity', 'https://play-lh.googleusercontent.com/Vppndu6o98gxM-GI4NFKC6jR19S05tNoII3ViUoAtiB9nmItG7hcVUtLPm0249GsCef7=s180'),
+    ('com.googlecode.eyesfree.brailleback', 'Google BrailleBack', 'Tools', 'https://play-lh.googleusercontent.com/GjSPJKc8gioL0QTnmKoIftnEMxMb5oHu_dQ8Qa5cOCynQvoNTcEjFBRAzcQj7VOzYZQ=s180'),
+    ('com.google.android.calendar', 'Google Calendar', 'Productivity', 'https://play-lh.googleusercontent.com/Jsbb0EeesKUbDTl3UyDKO6sNz45RCMh7gnoI6giQcQz1f5Mj0J4TRh7Psyu53vShh-qm=s180'),
+    ('com.google.android.GoogleCamera', 'Google Camera', 'Photography', 'https://play-lh.googleusercontent.com/UEhZQtc_3LCwkKIayRjHG63EfC9bsXvJjuWiFMvVRAe_tHyk0pW4ZmCBJQCENxmYlYk=s180'),
+    ('com.google.android.apps.dynamite', 'Google Chat', 'Business', 'https://play-lh.googleusercontent.com/cF_oWC9Io_I9smEBhjhUHkOO6vX5wMbZJgFpGny4MkMMtz25iIJEh2wASdbbEN7jseAx=s180'),
+    ('com.android.chrome', 'Google Chrome: Fast & Secure', 'Communication', 'https://play-lh.googleusercontent.com/KwUBNPbMTk9jDXYS2AeX3illtVRTkrKVh5xR1Mg4WHd0CG2tV4mrh1z3kXi5z_warlk=s180'),
+    ('com.google.android.apps.classroom', 'Google Classroom', 'Education', 'https://play-lh.googleusercontent.com/w0s3au7cWptVf648ChCUP7sW6uzdwGFTSTenE178Tz87K_w1P1sFwI6h1CLZUlC2Ug=s180'),
+    ('com.google.android.apps.cloudconsole', 'Google Cloud Console', 'Tools', 'https://play-lh.googleusercontent.com/RyoQTmHnxsxPYabsETmWVXHtLorVh_yOO48hsdv2VmI-Uki4qt5c5vV1cicJODV56A4=s180'),
+    ('com.google.enterprise.topaz.mobile.android', 'Google Cloud Search', 'Tools', 'https://play-lh.googleusercontent.com/1JBZyY-hO4qKZLOaeE4-1hRUcbsaxXvPbTZydaRRbq4u4F262NYj5fOluiqnUhKRoe5q=s180'),
+    ('com.google.android.apps.docs.editors.docs', 'Google Docs', 'Productivity', 'https://play-lh.googleusercontent.com/emmbClh_hm0WpWZqJ0X59B8Pz1mKoB9HVLkYMktxhGE6_-30SdGoa-BmYW73RJ8MGZQ=s180'),
+    ('com.google.android.apps.docs', 'Google Drive', 'Productivity', 'https://play-lh.googleusercontent.com/t-juVwXA8lDAk8uQ2L6d6K83jpgQoqmK1icB_l9yvhIAQ2QT_1XbRwg5IpY08906qEw=s180'),
+    ('com.google.android.apps.tachyon', 'Google Duo', 'Communication', 'https://play-lh.googleusercontent.com/l9KG7T3GgFZtvfMeJ_aTsaofrGP8JnmQCPGuDrxhvFAfC-IpXhwGfMGeH2AihVqWBlM=s180'),
+    ('com.google.earth', 'Google Earth', 'Travel & Local', 'https://play-lh.googleusercontent.com/9ORDOmn8l9dh-j4Sg3_S7CLcy0RRAI_wWt5jZtJOPztwnEkQ4y7mmGgoSYqbFR5jTc3m=s180'),
+    ('com.google.android.apps.kids.familylink', 'Google Family Link', 'Tools', 'https://play-lh.googleusercontent.com/rFAHXzQjUQwLH6vffa9rD_1gjH7dZykH7h6RjthsnoHTKGrJSNqTUw0D_TIQSC3ekg=s180'),
+    ('com.google.android.apps.adm', 'Google Find My Device', 'Tools', 'https://play-lh.googleusercontent.com/aX0ql6V6PvVotibIvaNW7CRjaJ2oUyBIX_WgSkAl36vOAaoXiw6yQufxVQ2LV_D2DLg=s180'),
+    ('com.google.android.apps.fitness', 'Google Fit: Activity Tracking', 'Health & Fitness', 'https://play-lh.googleusercontent.com/jArSD-kxOa2llPXvqrjRcEJdL4XhjP8-WqEfg9UAlYF8v0qzXAZ0EI5k96l0pf3tDNg=s180'),
+    ('com.google.android.apps.searchlite', 'Google Go: A lighter, faster way to search', 'Tools', 'https://play-lh.googleusercontent.com/RZ5luCUwc5QtJP9xDn-ZCwEutT160GVyoh5K1eu4YJ5fD7v4LP5ptVdgR9mz4Hnr7A=s180'),
+    ('com.google.android.apps.chromecast.app', 'Google Home', 'Lifestyle', 'https://play-lh.googleusercontent.com/vr1isZKzTtlok9P81H6cR98iqpPhkuQHJp19Z5kPej3QlhNTnLohXpqcgMqrQpyegA=s180'),
+    ('com.google.samples.apps.iosched', 'Google I/O 2019', 'Books & Reference', 'https://play-lh.googleusercontent.com/JqxLmzV-ETe1HbrKHw970E16_r4PUMipwoEAXYIPIB3LAv0GF-Ynlx88q8ouRPo1rjc=s180'),
+    ('com.google.android.keep', 'Google Keep - Notes and Lists', 'Productivity', 'https://play-lh.googleusercontent.com/9bJoeaPbGTB8Tz_h4N-p-6ReRd8vSS-frZb2tmJulaGIoTKElKj3zpmcFJvnS96ANZP5=s180'),
+    ('com.google.ar.lens', 'Google Lens', 'Tools', 'https://play-lh.googleusercontent.com/G5oF0mhpOcQzFTrU6TDUL0JoAjzRt38weiZKua7L61WVT1z3dPcE9gUu-W2EwtM9cZU=s180'),
+    ('com.google.android.apps.maps', 'Google Maps', 'Travel & Local', 'https://play-lh.googleusercontent.com/Kf8WTct65hFJxBUDm5E-EpYsiDoLQiGGbnuyP6HBNax43YShXti9THPon1YKB6zPYpA=s180'),
+    ('com.google.android.apps.mapslite', 'Google Maps Go', 'Travel & Local', 'https://play-lh.googleusercontent.com/0uRNRSe4iS6nhvfbBcoScHcBTx1PMmxkCx8rrEsI2UQcQeZ5ByKz8fkhwRqR3vttOg=s180'),
+    ('com.google.android.apps.meetings', 'Google Meet', 'Business', 'https://play-lh.googleusercontent.com/GBYSf20osBl2CRHbjGOyaOG5kQ3G4xbRau-dzScU9ozuXQJtnUZPkR3IqEDOo5OiVgU=s180'),
+    ('com.google.android.apps.vega', 'Google My Business', 'Business', 'https://play-lh.googleusercontent.com/EUQGH40jV55Dm2mcGzT9I2_vSfl_rJv88dfrR3JGJkxgQMe2j4bXoFd-tvuYLSGhFIQ=s180'),
+    ('com.google.android.apps.magazines', 'Google News - Daily Headlines', 'News & Magazines', 'https://play-lh.googleusercontent.com/b3MqZswO8F7j3lcdH01kxzaeHa7vUndy7ma_JwdM_j_Vpj8LKZcKt0HmpORQ7CKF2A=s180'),
+    ('com.google.android.apps.subscriptions.red', 'Google One', 'Productivity', 'https://play-lh.googleusercontent.com/DGAleS46qOedNzJGsB3e29QLpL6Qi6EwIDze95nBvxMAMGEmbE6KOW__2haEkHVDs4Y=s180'),
+    ('com.google.android.apps.paidtasks', 'Google Opinion Rewards', 'Tools', 'https://play-lh.googleusercontent.com/yeB9XKBeHfHChSDwjsFztdBYY-jcdgUpVQwtahFE6AeoKhKHowZMm9wJ4-W8VvML2w=s180'),
+    ('com.google.android.apps.walletnfcrel', 'Google Pay', 'Finance', 'https://play-lh.googleusercontent.com/HNlca01K9XLSJ8EYzY655EOsV8Nw90vFwmhjQzpLbLacQIRP2kDHfcugxL0a3H58BAX0=s180'),
+    ('com.google.android.apps.photos', 'Google Photos', 'Photography', 'https://play-lh.googleusercontent.com/ZyWNGIfzUyoajtFcD7NhMksHEZh37f-MkHVGr5Yfefa-IX7yj9SMfI82Z7a2wpdKCA=s180'),
+    ('com.google.android.apps.wearables.maestro.companion', 'Google Pixel Buds', 'Music & Audio', 'https://play-lh.googleusercontent.com/9jbJdT8i6DgYR35Xq40HMzKFFFtwDnQScUtmShdTTWzvp25R9WWGxPpFlx1JxGmVqg=s180'),
+    ('com.google.android.apps.books', 'Google Play Books & Audiobooks', 'Books & Reference', 'https://play-lh.googleusercontent.com/DglqS-eYHQYXnj8M8tmzh3JcKDXcidSo3IzgyCZzci8ZTV9Pmuk8vvIFh9XHOztC3Q=s180'),
+    ('com.google.android.play.games', 'Google Play Games', 'Entertainment', 'https://play-lh.googleusercontent.com/szHQCpMAb0MikYIhvNG1MlruXFUggd6DJHXkMPG1H4lJPB7Lee_BkODfwxpQazxfO9mA=s180'),
+    ('com.google.android.gms', 'Google Play services', 'Tools', 'https://play-lh.googleusercontent.com/f6ZSUJrtL5uniwWCTp1OeJj8MdoDaSTqi2XFyy9A0yPv6DpBo2giisRKDpXD9qk66KE=s180'),
+    ('com.google.ar.core', 'Google Play Services for AR', 'Tools', 'https://play-lh.googleusercontent.com/ugEBVDcghA1x9fVldH8oz3aEQnMLki0pEc5xfpaZTi9SQGEbQqM-Cbzb60MU4fLM9bIv=s180'),
+    ('com.google.android.apps.podcasts', 'Google Podcasts', 'Music & Audio', 'https://play-lh.googleusercontent.com/BQUYd1Th9Z_XI5wtklPQDHmiNkSOzBakOnpk-Ni8CBTyHb0E7UM5LpyjRW9BWs4fUuVD=s180'),
+    ('com.google.android.apps.docs.editors.sheets', 'Google Sheets', 'Productivity', 'https://play-lh.googleusercontent.com/keE2gN0Hqh8-Tsf_RYZ_-yS2uo6ToqYVyRBv_UZaLXsgeeHBd2YPcEUWEF4DEtfGyb1h=s180'),
+    ('com.google.android.apps.docs.editors.slides', 'Google Slides', 'Productivity', 'https://play-lh.googleusercontent.com/DG-zbXPr8LItYD8F2nD4aR_SK_jpkipLBK77YWY-F0cdJt67VFgCHZtRtjsakzTw3EM=s180'),
+    ('com.google.android.spotlightstories', 'Google Spotlight Stories', 'Entertainment', 'https://play-lh.googleusercontent.com/fRRySCOTp4voXvK2DKfHJ6bWF_VTXMVynnli-HZJNVP3HWFnRfRRCWTxcZDbwa-JRy0=s180'),
+    ('com.google.android.street', 'Google Street View', 'Travel & Local', 'https://play-lh.googleusercontent.com/50-i3khy6z44n6xQsiJKx6WqLWK4zeb6IyXJYW2qZJGBE_2QvWSI5an09m-H7WgMlRqQ=s180'),
+    ('com.google.android.apps.helprtc', 'Google Support Services', 'Tools', 'https://play-lh.googleusercontent.com/RmKOdKf0NzKV2m6jW_wKaOByWBIv7syFxf4Me0UQEsbs63UH9em7pYwFfYEzbveCz-s=s180'),
+    ('com.google.android.apps.tasks', 'Google Tasks', 'Productivity', 'https://play-lh.googleusercontent.com/pjUulZ-Vdo7qPKxk3IRhnk8SORPlgSydSyYEjm7fGcoXO8wDyYisWXwQqEjMryZ_sqK2=s180'),
+    ('com.google.android.apps.translate', 'Google Translate', 'Tools', 'https://play-lh.googleusercontent.com/ZrNeuKthBirZN7rrXPN1JmUbaG8ICy3kZSHt-WgSnREsJzo2txzCzjIoChlevMIQEA=s180'),
+    ('com.google.android.videos', 'Google TV', 'Video Players & Editors', 'https://play-lh.googleusercontent.com/ueI8EVWy8As6GEwg4KG9m2q_NtCTMZMCpsTXktthX0j3sSMVTMbUFqKg3QGON2V_pR4=s180'),
+    ('com.google.vr.vrcore', 'Google VR Services', 'Tools', 'https://play-lh.googleusercontent.com/8OYI7h34ZsWjF06t8h2h4slvdnJfzHm0xBK_yraL2f7J65rL1nRVjwSvJ-R4xbOwnA=s180'),
+    ('com.area120.grasshopper', 'Grasshopper: Learn to Code', 'Education', 'https://play-lh.googleusercontent.com/cw5dsfacor9mV5qSyU3c2UcPHbp2XP_N3OA1-297kN_0K8yZrEMo6qaWraF1m6eRV2Y=s180'),
+    ('com.google.android.apps.jam', 'Jamboard', 'Tools', 'https://play-lh.googleusercontent.com/-LLcx5FJk4ZDPFbDZTHaSoYvaJLQByYoGciA0_LwGMVla2nhOFl7ZPxY8WdcBQht6VE=s180'),
+    ('com.google.android.tv', 'Live Channels', 'Entertainment', 'https://play-lh.googleusercontent.com/eNYOraC9zc8Po9DFe41g1WzF-JSXqigWAM2IUWjeRHaJRb3JQbc34y9IvehplQE2uAAp=s180'),
+    ('com.google.android.apps.accessibility.reveal', 'Lookout - Assisted vision', 'Productivity', 'https://play-lh.googleusercontent.com/3MkDibPEhwEXy6ChCqPdTOQK_pRSABJvNMtolrMFra4I0G5U91K2jU4roMj8Up6vQRDI=s180'),
+    ('com.google.android.apps.messaging', 'Messages', 'Communication', 'https://play-lh.googleusercontent.com/OY4rxeNTPaHwyOTZ-RUooqJvPnO5QUYmQcw0dhD90Mu6UWItOSZfQv7ks_FscbBow0M=s180'),
+    ('com.google.android.apps.navlite', 'Navigation for Google Maps Go', 'Travel & Local', 'https://play-lh.googleusercontent.com/3PSQmZ0QImgp4yLhpezISlGst1qdiXDHGS9V2w86SDXn_hLIiL5x1cYKTjHBeTtn1Lh6=s180'),
+    ('com.google.android.apps.safetyhub', 'Personal Safety', 'Tools', 'https://play-lh.googleusercontent.com/TBVqYK-yC0Voog9fegaEUkoKEULi0c9fUjSI6VIIb2OVPyvMR9paFcPqMAHOuSWumWMu=s180'),
+    ('com.google.android.dialer', 'Phone by Google', 'Tools', 'https://play-lh.googleusercontent.com/7M2PyII8UNkUIkzC92Knz5HRDCo-Rce_lr6T6ROz5c8SlY92ISKjsjbdWaC05ZiKV0k=s180'),
+    ('com.google.android.apps.photos.scanner', 'PhotoScan by Google Photos', 'Photography', 'https://play-lh.googleusercontent.com/J57mz_RTCqTNiqbntn7WpnhHeLD7eGc4twaFFhz1XLcSqlKErjwfyioCWWgi2hIRXbA=s180'),
+    ('com.google.intelligence.sense', 'Pixel Ambient Services', 'Tools', 'https://play-lh.googleusercontent.com/jI4AKfnY2KgWLLHNgRMAGOjnuQ5WZupStylzIxz5wAmxwlJS2sE4SF-wxkB9hRjXWMrZ=s180'),
+    ('com.google.android.apps.seekh', 'Read Along by Google', 'Education', 'https://play-lh.googleusercontent.com/51WYc0ZPB34cGDB8MCkDc0ymv6iBf0r-kSZV_H5pXVDHvdVCA12TWUWQtS54zg-RodI=s180'),
+    ('com.google.android.apps.recorder', 'Recorder', 'Tools', 'https://play-lh.googleusercontent.com/OfRwK6rMr4i7gu1AKeNbK-qnYPuL6EVQ5j6AYYQc0ge-I-NPYoBUsweVPuJLSOtHYag=s180'),
+    ('com.google.android.apps.security.securityhub', 'Security Hub', 'Tools', 'https://play-lh.googleusercontent.com/q1pnafzDxfvAOhzJYj4PqYJB9PuVK9L8kisgTrb85IdzDRIK65eUDS5LlQz2f5oBUg=s180'),
+    ('com.niksoftware.snapseed', 'Snapseed', 'Photography', 'https://play-lh.googleusercontent.com/Rilq4obCk7XIl2Pjb8XT-Ydh_aI3hBNeFwro9fFXrIAuC-zPxCZ4feE4rx5fZ3jHNLw=s180'),
+    ('com.google.socratic', 'Socratic by Google', 'Education', 'https://play-lh.googleusercontent.com/vCFjyJz8fmJTR0wCJik4p2ZwM-UUkdXmBQadKDxQQWcLWNn6zHjTXUknm9HahBVBq_AJ=s180'),
+    ('com.google.android.accessibility.soundamplifier', 'Sound Amplifier', 'Communication', 'https://play-lh.googleusercontent.com/FeOjzBn9WBZIH8WN2hugWPcZd1bY-IA4qTZI5qwtoAMa5D-XF5kHE8a6nD2DgXonlLQ=s180'),
+    ('com.google.android.tts', 'Speech Services by Google', 'Tools', 'https://play-lh.googleusercontent.com/NqWvryDAnkEWLTq36xlrdx0CJ9rzxc3jfYJmIcrlxuJ_0X0QAG7Ojch8mX8_vFRauIvH=s180'),
+    ('com.google.toontastic', 'Toontastic 3D', 'Educational', 'https://play-lh.googleusercontent.com/R-dJcIvmUhdrwD7tlR4rQ-k8fWYzfXINb2cleVYH3b0y70qcvHCl55UvuhlA_Jc4CGI=s180'),
+    ('com.google.android.tungsten.setupwraith', 'TV Setup', 'Tools', 'https://play-lh.googleusercontent.com/yArQ1Rwc1gcRibO2ahajebs2VTIQ9AmdWZMHMjArnSZYSCd9RwHkuGWDDUK3OvGzmQ=s180'),
+    ('com.google.android.apps.accessibility.voiceaccess', 'Voice Access', 'Tools', 'https://play-lh.googleusercontent.com/xPDUEN1qZAW3w-G4c-8cQ3EctBMHfx4ec2pC4j5vVUaxwvYGP5DAIU20sSinzKmHW9iq=s180'),
+    ('com.google.android.apps.actionsservice', 'Voice Action Services', 'Tools', 'https://play-lh.googleusercontent.com/cRppaKNiHQqMwCK_C-UMrhUnroFCk55OgXYDLptJ2_kNYFU-csJOHFZKAvmnFPJsDw=s180'),
+    ('com.google.android.apps.wallpaper', 'Wallpapers', 'Personalization', 'https://play-lh.googleusercontent.com/2aJfB6trLglywvIh6MSN58qh-r2b-_2GoXk4dWL5fIZmMAWdTN3f98Ugpi6U_glIm0w=s180'),
+    ('com.google.android.wearable.app', 'Wear OS by Google Smartwatch', 'Communication', 'https://play-lh.googleusercontent.com/WmoV-m8b6x16sDRfzebu5b2vstcyBHRrpzCj6ODoh6hGuMa9Gg39EvnOk7z3qMa0_WM=s180'),
+    ('com.google.android.youtube', 'YouTube', 'Video Players & Editors', 'https://play-lh.googleusercontent.com/lMoItBgdPPVDJsNOVtP26EKHePkwBg-PkuY9NOrc-fumRtTFP4XhpUNk_22syN4Datc=s180'),
+    ('com.google.android.youtube.tv', 'YouTube for Android TV', 'Entertainment', 'https://play-lh.googleusercontent.com/Qolm5gr9jnabjk-0z79srjYC1XPVExribNz5kbDmGJeEtmRlo0UQoQEIkKMHRyt5paw=s180'),
+    ('com.google.android.apps.youtube.kids', 'YouTube Kids', 'Entertainment', 'https://play-lh.googleusercontent.com/S4wylkvt2jz16hnG9IG0pAZosbB82nWWy8P-rQkb54uH-SCVd5L2j7z7x1Vz5pZvIRc=s180'),
+    ('com.google.android.apps.youtube.music', 'YouTube Music', 'Music & Audio', 'https://play-lh.googleusercontent.com/GnYnNfKBr2nysHBYgYRCQtcv_RRNN0Sosn47F5ArKJu89DMR3_jHRAazoIVsPUoaMg=s180'),
+    ('com.google.android.apps.youtube.music', 'YouTube Music', 'Music & Audio', 'https://play-lh.googleusercontent.com/GnYnNfKBr2nysHBYgYRCQtcv_RRNN0Sosn47F5ArKJu89DMR3_jHRAazoIVsPUoaMg=s180'),
+    ('com.google.android.apps.youtube.music.pwa', 'YouTube Music for Chromebook', 'Music & Audio', 'https://play-lh.googleusercontent.com/NRYG47CkEiVmMA2Ojlk0_X4HRtQ1ybv7bTbS1O1_ZvjSfjpP0dXtaDMecBX6eXtFrxA=s180'),
+    ('com.google.android.apps.youtube.creator', 'YouTube Studio', 'Video Players & Editors', 'https://play-lh.googleusercontent.com/SM1nwJaePNm9Q6vVgU0CvvmR1uozbZYU8ohKfBCIndZy0sSGtwmObhpBcUkTOqcyYg=s180'),
+)
@@ -1,13 +1,86 @@
 from enum import Enum
-from itertools import zip_longest
 from pathlib import Path
 import re
 import subprocess
+import tarfile
 import shlex
 import os
-from typing import List, Union
+import posixpath
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Tuple,
+    Union,
+)
 from .utils import *
-from functools import wraps
+from .transport import AdbServerTransport, quote_call_args, split_command_args
+from .session import ShellSession
+from .batch import MAX_SCRIPT_LENGTH, CommandBatch
+from .registry import DeviceRegistry, parse_device_list
+from .scheduler import (
+    CallOptions,
+    CancellationToken,
+    CommandScheduler,
+    check_call,
+    command_priority,
+    communicate,
+    remaining,
+    usb_bus,
+    validate_priority,
+)
+from .properties import BOOT_ID_PATH, PropertyCache, parse_properties
+from .catalogue import load_catalogue_entries
+from .settings import (
+    SettingsReport,
+    build_settings_script,
+    diff_settings,
+    parse_settings_script_output,
+    setting_name,
+)
+from .apk import ApkError, read_apk_info
+from .compression import compression_flags
+from .install import (
+    InstallResult,
+    build_install_command,
+    is_install_success,
+    is_local_apk,
+)
+from .sync import (
+    MANIFEST_NAME,
+    MISSING_DIRECTORY_EXIT_CODE,
+    FileEntry,
+    SyncManifest,
+    SyncReport,
+    build_manifest_script,
+    is_same_file,
+    parse_manifest_output,
+    scan_local_directory,
+)
+from .tarstream import extract_stream, iter_local_files, write_stream
+from .walker import RemoteEntry, TreeIndex, build_walk_script, iter_entries
+from .transfer import (
+    TransferBatch,
+    TransferEngine,
+    TransferResult,
+    parse_transfer_output,
+)
+from .uninstall import (
+    UNINSTALL_BATCH_SIZE,
+    UninstallReport,
+    build_uninstall_script,
+    parse_uninstall_script_output,
+)
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+from functools import cached_property, wraps
 from importlib import resources
 import json
 import urllib.request
@@ -15,79 +88,313 @@ import urllib.request
 command_checked: bool = False
 
 
-def _command_decorator(base_cmd, command, logging=True, log_cmd=False, root=False):
-    def decorator(func):
-        @wraps(func)
-        def wrapper(cls, *args, **kwargs):
-            if not isinstance(command, str):
-                raise TypeError("command is not of type string.")
+class CommandSpec(NamedTuple):
+    base_cmd: str
+    command: str
+    logging: bool
+    log_cmd: bool
+    root: bool
+    func: Callable
+    stream: Union[bool, str] = False
 
-            global command_checked
-            command_checked, sdk_path = is_valid_command(base_cmd, command_checked)
 
-            command_args = [base_cmd]
+# logged output is cut to this many bytes, see CommandResult.log_text
+MAX_LOG_BYTES = 16 * 1024
+_WHITESPACE = b" \t\n\r\x0b\x0c"
 
-            if isinstance(cls, Device):
-                device_id = getattr(cls, "id")
-                command_args.extend(["-s", device_id])
 
-            # checks if root
-            if root:
-                command_args.extend(["shell", "su", "-c", command])
-            else:
-                command_args.extend(shlex.split(command))
+def _strip_bounds(data: bytes) -> Tuple[int, int]:
+    """The (start, end) of data without surrounding whitespace, without copying."""
+    start, end = 0, len(data)
+    while start < end and data[start] in _WHITESPACE:
+        start += 1
+    while end > start and data[end - 1] in _WHITESPACE:
+        end -= 1
+    return start, end
 
-            if args:
-                args = [str(arg) for arg in args if arg is not None]
-                command_args.extend(args)
 
-            process = subprocess.Popen(
-                command_args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
-            )
-            output = (
-                process.communicate(timeout=None)[0]
-                .strip()
-                .decode(errors="backslashreplace")
-            )
+@dataclass(frozen=True)
+class CommandResult:
+    """
+    The outcome of a single command. Every call creates its own result, so
+    results are never shared between threads.
+
+    Only the raw output is kept, text is decoded on first access. Binary output,
+    e.g. of exec-out, can be read from stdout or view without ever decoding it.
+    """
+
+    argv: Tuple[str, ...]
+    stdout: bytes  # stdout and stderr, merged
+    exit_code: int
+    duration: float  # seconds
+
+    @property
+    def ok(self) -> bool:
+        return self.exit_code == 0
+
+    @property
+    def view(self) -> memoryview:
+        """stdout without surrounding whitespace, as a zero-copy view."""
+        start, end = _strip_bounds(self.stdout)
+        return memoryview(self.stdout)[start:end]
+
+    @cached_property
+    def text(self) -> str:
+        """stdout decoded and stripped."""
+        return str(self.view, "utf-8", "backslashreplace")
+
+    def log_text(self, limit: int = None) -> str:
+        """text for logging, cut after limit (MAX_LOG_BYTES by default) bytes."""
+        limit = MAX_LOG_BYTES if limit is None else limit
+        view = self.view
+        if len(view) <= limit:
+            return self.text
+
+        text = str(view[:limit], "utf-8", "backslashreplace")
+        return f"{text}\n... ({len(view) - limit} more bytes)"
+
+    def __repr__(self) -> str:
+        return (
+            f"CommandResult({' '.join(self.argv)}: exit {self.exit_code}, "
+            f"{len(self.stdout)} bytes, {self.duration:.3f}s)"
+        )
+
+
+def _build_command_args(cls, spec: CommandSpec, args: tuple):
+    """Returns the full command args and the stringified call args."""
+    if not isinstance(spec.command, str):
+        raise TypeError("command is not of type string.")
+
+    command_args = [spec.base_cmd]
+
+    if isinstance(cls, Device):
+        device_id = getattr(cls, "id")
+        command_args.extend(["-s", device_id])
+
+    # checks if root
+    if spec.root:
+        command_args.extend(["shell", "su", "-c", spec.command])
+    else:
+        command_args.extend(shlex.split(spec.command))
+
+    if args:
+        args = [str(arg) for arg in args if arg is not None]
+        command_args.extend(quote_call_args(command_args, args))
+
+    return command_args, args
+
+
+def _check_return_code(return_code: int, output: str, command_args: List[str]):
+    if return_code != 0:
+        if "permission denied" in output.lower():
+            raise PermissionError("Permission issue occurred during execution.")
+        elif "unknown" in output.lower():
+            raise FileNotFoundError(f"Command not found: {command_args}")
+        elif "error" in output.lower():
+            raise RuntimeError(f"Critical error: {output}")
+
+
+# the output of a thread is the text of its last result
+_RESULT_TEXT = object()
+
 
-            if process.returncode != 0:
-                if "permission denied" in output.lower():
-                    raise PermissionError("Permission issue occurred during execution.")
-                elif "unknown" in output.lower():
-                    raise FileNotFoundError(f"Command not found: {command_args}")
-                elif "error" in output.lower():
-                    raise RuntimeError(f"Critical error: {output}")
+def _handle_output(
+    cls,
+    spec: CommandSpec,
+    command_args: List[str],
+    return_code: int,
+    output: bytes,
+    duration: float = 0.0,
+) -> CommandResult:
+    result = CommandResult(tuple(command_args), output, return_code, duration)
 
-            setattr(cls, "return_code", process.returncode)
-            setattr(cls, "output", output)
+    if return_code != 0:
+        _check_return_code(return_code, result.text, command_args)
 
-            if logging:
-                print(output)
+    # output decodes the result's text once it is read
+    cls.result = result
+    cls.return_code = return_code
+    cls.output = _RESULT_TEXT
 
-            if log_cmd:
-                print(command_args)
+    if spec.logging:
+        print(result.log_text())
+
+    if spec.log_cmd:
+        print(command_args)
+
+    return result
+
+
+def _stream_output(cls, spec: CommandSpec, command_args: List[str], chunks):
+    """
+    Yields decoded output lines, or raw byte chunks if spec.stream is "chunks",
+    of the chunks iterator of a running command. The return code is checked once
+    the output is exhausted, and the command is stopped if the iterator is
+    closed early.
+    """
+    if spec.log_cmd:
+        print(command_args)
+
+    tail = deque(maxlen=16)  # kept for error messages
+    pending = b""
+
+    try:
+        while True:
+            try:
+                chunk = next(chunks)
+            except StopIteration as stop:
+                return_code = stop.value
+                break
+
+            if spec.stream == "chunks":
+                tail.append(chunk[-1024:])
+                yield chunk
+                continue
+
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+
+            for line in lines:
+                line = line.rstrip(b"\r").decode(errors="backslashreplace")
+                tail.append(line)
+                if spec.logging:
+                    print(line)
+                yield line
+
+        if pending:
+            line = pending.rstrip(b"\r").decode(errors="backslashreplace")
+            tail.append(line)
+            if spec.logging:
+                print(line)
+            yield line
+    finally:
+        chunks.close()
+
+    if spec.stream == "chunks":
+        output = b"".join(tail).decode(errors="backslashreplace")
+    else:
+        output = "\n".join(tail)
+
+    _check_return_code(return_code, output, command_args)
+    cls.return_code = return_code
+
+
+def _queue_command(
+    cls,
+    batch: CommandBatch,
+    spec: CommandSpec,
+    command_args: List[str],
+    call_args: List[str],
+    kwargs: dict,
+):
+    """
+    Queues an adb shell command in batch and returns its BatchCall. Other
+    commands aren't queued, the batch is run first to keep commands in order.
+    """
+    serial, args = split_command_args(command_args)
+
+    if command_args[0] != "adb" or args[:1] != ["shell"] or len(args) < 2:
+        cls._flush_batch(batch)
+        return None
+
+    def finish(return_code: int, output: str, duration: float):
+        _handle_output(cls, spec, command_args, return_code, output.encode(), duration)
+        return spec.func(cls, *call_args, **kwargs)
+
+    # the command line adb would send, with the call args quoted alike
+    return batch.add(" ".join(args[1:]), finish)
+
+
+def _command_decorator(
+    base_cmd, command, logging=True, log_cmd=False, root=False, stream=False
+):
+    def decorator(func):
+        spec = CommandSpec(base_cmd, command, logging, log_cmd, root, func, stream)
+
+        @wraps(func)
+        def wrapper(cls, *args, **kwargs):
+            command_args, args = _build_command_args(cls, spec, args)
+
+            batch: CommandBatch = getattr(cls._thread_state, "batch", None)
+            if batch is not None and not spec.stream:
+                queued = _queue_command(cls, batch, spec, command_args, args, kwargs)
+                if queued is not None:
+                    return queued
+
+            if spec.stream:
+                cls.return_code = None
+                # the chunks iterator takes the call options of the caller now
+                chunks = cls._stream_command_args(command_args)
+                cls.output = _stream_output(cls, spec, command_args, chunks)
+                return func(cls, *args, **kwargs)
+
+            start = time.perf_counter()
+            return_code, output = cls._run_command_args(command_args)
+            duration = time.perf_counter() - start
+            _handle_output(cls, spec, command_args, return_code, output, duration)
 
             return func(cls, *args, **kwargs)
 
+        # shared with the async api, so both run the same command definitions
+        wrapper.command_spec = spec
         return wrapper
 
     return decorator
 
 
-def command(command: str, logging: bool = True, base_cmd="adb", log_cmd: bool = False):
+def command(
+    command: str,
+    logging: bool = True,
+    base_cmd="adb",
+    log_cmd: bool = False,
+    stream: Union[bool, str] = False,
+):
+    """
+    If stream is True, self.output is an iterator of output lines instead of a
+    string. If stream is "chunks", it yields raw byte chunks instead.
+    """
     return _command_decorator(
-        base_cmd, command, logging=logging, log_cmd=log_cmd, root=False
+        base_cmd, command, logging=logging, log_cmd=log_cmd, root=False, stream=stream
     )
 
 
 def root_command(
-    command: str, logging: bool = True, base_cmd="adb", log_cmd: bool = False
+    command: str,
+    logging: bool = True,
+    base_cmd="adb",
+    log_cmd: bool = False,
+    stream: Union[bool, str] = False,
 ):
     return _command_decorator(
-        base_cmd, command, logging=logging, log_cmd=log_cmd, root=True
+        base_cmd, command, logging=logging, log_cmd=log_cmd, root=True, stream=stream
     )
 
 
+def unbatched(func):
+    """
+    For methods that read the results of their own commands. Inside a batch,
+    the queued commands are run first, and the method's commands run directly
+    instead of being queued.
+    """
+
+    @wraps(func)
+    def wrapper(cls, *args, **kwargs):
+        state = cls._thread_state
+        batch: CommandBatch = getattr(state, "batch", None)
+
+        if batch is None:
+            return func(cls, *args, **kwargs)
+
+        state.batch = None
+        try:
+            batch.flush()
+            return func(cls, *args, **kwargs)
+        finally:
+            state.batch = batch
+
+    return wrapper
+
+
 class PackageType(str, Enum):
     THIRD_PARTY = "-3"
     SYSTEM = "-s"
@@ -116,12 +423,22 @@ class VolumeType(Enum):
 
 
 class Package:
-    img_src = None
-    package_name = None
-    package_path = None
-    name = None
-    genre = None
-    package_type = PackageType.GOOGLE
+    """
+    An immutable package, compared and hashed by package name, so packages can be
+    deduplicated and excluded with sets.
+    """
+
+    __slots__ = (
+        "package_name",
+        "package_path",
+        "package_type",
+        "img_src",
+        "name",
+        "genre",
+        "version_code",
+        "uid",
+        "installer",
+    )
 
     def __init__(
         self,
@@ -131,13 +448,37 @@ class Package:
         img_src: str = None,
         name: str = None,
         genre: str = None,
+        version_code: int = None,
+        uid: str = None,
+        installer: str = None,
     ):
-        self.package_name = package_name
-        self.package_path = package_path
-        self.img_src = img_src
-        self.name = name
-        self.genre = genre
-        self.package_type = package_type
+        set_attr = super().__setattr__
+        set_attr("package_name", package_name)
+        set_attr("package_path", package_path)
+        set_attr("package_type", package_type)
+        set_attr("img_src", img_src)
+        set_attr("name", name)
+        set_attr("genre", genre)
+        set_attr("version_code", version_code)
+        set_attr("uid", uid)
+        set_attr("installer", installer)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Package attributes can't be modified, use replace().")
+
+    def __delattr__(self, key):
+        raise AttributeError("Package attributes can't be deleted.")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Package):
+            return NotImplemented
+        return self.package_name == other.package_name
+
+    def __hash__(self) -> int:
+        return hash(self.package_name)
+
+    def __reduce__(self):
+        return (Package, tuple(getattr(self, attr) for attr in self.__slots__))
 
     def __repr__(self) -> str:
         return f"{self.package_name}"
@@ -145,6 +486,12 @@ class Package:
     def __str__(self) -> str:
         return f"{self.package_name}"
 
+    def replace(self, **changes) -> "Package":
+        """Returns a copy of the package with the given attributes changed."""
+        attrs = {attr: getattr(self, attr) for attr in self.__slots__}
+        attrs.update(changes)
+        return Package(**attrs)
+
     @classmethod
     def filter_packages(cls, packages: list["Package"], **filters):
         def matches(pkg):
@@ -160,52 +507,661 @@ class Package:
         return list(unique)
 
     @staticmethod
-    def parse_packages(packages: str) -> List["Package"]:
-        packages = packages.strip().splitlines()
+    def parse_packages(packages: Union[str, Iterable[str]]) -> List["Package"]:
+        return list(Package.iter_packages(packages))
+
+    @staticmethod
+    def iter_packages(packages: Union[str, Iterable[str]]) -> Iterator["Package"]:
+        """
+        Parses `pm list packages -f` output, either as a string or as an iterator of
+        lines, and yields a Package per line.
+        """
+        if isinstance(packages, str):
+            packages = packages.strip().splitlines()
+
+        for package in packages:
+            package = package.strip()
+            if not package:
+                continue
 
-        for idx, package in enumerate(packages):
             package_path = None
             package_name = None
 
+            # apk paths can contain "=", package names can't
             if package.startswith("package:"):
-                package_path = package.split("package:", 1)[1].split("=", 1)[0].strip()
+                package_path = package.split("package:", 1)[1].rsplit("=", 1)[0].strip()
 
             if "=" in package:
-                package_name = package.split("=", 1)[1].strip()
+                package_name = package.rsplit("=", 1)[1].strip()
 
             name = os.path.basename(package_path)
-            packages[idx] = Package(
+            yield Package(
                 package_name=package_name, package_path=package_path, name=name
             )
 
-        return packages
-
     @staticmethod
     def normalize_packages(
         packages: List[Union[str, "Package"]],
-        excluded_packages: List[Union[str, "Package"]],
+        excluded_packages: List[Union[str, "Package"]] = None,
     ) -> List["Package"]:
-        """Returns safe to delete packages."""
+        """Returns safe to delete packages, without duplicates."""
 
         def to_package(p):
             return p if isinstance(p, Package) else Package(p)
 
-        excluded_packages = [to_package(p) for p in excluded_packages]
+        excluded_packages = {to_package(p) for p in excluded_packages or ()}
+
+        # dict keys keep the first occurrence of each package, in order
+        return list(
+            dict.fromkeys(
+                pkg
+                for pkg in (to_package(p) for p in packages)
+                if pkg not in excluded_packages
+            )
+        )
+
+
+class PackageIndex:
+    """
+    Installed packages of a device, indexed by package name, apk path, installer
+    and package type.
+    """
+
+    indexed_attrs = ("package_name", "package_path", "installer", "package_type")
+
+    _line_pattern = re.compile(
+        r"^package:(?P<path>\S*)=(?P<name>[\w.]+)(?P<info>\s.*)?$"
+    )
+
+    def __init__(self, packages: Iterable[Package] = ()) -> None:
+        self.by_name = {}
+        self.by_path = {}
+        self.by_installer = defaultdict(set)
+        self.by_type = defaultdict(set)
+        self.stale = False
+
+        for package in packages:
+            self.add(package)
+
+    def __len__(self) -> int:
+        return len(self.by_name)
+
+    def __iter__(self):
+        return iter(self.by_name.values())
+
+    def __contains__(self, package_name: str) -> bool:
+        return package_name in self.by_name
+
+    def get(self, package_name: str) -> Package:
+        return self.by_name.get(package_name)
+
+    def get_by_path(self, package_path: str) -> Package:
+        return self.by_path.get(package_path)
+
+    def add(self, package: Package):
+        self.remove(package.package_name)
+        self.by_name[package.package_name] = package
+        self.by_path[package.package_path] = package
+        self.by_installer[package.installer].add(package.package_name)
+        self.by_type[package.package_type].add(package.package_name)
+
+    def remove(self, package_name: str) -> Package:
+        package = self.by_name.pop(package_name, None)
+
+        if package is not None:
+            self.by_path.pop(package.package_path, None)
+            self.by_installer[package.installer].discard(package_name)
+            self.by_type[package.package_type].discard(package_name)
+
+        return package
+
+    def filter(self, **filters) -> List[Package]:
+        """
+        Returns packages matching all filters. Indexed attributes are looked up in
+        their indexes, others are checked on the remaining candidates.
+        """
+        filters = {key: value for key, value in filters.items() if value is not None}
+        candidates = None
+
+        if "package_name" in filters:
+            package = self.by_name.get(filters["package_name"])
+            candidates = {package.package_name} if package else set()
+
+        if "package_path" in filters:
+            package = self.by_path.get(filters["package_path"])
+            names = {package.package_name} if package else set()
+            candidates = names if candidates is None else candidates & names
+
+        for key, index in (
+            ("installer", self.by_installer),
+            ("package_type", self.by_type),
+        ):
+            if key in filters:
+                names = index.get(filters[key], set())
+                candidates = names if candidates is None else candidates & names
+
+        packages = (
+            self.by_name.values()
+            if candidates is None
+            else (self.by_name[name] for name in candidates)
+        )
+        other_filters = {
+            key: value
+            for key, value in filters.items()
+            if key not in self.indexed_attrs
+        }
 
         return [
-            pkg
-            for pkg in (to_package(p) for p in packages)
-            if pkg not in excluded_packages
+            package
+            for package in packages
+            if all(
+                getattr(package, key, None) == value
+                for key, value in other_filters.items()
+            )
         ]
 
+    def update(self, packages: Iterable[Package]):
+        """
+        Applies a new listing to the index, only touching packages that were added,
+        removed or changed. Returns an (added, removed, changed) tuple of names.
+        """
+        added, changed = [], []
+        seen = set()
+
+        for package in packages:
+            seen.add(package.package_name)
+            current = self.by_name.get(package.package_name)
+
+            if current is None:
+                added.append(package.package_name)
+            elif all(
+                getattr(current, attr) == getattr(package, attr)
+                for attr in (
+                    "package_path",
+                    "version_code",
+                    "installer",
+                    "package_type",
+                )
+            ):
+                continue
+            else:
+                changed.append(package.package_name)
+
+            self.add(package)
+
+        removed = [name for name in self.by_name if name not in seen]
+        for name in removed:
+            self.remove(name)
+
+        self.stale = False
+        return added, removed, changed
+
+    @classmethod
+    def parse_line(cls, line: str, third_party_packages: set = None) -> Package:
+        """
+        Parses a `pm list packages -f -U --show-versioncode -i` line, e.g.
+        package:/data/app/base.apk=com.example versionCode:12 installer=null uid:10101
+
+        If the names of third party packages are given, the package type is set.
+        """
+        match = cls._line_pattern.match(line.strip())
+        if not match:
+            return None
+
+        package_type = None
+        if third_party_packages is not None:
+            package_type = (
+                PackageType.THIRD_PARTY
+                if match.group("name") in third_party_packages
+                else PackageType.SYSTEM
+            )
+
+        info = dict(
+            re.split(r"[:=]", item, maxsplit=1)
+            for item in (match.group("info") or "").split()
+            if ":" in item or "=" in item
+        )
+        version_code = info.get("versionCode")
+        installer = info.get("installer")
+
+        return Package(
+            package_name=match.group("name"),
+            package_path=match.group("path"),
+            package_type=package_type,
+            name=os.path.basename(match.group("path")),
+            version_code=int(version_code) if version_code else None,
+            uid=info.get("uid"),
+            installer=None if installer in (None, "null") else installer,
+        )
+
+
+class PackageCatalogue:
+    """
+    An immutable catalogue of packages, indexed by package name and apk path.
+    """
+
+    def __init__(self, packages: Iterable[Package] = ()) -> None:
+        by_name = {}
+        for package in packages:
+            by_name[package.package_name] = package
+
+        self.packages: Tuple[Package, ...] = tuple(by_name.values())
+        self.names = frozenset(by_name)
+        self.by_name = MappingProxyType(by_name)
+        self.by_path = MappingProxyType(
+            {p.package_path: p for p in self.packages if p.package_path}
+        )
+
+    def __iter__(self):
+        return iter(self.packages)
+
+    def __len__(self) -> int:
+        return len(self.packages)
+
+    def __contains__(self, package: Union[str, Package]) -> bool:
+        if isinstance(package, Package):
+            package = package.package_name
+        return package in self.names
+
+    def get(self, package_name: str) -> Package:
+        return self.by_name.get(package_name)
+
+    def merge(
+        self, packages: Iterable[Union[str, dict, Package]]
+    ) -> "PackageCatalogue":
+        """
+        Returns a new catalogue with the given packages added, or replaced if
+        they are already in the catalogue.
+        """
+
+        def to_package(p):
+            if isinstance(p, Package):
+                return p
+            if isinstance(p, dict):
+                return Package(**p, package_type=PackageType.GOOGLE)
+            return Package(p, package_type=PackageType.GOOGLE)
+
+        return PackageCatalogue([*self.packages, *(to_package(p) for p in packages)])
+
+
+_google_package_catalogue: PackageCatalogue = None
+_google_catalogue_lock = threading.RLock()
+
+
+def get_google_catalogue() -> PackageCatalogue:
+    """
+    Returns the google package catalogue, which is built once per process.
+    """
+    global _google_package_catalogue
+
+    with _google_catalogue_lock:
+        if _google_package_catalogue is None:
+            _google_package_catalogue = PackageCatalogue(
+                Package(**entry, package_type=PackageType.GOOGLE)
+                for entry in load_catalogue_entries()
+            )
+
+        return _google_package_catalogue
+
+
+def extend_google_catalogue(
+    packages: Iterable[Union[str, dict, Package]],
+) -> PackageCatalogue:
+    """
+    Merges site specific packages (names, google.json style entries or Package
+    objects) into the google catalogue used by get_google_packages and
+    google_debloat, without reparsing it.
+    """
+    global _google_package_catalogue
+
+    with _google_catalogue_lock:
+        _google_package_catalogue = get_google_catalogue().merge(packages)
+        return _google_package_catalogue
+
 
 class ADB:
-    return_code = None
-    output: str = None
-    google_packages: list = []
+    """
+    The output, return code and result of the last command are kept per thread,
+    so one instance can run commands from many threads at once.
+    """
+
+    def __init__(
+        self,
+        transport: AdbServerTransport = None,
+        scheduler: CommandScheduler = None,
+    ) -> None:
+        self.transport = transport
+        self.scheduler = scheduler
+        self.shell_session: ShellSession = None
+        self.registry: DeviceRegistry = None
+        self.google_packages: list = []
+
+    @property
+    def _thread_state(self) -> threading.local:
+        state = self.__dict__.get("_thread_state")
+        if state is None:
+            # setdefault is atomic, so racing threads end up with the same state
+            state = self.__dict__.setdefault("_thread_state", threading.local())
+        return state
+
+    @property
+    def _cache_lock(self) -> threading.RLock:
+        """Guards the caches of the instance, e.g. the package index."""
+        lock = self.__dict__.get("_cache_lock")
+        if lock is None:
+            lock = self.__dict__.setdefault("_cache_lock", threading.RLock())
+        return lock
+
+    def __getstate__(self):
+        # thread locals and locks can't be pickled, e.g. for process executors
+        state = self.__dict__.copy()
+        state.pop("_thread_state", None)
+        state.pop("_cache_lock", None)
+        return state
+
+    @property
+    def output(self):
+        state = self._thread_state
+        output = getattr(state, "output", None)
+        return state.result.text if output is _RESULT_TEXT else output
+
+    @output.setter
+    def output(self, output):
+        self._thread_state.output = output
+
+    @property
+    def return_code(self) -> int:
+        return getattr(self._thread_state, "return_code", None)
+
+    @return_code.setter
+    def return_code(self, return_code: int):
+        self._thread_state.return_code = return_code
+
+    @property
+    def result(self) -> CommandResult:
+        """The CommandResult of the last command run by this thread."""
+        return getattr(self._thread_state, "result", None)
+
+    @result.setter
+    def result(self, result: CommandResult):
+        self._thread_state.result = result
+
+    @property
+    def call_options(self) -> CallOptions:
+        return getattr(self._thread_state, "options", None) or CallOptions()
+
+    @contextmanager
+    def command_options(
+        self,
+        priority: str = None,
+        timeout: float = None,
+        token: CancellationToken = None,
+    ):
+        """
+        Runs the commands of this thread within the context with a priority
+        (interactive, bulk or background), a timeout in seconds for all of them
+        together, and a cancellation token. Commands still running when the
+        timeout passes or the token is cancelled are killed.
+        """
+        validate_priority(priority)
+        previous = self.call_options
+        deadline = previous.deadline
+
+        if timeout is not None:
+            deadline = min(
+                time.monotonic() + timeout,
+                deadline if deadline is not None else float("inf"),
+            )
+
+        self._thread_state.options = CallOptions(
+            priority or previous.priority, deadline, token or previous.token
+        )
+        try:
+            yield
+        finally:
+            self._thread_state.options = previous
+
+    def _schedule(self, command_args: List[str], run: Callable):
+        """
+        Calls run(deadline, token) with the call options of this thread, through
+        the scheduler if there is one.
+        """
+        options = self.call_options
+
+        if self.scheduler is None:
+            return run(options.deadline, options.token)
+
+        serial, args = split_command_args(command_args)
+        attributes = getattr(self, "attributes", None) or {}
+
+        return self.scheduler.run(
+            serial,
+            run,
+            options.priority or command_priority(args),
+            deadline=options.deadline,
+            token=options.token,
+            bus=usb_bus(attributes.get("usb")),
+        )
+
+    def _run_command_args(self, command_args: List[str]):
+        """
+        Runs command args and returns a (return code, output) tuple.
+        Shell commands run over the persistent shell session if one is active, and
+        commands supported by the transport bypass the adb binary altogether.
+        """
+        return self._schedule(
+            command_args,
+            lambda deadline, token: self._execute_command_args(
+                command_args, deadline, token
+            ),
+        )
+
+    def _execute_command_args(
+        self,
+        command_args: List[str],
+        deadline: float = None,
+        token: CancellationToken = None,
+    ):
+        check_call(deadline, token)
+
+        if self.shell_session is not None and command_args[0] == "adb":
+            serial, args = split_command_args(command_args)
+
+            if len(args) > 1 and args[0] == "shell":
+                return self.shell_session.run(" ".join(args[1:]), deadline, token)
+
+        if self.transport is not None and self.transport.supports(command_args):
+            return self.transport.run(command_args, deadline, token)
 
-    def __init__(self) -> None:
-        pass
+        global command_checked
+        command_checked, sdk_path = is_valid_command(command_args[0], command_checked)
+
+        process = subprocess.Popen(
+            command_args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+        )
+        output = communicate(process, deadline, token)
+        return process.returncode, output
+
+    def _stream_command_args(
+        self, command_args: List[str], chunk_size: int = 65536, priority: str = None
+    ):
+        """
+        Returns an iterator that yields output chunks as they arrive and returns
+        the return code. The command's pipe is read as it is consumed, so a slow
+        consumer also slows the command down instead of buffering its output.
+        The call options of this thread are applied, and with a scheduler the
+        stream holds a slot of the device until it is exhausted or closed. Its
+        priority defaults to the command's, see command_priority.
+        """
+        options = self.call_options
+        if options.priority is None:
+            options = options._replace(priority=priority)
+        return self._stream(command_args, chunk_size, options)
+
+    def _stream(self, command_args: List[str], chunk_size: int, options: CallOptions):
+        if self.scheduler is None:
+            slot = nullcontext()
+        else:
+            serial, args = split_command_args(command_args)
+            attributes = getattr(self, "attributes", None) or {}
+            slot = self.scheduler.hold(
+                serial,
+                options.priority or command_priority(args),
+                deadline=options.deadline,
+                token=options.token,
+                bus=usb_bus(attributes.get("usb")),
+            )
+
+        with slot:
+            return (
+                yield from self._execute_stream(
+                    command_args, chunk_size, options.deadline, options.token
+                )
+            )
+
+    def _execute_stream(
+        self,
+        command_args: List[str],
+        chunk_size: int,
+        deadline: float = None,
+        token: CancellationToken = None,
+    ):
+        check_call(deadline, token)
+        serial, args = split_command_args(command_args)
+
+        if self.shell_session is not None and args[:1] == ["shell"]:
+            return_code, output = self._execute_command_args(
+                command_args, deadline, token
+            )
+            yield output
+            return return_code
+
+        if self.transport is not None and self.transport.supports(command_args):
+            return (
+                yield from self.transport.stream(
+                    command_args, chunk_size, deadline, token
+                )
+            )
+
+        global command_checked
+        command_checked, sdk_path = is_valid_command(command_args[0], command_checked)
+
+        process = subprocess.Popen(
+            command_args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+        )
+
+        completed = False
+        killed = threading.Event()
+
+        def kill():
+            killed.set()
+            process.kill()
+
+        left = remaining(deadline)
+        timer = threading.Timer(max(0, left), kill) if left is not None else None
+        if timer is not None:
+            timer.start()
+        if token is not None:
+            token.on_cancel(kill)
+
+        try:
+            while True:
+                chunk = process.stdout.read1(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+            completed = True
+        finally:
+            if not completed and process.poll() is None:
+                # the consumer stopped early
+                process.kill()
+            process.stdout.close()
+            process.wait()
+
+            if timer is not None:
+                timer.cancel()
+            if token is not None:
+                token.remove(kill)
+
+        if killed.is_set():
+            check_call(deadline, token)
+        return process.returncode
+
+    def _pipe_command_args(self, command_args: List[str], write: Callable):
+        """
+        Runs command args while write(stdin) feeds their stdin, and returns a
+        (return code, output) tuple. Nothing is buffered on the host.
+        """
+        return self._schedule(
+            command_args,
+            lambda deadline, token: self._execute_pipe(
+                command_args, write, deadline, token
+            ),
+        )
+
+    def _execute_pipe(
+        self,
+        command_args: List[str],
+        write: Callable,
+        deadline: float = None,
+        token: CancellationToken = None,
+    ):
+        check_call(deadline, token)
+
+        global command_checked
+        command_checked, sdk_path = is_valid_command(command_args[0], command_checked)
+
+        process = subprocess.Popen(
+            command_args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        output = []
+        # reads the output meanwhile, so a chatty command can't block the writer
+        reader = threading.Thread(target=lambda: output.append(process.stdout.read()))
+        reader.start()
+
+        killed = threading.Event()
+
+        def kill():
+            killed.set()
+            process.kill()
+
+        left = remaining(deadline)
+        timer = threading.Timer(max(0, left), kill) if left is not None else None
+        if timer is not None:
+            timer.start()
+        if token is not None:
+            token.on_cancel(kill)
+
+        try:
+            write(process.stdin)
+            process.stdin.close()
+        except BrokenPipeError:
+            # the command exited early, its output tells why
+            pass
+        except BaseException:
+            process.kill()
+            raise
+        finally:
+            reader.join()
+            process.stdout.close()
+            process.wait()
+
+            if timer is not None:
+                timer.cancel()
+            if token is not None:
+                token.remove(kill)
+
+        if killed.is_set():
+            check_call(deadline, token)
+        return process.returncode, b"".join(output)
+
+    def get_google_packages(self) -> List["Package"]:
+        packages = list(get_google_catalogue())
+        self.google_packages = packages
+        return packages
 
     def enable_tcpip_mode(self, port=None):
         if port is None:
@@ -240,22 +1196,46 @@ class ADB:
     def disconnect(self, device_ip: str):
         return self.output
 
-    @command("devices", logging=False)
+    def start_device_registry(self, timeout: float = 5.0) -> DeviceRegistry:
+        """
+        Starts tracking devices with a single track-devices stream. Until
+        stop_device_registry is called, get_devices answers from memory and
+        returns the same Device objects every time.
+        """
+        if self.registry is None:
+            self.registry = DeviceRegistry(self._create_device, self.transport)
+
+        return self.registry.start(timeout)
+
+    def stop_device_registry(self):
+        if self.registry is not None:
+            self.registry.stop()
+            self.registry = None
+
+    def _create_device(self, id: str, state: str, attributes: dict) -> "Device":
+        return Device(
+            id,
+            transport=self.transport,
+            state=state,
+            attributes=attributes,
+            scheduler=self.scheduler,
+        )
+
     def get_devices(self) -> List["Device"]:
         """
         Checks which devices are available and returns them as Device objects.
         """
+        if self.registry is not None and self.registry.is_running():
+            return self.registry.get_devices()
 
-        devices = []
-        output = self.output.splitlines()
-
-        for lines in output:
-            lines = lines.strip().split()
+        return self.fetch_devices()
 
-            if len(lines) == 2:
-                id = lines[0]
-                devices.append(Device(id))
-        return devices
+    @command("devices -l", logging=False)
+    def fetch_devices(self) -> List["Device"]:
+        return [
+            self._create_device(id, state, attributes)
+            for id, (state, attributes) in parse_device_list(self.output).items()
+        ]
 
     def get_device(self, device_id: str = None):
         devices = self.get_devices()
@@ -278,31 +1258,80 @@ class ADB:
         base_cmd: str = "adb",
         log_cmd: bool = False,
         root: bool = False,
+        stream: Union[bool, str] = False,
+        priority: str = None,
+        timeout: float = None,
+        token: CancellationToken = None,
     ):
         """
         Executes an adb command and returns its output.
+        If stream is set, an iterator of output lines (or byte chunks) is returned.
+        priority, timeout and token are applied as by command_options.
         """
         decorator = root_command if root else command
 
-        @decorator(command_args, logging, base_cmd, log_cmd)
+        @decorator(command_args, logging, base_cmd, log_cmd, stream)
         def run_command(cls):
             return cls.output
 
-        return run_command(self)
+        with self.command_options(priority, timeout, token):
+            return run_command(self)
 
 
 class Device(ADB):
-    id = None
-    system_settings = {}
-    global_settings = {}
-    secure_settings = {}
+    def __init__(
+        self,
+        id,
+        transport: AdbServerTransport = None,
+        state: str = None,
+        attributes: dict = None,
+        scheduler: CommandScheduler = None,
+    ) -> None:
+        super().__init__(transport, scheduler)
+        self.id = id
+        self.state = state
+        self.attributes = attributes or {}  # e.g. usb, product, model, transport_id
+        self.system_settings = {}
+        self.global_settings = {}
+        self.secure_settings = {}
+        self.system_packages = []
+        self.third_party_packages = []
+        self.do_not_delete_packages = []
+        self.property_cache = PropertyCache()
+        self.package_index: PackageIndex = None
+        self.tree_index: TreeIndex = None
+
+    def start_session(self) -> ShellSession:
+        """
+        Starts a persistent adb shell, which is used by all shell commands until
+        stop_session is called.
+        """
+        if self.shell_session is None:
+            global command_checked
+            command_checked, sdk_path = is_valid_command("adb", command_checked)
+            self.shell_session = ShellSession(self.id)
 
-    system_packages = []
-    third_party_packages = []
-    do_not_delete_packages = []
+        self.shell_session.start()
+        return self.shell_session
 
-    def __init__(self, id) -> None:
-        self.id = id
+    def stop_session(self):
+        if self.shell_session is not None:
+            self.shell_session.close()
+            self.shell_session = None
+
+    @contextmanager
+    def session(self):
+        """
+        Runs shell commands over a single persistent adb shell within the context.
+        """
+        started = self.shell_session is None
+        session = self.start_session()
+
+        try:
+            yield session
+        finally:
+            if started:
+                self.stop_session()
 
     @command("shell ip route")
     def get_device_ip(self):
@@ -402,6 +1431,7 @@ class Device(ADB):
 
     @command("reboot bootloader")
     def reboot_bootloader(self):
+        self.invalidate_properties()
         return self.output
 
     # fastboot commands
@@ -411,6 +1441,7 @@ class Device(ADB):
 
     @command("reboot", base_cmd="fastboot")
     def fastboot_reboot(self):
+        self.invalidate_properties()
         return self.output
 
     @command("flashing unlock", base_cmd="fastboot")
@@ -420,9 +1451,8 @@ class Device(ADB):
     def is_bootloader_locked(self):
         return bool(self.get_shell_property("ro.boot.flash.locked"))
 
-    @command("shell getprop ro.oem_unlock_supported", logging=False)
     def is_oem_unlock_supported(self):
-        return bool(self.output)
+        return bool(self.get_shell_property("ro.oem_unlock_supported"))
 
     def get_model(self):
         return self.get_shell_property("ro.product.model")
@@ -464,6 +1494,7 @@ class Device(ADB):
     def get_sdk(self):
         return self.get_shell_property("ro.build.version.sdk")
 
+    @unbatched
     def is_rooted(self):
         self.output = self.execute("shell su -c id", logging=False)
         return "uid=0" in self.output
@@ -480,38 +1511,116 @@ class Device(ADB):
         Retrieve a list of packages based on the package type.
         If no package type is specified, all packages are returned.
         """
-        package_mapping = {
-            PackageType.GOOGLE: self.get_google_packages,
-            PackageType.SYSTEM: self.get_system_packages,
-            PackageType.THIRD_PARTY: self.get_third_party_packages,
-        }
-
-        if package_type is None:
-            packages = (
-                set(self.get_google_packages())
-                | set(self.get_system_packages())
-                | set(self.get_third_party_packages())
-            )
-        else:
-            packages = set(package_mapping[package_type]())
-
-        filtered_packages = Package.filter_packages(
-            packages,
+        filters = dict(
             package_name=package_name,
             name=name,
             package_type=package_type,
             img_src=img_src,
             genre=genre,
         )
+        packages = []
 
-        return list(filtered_packages)
+        if package_type in (None, PackageType.GOOGLE):
+            packages = Package.filter_packages(self.get_google_packages(), **filters)
 
-    @command("shell getprop", logging=False)
+        if package_type != PackageType.GOOGLE:
+            with self._cache_lock:
+                installed = self.get_package_index().filter(**filters)
+            names = {package.package_name for package in installed}
+            packages = installed + [p for p in packages if p.package_name not in names]
+
+        return packages
+
+    @unbatched
+    def list_packages(self) -> List[Package]:
+        """
+        Lists all installed packages, with their apk path, version code, uid,
+        installer and package type, in a single round trip.
+        """
+        marker = "__adb_wrapper_third_party__"
+        output = self.run_shell_script(
+            "pm list packages -f -U --show-versioncode -i; "
+            f"echo {marker}; pm list packages {PackageType.THIRD_PARTY.value}"
+        )
+        output, _, third_party = output.partition(marker)
+        third_party = {
+            line.split("package:", 1)[1].strip()
+            for line in third_party.splitlines()
+            if line.startswith("package:")
+        }
+
+        packages = (
+            PackageIndex.parse_line(line, third_party) for line in output.splitlines()
+        )
+        return [package for package in packages if package is not None]
+
+    def get_package_index(self, refresh: bool = False) -> PackageIndex:
+        """
+        Returns the index of installed packages. It is built on first use, and
+        updated with a new listing when refreshed or after installs. The index
+        is changed under _cache_lock, which callers hold while reading it.
+        """
+        with self._cache_lock:
+            if self.package_index is None:
+                # other threads only see the index once it is complete
+                self.package_index = PackageIndex(self.list_packages())
+            elif refresh or self.package_index.stale:
+                self.package_index.update(self.list_packages())
+
+            return self.package_index
+
+    @unbatched
     def get_shell_property(self, prop):
+        """
+        Returns a system property from the property cache, which is refreshed
+        with a single getprop call once it expires.
+        """
+        cache = self.property_cache
+
+        # a thread refreshing the cache makes the others wait for it
+        with cache.lock:
+            if cache.needs_boot_check(prop) and cache.confirm_boot_id(
+                self.get_boot_id()
+            ):
+                return cache.get(prop)
+
+            if not cache.is_fresh(prop):
+                self.load_properties()
+
+            return cache.get(prop)
+
+    @command("shell getprop", logging=False)
+    def fetch_shell_property(self, prop):
+        """Reads a system property from the device, bypassing the property cache."""
         return self.output
 
-    def parse_settings(self, settings: str) -> dict:
-        lines = settings.strip().splitlines()
+    @command(f"shell cat {BOOT_ID_PATH}", logging=False)
+    def get_boot_id(self):
+        return self.output if self.return_code == 0 else None
+
+    @command(f"shell cat {BOOT_ID_PATH}; getprop", logging=False)
+    def load_properties(self) -> dict:
+        """Snapshots all system properties into the property cache."""
+        boot_id, _, properties = self.output.partition("\n")
+        properties = parse_properties(properties)
+        self.property_cache.update(boot_id.strip(), properties)
+        return properties
+
+    @unbatched
+    def get_properties(self) -> dict:
+        cache = self.property_cache
+
+        with cache.lock:
+            if not cache.is_fresh():
+                self.load_properties()
+            return dict(cache.properties)
+
+    def invalidate_properties(self):
+        """Drops cached properties, e.g. after the device was rebooted."""
+        self.property_cache.invalidate()
+
+    def parse_settings(self, settings: Union[str, Iterable[str]]) -> dict:
+        lines = settings.strip().splitlines() if isinstance(settings, str) else settings
 
         settings = {}
         for line in lines:
@@ -521,6 +1630,7 @@ class Device(ADB):
 
         return settings
 
+    @unbatched
     def get_settings(self):
         self.system_settings = self.get_system_settings()
         self.global_settings = self.get_global_settings()
@@ -548,6 +1658,16 @@ class Device(ADB):
         secure_settings = self.parse_settings(self.output)
         return secure_settings
 
+    def iter_settings(self, namespace: SettingsType) -> Iterator[tuple]:
+        """Yields (key, value) tuples of a settings namespace as they are listed."""
+        namespace = SettingsType(namespace).value
+        lines = self.execute(f"shell settings list {namespace}", False, stream=True)
+
+        for line in lines:
+            if "=" in line:
+                key, value = line.split("=", 1)
+                yield key.strip(), value.strip()
+
     @command("shell svc wifi enable")
     def enable_wifi(self):
         return self.output
@@ -582,20 +1702,21 @@ class Device(ADB):
     def get_third_party_packages(self):
         return Package.parse_packages(self.output)
 
-    def get_google_packages(self) -> List["Package"]:
-        packages = []
-
-        with resources.open_text(__package__, "google.json") as file:
-            packages = json.load(file)
-
-            for idx, package in enumerate(packages):
-                package: dict
-                package = Package(**package, package_type=PackageType.GOOGLE)
-                packages[idx] = package
+    def iter_packages(self, package_type: PackageType = None) -> Iterator["Package"]:
+        """
+        Yields installed packages while they are being listed.
+        If no package type is specified, all installed packages are yielded.
+        """
+        flag = PackageType(package_type).value if package_type else ""
+        lines = self.execute(f"shell pm list packages -f {flag}", False, stream=True)
+        return Package.iter_packages(lines)
 
-        self.google_packages = packages
-        return packages
+    @command("logcat -d", logging=False, stream=True)
+    def iter_logcat(self) -> Iterator[str]:
+        """Yields the lines of the logcat buffer."""
+        return self.output
 
+    @unbatched
     def get_package_paths(self, package: Package) -> str:
         if isinstance(package, Package):
             package_name = package.package_name or package.package_path
@@ -620,26 +1741,79 @@ class Device(ADB):
             package = package.package_name or package.package_path
 
         if isinstance(package, str) and package.endswith(".apk"):
-            matched = Package.filter_packages(self.get_packages(), package_path=package)
+            with self._cache_lock:
+                matched = self.get_package_index().get_by_path(package)
             if matched:
-                package = matched[0].package_name
+                package = matched.package_name
 
         return package
 
-    def install_package(self, package: Package):
-        if not isinstance(package, Package):
-            package_path = self.get_package_paths(package)
+    def install_package(
+        self,
+        package: Union[str, os.PathLike, Package, List[str]],
+        streaming: bool = None,
+        replace: bool = True,
+        install_args: List[str] = None,
+    ) -> InstallResult:
+        """
+        Installs a local apk, or the split apks of one app given as a list, with
+        install-multiple. Anything else is restored from the device: an apk path
+        with pm install, or a package name with pm install-existing (e.g. after
+        uninstall_packages). Returns an InstallResult.
+        """
+        apks = self._get_install_paths(package)
+
+        if all(is_local_apk(apk) for apk in apks):
+            cmd = build_install_command(apks, streaming, replace, False, install_args)
+        elif len(apks) > 1:
+            raise FileNotFoundError(f"Split apks not found: {apks}")
+        elif apks[0].endswith(".apk"):
+            cmd = f"shell pm install {'-r ' if replace else ''}{apks[0]}"
+        else:
+            cmd = f"shell pm install-existing --user 0 {apks[0]}"
 
-        print("Installing package {0}...".format(package_path))
-        is_shell_install = not os.path.exists(package_path)
+        print("Installing package {0}...".format(", ".join(apks)))
+        return self._run_install(apks, cmd)
 
-        cmd = (
-            f"shell pm install {package_path}"
-            if is_shell_install
-            else f"install {package_path}"
-        )
-        return self.execute(cmd)
+    def _get_install_paths(self, package) -> List[str]:
+        if isinstance(package, Package):
+            package = package.package_path or package.package_name
+
+        if isinstance(package, (list, tuple)):
+            return [os.fspath(apk) for apk in package]
+        return [os.fspath(package)]
+
+    def is_up_to_date(self, apks: List[str]) -> bool:
+        """
+        Whether the app in the local apks is installed with the same versionCode.
+        Only the apks are read, installed versions come from the package index.
+        """
+        try:
+            info = read_apk_info(apks[0])
+        except (ApkError, OSError):
+            return False
+
+        with self._cache_lock:
+            installed = self.get_package_index().get(info.package_name)
+        return installed is not None and installed.version_code == info.version_code
 
+    @unbatched
+    def _run_install(self, apks: List[str], cmd: str) -> InstallResult:
+        start = time.perf_counter()
+
+        try:
+            output = self.execute(cmd, logging=False)
+            ok = is_install_success(self.return_code, output)
+        except (PermissionError, FileNotFoundError, RuntimeError) as e:
+            output, ok = str(e), False
+
+        with self._cache_lock:
+            if self.package_index is not None:
+                self.package_index.stale = True
+
+        return InstallResult(tuple(apks), ok, output, time.perf_counter() - start)
+
+    @unbatched
     def uninstall_package(self, package: Package, remove_dirs: bool = False):
         package_name = package.package_name
         print("Uninstalling package {0}...".format(package_name))
@@ -647,7 +1821,12 @@ class Device(ADB):
         # if remove_dirs:
         #     # execute root command to remove dirs of the app
         #     self.execute()
-        return self.execute(f"uninstall --user 0 {package_name}")
+        output = self.execute(f"uninstall --user 0 {package_name}")
+
+        with self._cache_lock:
+            if self.package_index is not None and self.return_code == 0:
+                self.package_index.remove(package_name)
+        return output
 
     @command("shell cmd statusbar expand-notifications")
     def expand_notifications(self):
@@ -661,7 +1840,7 @@ class Device(ADB):
     def enable_lock_screen(self):
         return self.output
 
-    def set_brightness(self, brightness: int): # 0 to 255
+    def set_brightness(self, brightness: int):  # 0 to 255
         return self.set_settings([f"system.screen_brightness={brightness}"])
 
     def set_volume(
@@ -705,17 +1884,28 @@ class Device(ADB):
             raise FileNotFoundError("Backup files must be of .ab type.")
         return self.execute(f"restore {backup_file}")
 
-    @command("push")
-    def push_file(self, pc_file, device_file):
-        """Transfer file from pc to device."""
+    def push_file(self, pc_file, device_file, compression: str = None):
+        """
+        Transfer file from pc to device. compression is a policy, see
+        compression_flags.
+        """
+        self.invalidate_tree_index()
+        flags = compression_flags(compression, pc_file, local=True)
+        args = ["push", *flags, pc_file, device_file]
+        output = self.execute(" ".join(shlex.quote(str(arg)) for arg in args))
         print(f"Transferred file {pc_file} to {device_file}.")
-        return self.output
+        return output
 
-    @command("pull")
-    def pull_file(self, device_file, pc_file):
-        """Transfer file from device to pc."""
+    def pull_file(self, device_file, pc_file, compression: str = None):
+        """
+        Transfer file from device to pc. compression is a policy, see
+        compression_flags.
+        """
+        flags = compression_flags(compression, device_file, local=False)
+        args = ["pull", *flags, device_file, pc_file]
+        output = self.execute(" ".join(shlex.quote(str(arg)) for arg in args))
         print(f"Transferred file {device_file} to {pc_file}.")
-        return self.output
+        return output
 
     @command("shell pwd")
     def get_current_working_directory(self):
@@ -723,17 +1913,30 @@ class Device(ADB):
 
     @command("shell mkdir")
     def create_directory(self, directory):
+        self.invalidate_tree_index()
         print(f"Created directory {directory}.")
         return self.output
 
+    def create_directories(self, *directories: str):
+        """Creates directories and their missing parents in one shell call."""
+        self.invalidate_tree_index()
+        paths = " ".join(shlex.quote(directory) for directory in directories)
+        return self.run_shell_script(f"mkdir -p {paths}")
+
+    @unbatched
     def get_default_download_directory(self):
         default_download_directory = "/storage/emulated/0/Download"
         output = self.execute(f"shell ls {default_download_directory}", logging=False)
 
         return default_download_directory if output else "/sdcard"
 
-    @command("shell ls", logging=False)
     def is_valid_path(self, path):
+        if self.tree_index is not None and self.tree_index.covers(path):
+            return self.tree_index.exists(path)
+        return self.fetch_is_valid_path(path)
+
+    @command("shell ls", logging=False)
+    def fetch_is_valid_path(self, path):
         return not bool(self.return_code)
 
     @command("shell ls -p", logging=False)
@@ -744,106 +1947,441 @@ class Device(ADB):
             if not o.endswith("/")
         ]
 
-    @command("shell find {path} -type f", logging=False)
     def get_all_files_in_directory(self, directory):
-        files = [
-            os.path.join(directory, line.strip())
-            for line in self.output.splitlines()
-            if line.strip()
-        ]
-        return files
+        return list(self.iter_all_files_in_directory(directory))
+
+    def iter_all_files_in_directory(self, directory) -> Iterator[str]:
+        """Yields the paths of all files in a directory and its subdirectories."""
+        lines = self.stream_shell_script(f"find {shlex.quote(directory)} -type f")
+        return (line.strip() for line in lines if line.strip())
 
-    @command("shell test -d", logging=False)
     def is_directory(self, path):
+        if self.tree_index is not None and self.tree_index.covers(path):
+            return self.tree_index.is_directory(path)
+        return self.fetch_is_directory(path)
+
+    @command("shell test -d", logging=False)
+    def fetch_is_directory(self, path):
         return not bool(self.return_code)
 
     def push_files(
         self,
         pc_files: List[str],
-        device_files: List[str] = [],
+        device_files: List[str] = None,
         destination_directory: str = None,
-    ):
-        """Transfer files from pc to device."""
+        max_workers: int = 2,
+        compression: str = None,
+    ) -> List[TransferResult]:
+        """
+        Transfer files from pc to device. Files are pushed with as few adb
+        invocations as possible, see TransferEngine. Returns a TransferResult per
+        file.
+        """
+        engine = TransferEngine(
+            max_workers=max_workers, max_per_device=max_workers, compression=compression
+        )
+        results = engine.push([self], pc_files, device_files, destination_directory)
+        return results[self.id]
 
-        if device_files is None:
-            device_files = []
+    def pull_files(
+        self,
+        device_files: List[str],
+        pc_files: List[str] = None,
+        destination_directory: str = None,
+        max_workers: int = 2,
+        compression: str = None,
+    ) -> List[TransferResult]:
+        """
+        Transfer files from device to pc. Files are pulled with as few adb
+        invocations as possible, see TransferEngine. Returns a TransferResult per
+        file.
+        """
+        engine = TransferEngine(
+            max_workers=max_workers, max_per_device=max_workers, compression=compression
+        )
+        results = engine.pull([self], device_files, pc_files, destination_directory)
+        return results[self.id]
 
-        if not destination_directory:
-            destination_directory = self.get_default_download_directory()
+    def transfer_batch(self, batch: TransferBatch) -> List[TransferResult]:
+        """Runs one adb push or pull of a TransferBatch."""
+        if batch.direction == "push":
+            self.invalidate_tree_index()
 
-        for pc_file, device_file in zip_longest(pc_files, device_files):
-            try:
-                if device_file is None:
-                    device_file = os.path.join(
-                        destination_directory, os.path.basename(pc_file)
-                    )
+        command_args = ["adb", "-s", self.id, batch.direction, *batch.flags]
+        command_args.extend(batch.sources)
+        command_args.append(batch.target)
+        start = time.perf_counter()
 
-                self.push_file(pc_file, device_file)
-            except Exception as e:
-                print(e)
+        try:
+            return_code, output = self._run_command_args(command_args)
+            output = output.decode(errors="backslashreplace")
+        except OSError as e:
+            return_code, output = 1, str(e)
 
-        return self.output
+        return parse_transfer_output(
+            batch, return_code, output, time.perf_counter() - start
+        )
 
-    def pull_files(
+    def pull_directory(
         self,
-        device_files: List[str],
-        pc_files: List[str] = [],
-        destination_directory: str = None,
-    ):
-        """Transfer files from device to pc."""
-        if pc_files is None:
-            pc_files = []
+        remote_dir: str,
+        local_dir: str,
+        include: List[str] = None,
+        exclude: List[str] = None,
+    ) -> List[str]:
+        """
+        Pulls a directory tree with one `tar -c` on the device, extracted on the
+        host as the bytes arrive. include and exclude are glob patterns of
+        relative paths or file names. Returns the pulled files, relative to
+        local_dir.
+        """
+        excludes = "".join(f" --exclude={shlex.quote(p)}" for p in exclude or ())
+        tar_cmd = f"tar -c -C {shlex.quote(remote_dir)}{excludes} -f - . 2>/dev/null"
+        chunks = self._stream_command_args(
+            ["adb", "-s", self.id, "exec-out", tar_cmd], priority="bulk"
+        )
+        os.makedirs(local_dir, exist_ok=True)
 
-        if not destination_directory:
-            destination_directory = os.getcwd()
+        try:
+            return extract_stream(chunks, local_dir, include, exclude)
+        except tarfile.ReadError as e:
+            raise RuntimeError(f"Couldn't read the tar stream of {remote_dir}: {e}")
+        finally:
+            chunks.close()
 
-        for device_file, pc_file in zip_longest(device_files, pc_files):
-            try:
-                if pc_file is None:
-                    pc_file = os.path.join(
-                        destination_directory, os.path.basename(device_file)
-                    )
-                self.pull_file(device_file, pc_file)
-            except Exception as e:
-                print(e)
+    def push_directory(
+        self,
+        local_dir: str,
+        remote_dir: str,
+        include: List[str] = None,
+        exclude: List[str] = None,
+    ) -> List[str]:
+        """
+        Pushes a directory tree with one `tar -x` on the device, fed with a tar
+        stream written on the fly. include and exclude are glob patterns of
+        relative paths or file names. Returns the pushed files, relative to
+        remote_dir.
+        """
+        self.invalidate_tree_index()
+        paths = list(iter_local_files(local_dir, include, exclude))
+        remote_dir = shlex.quote(remote_dir)
+        tar_cmd = f"mkdir -p {remote_dir} && tar -x -C {remote_dir} -f -"
+
+        return_code, output = self._pipe_command_args(
+            ["adb", "-s", self.id, "exec-in", tar_cmd],
+            lambda stdin: write_stream(stdin, local_dir, paths),
+        )
 
-        return self.output
+        if return_code != 0:
+            output = output.decode(errors="backslashreplace").strip()
+            raise RuntimeError(f"Couldn't push {local_dir}: {output}")
+        return paths
+
+    @unbatched
+    def get_remote_manifest(
+        self, remote_dir: str, checksum: bool = False
+    ) -> Dict[str, FileEntry]:
+        """
+        Returns the size, mtime and, with checksum, md5 of every file under
+        remote_dir by relative path, from a single shell call.
+        """
+        marker = "__adb_wrapper_md5__"
+        output = self.run_shell_script(
+            build_manifest_script(remote_dir, checksum, marker)
+        )
+
+        if self.return_code == MISSING_DIRECTORY_EXIT_CODE:
+            raise FileNotFoundError(f"Directory {remote_dir} not found.")
+        return parse_manifest_output(output, marker)
+
+    def sync(
+        self,
+        local_dir: str,
+        remote_dir: str,
+        direction: str = "pull",
+        delete: bool = False,
+        checksum: bool = False,
+        manifest_path: str = None,
+        max_workers: int = 2,
+    ) -> SyncReport:
+        """
+        Transfers new and changed files from remote_dir to local_dir (pull) or
+        from local_dir to remote_dir (push). With delete, files missing from the
+        source are deleted from the destination. With checksum, files are also
+        compared by md5.
+
+        The state after each sync is kept in a manifest in local_dir, so files
+        that didn't change on either side since are skipped without transfers.
+        """
+        if direction not in ("push", "pull"):
+            raise ValueError(f"Unsupported direction '{direction}'.")
+
+        manifest = SyncManifest(
+            manifest_path or os.path.join(local_dir, MANIFEST_NAME),
+            f"{self.id}:{remote_dir}",
+        ).load()
+
+        try:
+            remote = self.get_remote_manifest(remote_dir, checksum)
+        except FileNotFoundError:
+            if direction == "pull":
+                raise
+            remote = {}
+
+        local = (
+            scan_local_directory(local_dir, manifest.path)
+            if os.path.isdir(local_dir)
+            else {}
+        )
+        sources = remote if direction == "pull" else local
+
+        def local_path(path: str) -> str:
+            return os.path.join(local_dir, *path.split("/"))
+
+        report = SyncReport()
+        changed = []
+
+        for path in sources:
+            remote_entry, local_stat = remote.get(path), local.get(path)
+
+            if manifest.is_unchanged(path, remote_entry, local_stat, checksum):
+                report.unchanged.append(path)
+            elif is_same_file(
+                direction, remote_entry, local_path(path), local_stat, checksum
+            ):
+                report.unchanged.append(path)
+                manifest.update(path, remote_entry, local_stat)
+            else:
+                changed.append(path)
+
+        engine = TransferEngine(max_workers=max_workers, max_per_device=max_workers)
+        remote_paths = [posixpath.join(remote_dir, path) for path in changed]
+        local_paths = [local_path(path) for path in changed]
+
+        if direction == "pull":
+            results = engine.pull([self], remote_paths, local_paths)[self.id]
+        else:
+            results = engine.push([self], local_paths, remote_paths)[self.id]
+
+        for path, result in zip(changed, results):
+            if result.ok:
+                report.transferred.append(path)
+            else:
+                report.failed[path] = result.output
+
+        if direction == "push" and report.transferred:
+            # the device's mtimes and hashes of pushed files
+            remote = self.get_remote_manifest(remote_dir, checksum)
+
+        for path in report.transferred:
+            if path in remote:
+                manifest.update(path, remote[path], os.stat(local_path(path)))
+
+        if delete:
+            destination = local if direction == "pull" else remote
+            extra = [path for path in destination if path not in sources]
+
+            if direction == "pull":
+                for path in extra:
+                    os.remove(local_path(path))
+            else:
+                self.delete_files(remote_dir, extra)
+
+            report.deleted.extend(extra)
+
+        for path in list(manifest.files):
+            if path not in sources:
+                manifest.remove(path)
+
+        manifest.save()
+        return report
+
+    def delete_files(self, directory: str, paths: List[str], batch_size: int = 200):
+        """Deletes files relative to a device directory, in few shell calls."""
+        self.invalidate_tree_index()
+        for start in range(0, len(paths), batch_size):
+            files = " ".join(shlex.quote(p) for p in paths[start : start + batch_size])
+            self.run_shell_script(f"cd {shlex.quote(directory)} && rm -f -- {files}")
 
-    @command("shell test -f")
     def file_exists(self, file_path: str):
+        if self.tree_index is not None and self.tree_index.covers(file_path):
+            return self.tree_index.is_file(file_path)
+        return self.fetch_file_exists(file_path)
+
+    @command("shell test -f")
+    def fetch_file_exists(self, file_path: str):
         return not bool(self.return_code)
 
+    @command("shell", logging=False, stream=True)
+    def stream_shell_script(self, script: str) -> Iterator[str]:
+        """
+        Runs a shell script on the device like run_shell_script, and yields its
+        output lines as they arrive.
+        """
+        return self.output
+
+    def walk(self, root: str, max_depth: int = None) -> Iterator[RemoteEntry]:
+        """
+        Yields a RemoteEntry (path, type, size, mtime and mode) for root and
+        everything below it, as the output of a single find call streams in.
+        """
+        return iter_entries(
+            self.stream_shell_script(build_walk_script(root, max_depth))
+        )
+
+    def build_tree_index(
+        self, root: str, ttl: float = None, path: str = None
+    ) -> TreeIndex:
+        """
+        Walks root into a TreeIndex, which answers is_directory, file_exists and
+        is_valid_path under root without device calls, until ttl seconds have
+        passed or files are pushed, created or deleted through this device.
+        With path, the index is saved there too, see load_tree_index.
+        """
+        index = TreeIndex.from_entries(root, self.walk(root), ttl)
+
+        if path is not None:
+            index.save(path)
+
+        self.tree_index = index
+        return index
+
+    def load_tree_index(self, path: str, ttl: float = None) -> TreeIndex:
+        """Loads a TreeIndex saved by build_tree_index."""
+        self.tree_index = TreeIndex.load(path, ttl)
+        return self.tree_index
+
+    def invalidate_tree_index(self):
+        self.tree_index = None
+
     # works if rooted
     @command("shell am broadcast -a android.intent.action.MASTER_CLEAR")
     def factory_reset(self):
+        self.invalidate_properties()
         return self.output
 
-    def install_packages(self, packages: List[str]):
-        for p in packages:
-            self.install_package(p)
+    def install_packages(
+        self,
+        packages: List[Union[str, os.PathLike, Package, List[str]]],
+        streaming: bool = None,
+        replace: bool = True,
+        atomic: bool = False,
+        install_args: List[str] = None,
+        skip_up_to_date: bool = True,
+    ) -> List[InstallResult]:
+        """
+        Installs packages one by one, see install_package. Lists of split apks
+        are installed together. With atomic, local apks are installed in a single
+        install-multi-package session, so either all of them or none are
+        installed. Local apks whose versionCode is installed already are skipped
+        unless skip_up_to_date is False. Returns an InstallResult per package, in
+        order. Packages of an atomic install share one InstallResult.
+        """
+        results = [None] * len(packages)
+        installs = {}
+
+        # skips are decided up front, as installs mark the package index stale
+        for idx, package in enumerate(packages):
+            apks = self._get_install_paths(package)
+
+            if (
+                skip_up_to_date
+                and all(is_local_apk(apk) for apk in apks)
+                and self.is_up_to_date(apks)
+            ):
+                results[idx] = InstallResult(
+                    tuple(apks), True, "Up to date", skipped=True
+                )
+            else:
+                installs[idx] = package
+
+        if atomic and installs:
+            # the splits of an app go in the same session as the other apps
+            apks = [
+                apk
+                for package in installs.values()
+                for apk in self._get_install_paths(package)
+            ]
+            if not all(is_local_apk(apk) for apk in apks):
+                raise ValueError("Atomic installs need local apk files.")
+
+            cmd = build_install_command(apks, streaming, replace, True, install_args)
+            print("Installing packages {0}...".format(", ".join(apks)))
+            result = self._run_install(apks, cmd)
+            installs = dict.fromkeys(installs, result)
+        else:
+            for idx, package in installs.items():
+                installs[idx] = self.install_package(
+                    package, streaming, replace, install_args
+                )
 
+        for idx, result in installs.items():
+            results[idx] = result
+        return results
+
+    @unbatched
     def uninstall_packages(
         self,
         packages: List[str],
         excluded_packages: List[str] = None,
         remove_dirs: bool = False,
-    ):
-        packages = Package.normalize_packages(packages, excluded_packages)
-        for package in packages:
-            self.uninstall_package(package, remove_dirs)
+    ) -> UninstallReport:
+        """
+        Uninstalls packages for user 0. Packages that aren't installed are
+        skipped, as told by a fresh listing of the installed packages, and the
+        rest are uninstalled in as few shell invocations as possible. Returns an
+        UninstallReport.
+        """
+        excluded_packages = {*(excluded_packages or ()), *self.do_not_delete_packages}
+        requested = Package.normalize_packages(packages)
+        allowed = Package.normalize_packages(requested, excluded_packages)
+
+        allowed_set = set(allowed)
+
+        report = UninstallReport(
+            excluded=[p.package_name for p in requested if p not in allowed_set]
+        )
+        installed = []
+
+        with self._cache_lock:
+            # packages may have been installed since, e.g. by another client
+            index = self.get_package_index(refresh=True)
+            for package in allowed:
+                if package.package_name in index:
+                    installed.append(package.package_name)
+                else:
+                    report.not_installed.append(package.package_name)
+
+        for start in range(0, len(installed), UNINSTALL_BATCH_SIZE):
+            package_names = installed[start : start + UNINSTALL_BATCH_SIZE]
+            script, marker = build_uninstall_script(package_names)
+            output = self.run_shell_script(script)
+            removed, failed = parse_uninstall_script_output(
+                output, package_names, marker
+            )
+
+            with self._cache_lock:
+                for package_name in removed:
+                    index.remove(package_name)
+
+            report.removed.extend(removed)
+            report.failed.update(failed)
+
+        return report
 
     def grant_permissions(self, package, permissions: List[str]):
-        for permission in permissions:
-            self.grant_permission(package, permission)
+        with self.batch():
+            for permission in permissions:
+                self.grant_permission(package, permission)
 
     def revoke_permissions(self, package, permissions: List[str]):
-        for permission in permissions:
-            self.revoke_permission(package, permission)
+        with self.batch():
+            for permission in permissions:
+                self.revoke_permission(package, permission)
 
     def google_debloat(self):
         google_packages = self.get_google_packages()
-        self.uninstall_packages(google_packages)
-        return self.output
+        return self.uninstall_packages(google_packages)
 
     def backup(
         self,
@@ -875,22 +2413,136 @@ class Device(ADB):
         self.execute(cmd)
         return self.output
 
-    def get_setting_cmd(self, input: str):
+    def parse_setting(self, input: str):
         # format can be:
         # a) namespace.key=value
         # b) namespace.key value
         # c) namespace.key.other_value value
-        input = input.replace("=", ".", 1).replace(" ", ".").split(".")
-        namespace = input[0]
-        key = input[1:-1]
-        key = key[0] if len(key) == 1 else str.join(".", key)
-        value = input[-1]
+        # values are kept as is, so they can contain dots (e.g. font_scale=1.1)
+        separator = "=" if "=" in input else " "
+        setting, _, value = input.partition(separator)
+        namespace, _, key = setting.strip().partition(".")
+
+        return namespace, key, value.strip()
+
+    def get_setting_cmd(self, input: str):
+        namespace, key, value = self.parse_setting(input)
         output = f"{namespace} {key} {value}"
 
         return output
 
     def set_settings(self, settings: List[str]):
-        for setting in settings:
-            setting_cmd = self.get_setting_cmd(setting)
-            cmd = "shell settings put {0}".format(setting_cmd)
-            self.execute(cmd)
+        with self.batch():
+            for setting in settings:
+                setting_cmd = self.get_setting_cmd(setting)
+                cmd = "shell settings put {0}".format(setting_cmd)
+                self.execute(cmd)
+
+    @contextmanager
+    def batch(self, max_script_length: int = MAX_SCRIPT_LENGTH, raise_errors=True):
+        """
+        Queues the shell commands of this thread within the context, and runs
+        them as one script (or several, above max_script_length) on exit.
+
+        with device.batch() as batch:
+            model = device.execute("shell getprop ro.product.model")
+            device.grant_permission(package, permission)
+        print(model.value)
+
+        Command methods return a BatchCall inside the context, whose value is
+        set once the batch has run. Other commands, e.g. push, run the queued
+        commands first. If raise_errors is set, the first failed command's
+        error is raised on exit. Nested batches join the outer batch. Methods
+        that read the results of their own commands (e.g. get_model or
+        uninstall_packages) run the queued commands first, and then run directly.
+        """
+        state = self._thread_state
+        current = getattr(state, "batch", None)
+
+        if current is not None:
+            yield current
+            return
+
+        batch = CommandBatch(self.run_shell_script, max_script_length)
+        state.batch = batch
+
+        try:
+            yield batch
+        except BaseException as e:
+            batch.cancel(RuntimeError(f"Batch aborted: {e!r}"))
+            raise
+        finally:
+            state.batch = None
+
+        batch.flush()
+        if raise_errors and batch.errors:
+            raise batch.errors[0]
+
+    def _flush_batch(self, batch: CommandBatch):
+        state = self._thread_state
+        state.batch = None
+
+        try:
+            batch.flush()
+        finally:
+            state.batch = batch
+
+    @command("shell", logging=False)
+    def run_shell_script(self, script: str):
+        """
+        Runs a shell script on the device in a single round trip.
+        The script is passed to the device's shell as is.
+        """
+        return self.output
+
+    @command("exec-out", logging=False)
+    def exec_out(self, command: str) -> bytes:
+        """
+        Runs command on the device and returns its raw output, which is never
+        decoded, e.g. exec_out("screencap -p") returns png bytes.
+        """
+        return self.result.stdout
+
+    @command("exec-out", logging=False, stream="chunks")
+    def stream_exec_out(self, command: str) -> Iterator[bytes]:
+        """Yields the raw output of command in chunks, as it arrives."""
+        return self.output
+
+    def screencap(self, path: str = None) -> bytes:
+        """Returns a screenshot as png bytes, and writes it to path if given."""
+        png = self.exec_out("screencap -p")
+
+        if path is not None:
+            with open(path, "wb") as file:
+                file.write(png)
+
+        return png
+
+    @unbatched
+    def apply_settings(self, settings: List[str]) -> SettingsReport:
+        """
+        Applies settings that differ from the device's current settings, in a
+        single shell invocation. Accepts the same format as set_settings.
+        """
+        desired = [self.parse_setting(setting) for setting in settings]
+        namespaces = {namespace for namespace, key, value in desired}
+
+        current = {
+            namespace: dict(self.iter_settings(namespace)) for namespace in namespaces
+        }
+        changes, unchanged = diff_settings(current, desired)
+        report = SettingsReport(unchanged=[setting_name(s) for s in unchanged])
+
+        if not changes:
+            return report
+
+        script, marker = build_settings_script(changes)
+        output = self.run_shell_script(script)
+        report.failed = parse_settings_script_output(output, changes, marker)
+
+        for namespace, key, value in changes:
+            name = setting_name((namespace, key, value))
+            if name not in report.failed:
+                report.changed[name] = (current[namespace].get(key), value)
+
+        return report
@@ -0,0 +1,188 @@
+import asyncio
+import time
+from typing import List
+
+from . import adb as _adb
+from .adb import (
+    ADB,
+    CommandSpec,
+    Device,
+    _build_command_args,
+    _handle_output,
+    is_valid_command,
+)
+from .scheduler import CancellationToken
+from .transport import split_command_args
+
+
+async def run_command_args(command_args: List[str], timeout: float = None):
+    """
+    Runs command args as a child process and returns a (return code, output) tuple.
+    The child process is killed if the call times out or is cancelled.
+    """
+    _adb.command_checked, sdk_path = is_valid_command(
+        command_args[0], _adb.command_checked
+    )
+
+    process = await asyncio.create_subprocess_exec(
+        *command_args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+    )
+
+    try:
+        output, _ = await asyncio.wait_for(process.communicate(), timeout)
+    except BaseException:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
+
+    return process.returncode, output
+
+
+class AsyncADB:
+    """
+    asyncio counterpart of ADB. Methods decorated with @command run their adb
+    command as an asyncio child process and are then parsed by the same method
+    bodies as the sync api. Every other method runs in a worker thread.
+
+    All methods accept a timeout keyword argument, in seconds. The adb processes
+    of calls that time out or are cancelled are killed.
+    """
+
+    def __init__(self, adb: ADB = None, timeout: float = None) -> None:
+        self.adb = adb if adb is not None else ADB()
+        self.timeout = timeout
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.adb, name)
+
+        if not callable(attr):
+            return attr
+
+        async def method(*args, **kwargs):
+            return await self.call(name, *args, **kwargs)
+
+        method.__name__ = name
+        return method
+
+    def _uses_adb_process(self, command_args: List[str]) -> bool:
+        serial, args = split_command_args(command_args)
+
+        if self.adb.shell_session is not None and args[:1] == ["shell"]:
+            return False
+
+        if self.adb.scheduler is not None:
+            # scheduled commands run in the scheduler's worker threads
+            return False
+
+        transport = self.adb.transport
+        return transport is None or not transport.supports(command_args)
+
+    async def run_spec(
+        self, spec: CommandSpec, args: tuple, kwargs: dict, timeout=None
+    ):
+        if timeout is None:
+            timeout = self.timeout
+
+        command_args, args = _build_command_args(self.adb, spec, args)
+
+        start = time.perf_counter()
+
+        if self._uses_adb_process(command_args):
+            result = await run_command_args(command_args, timeout)
+        else:
+            result = await self.run_in_thread(
+                self.adb._run_command_args, (command_args,), {}, timeout
+            )
+
+        return_code, output = result
+        duration = time.perf_counter() - start
+        _handle_output(self.adb, spec, command_args, return_code, output, duration)
+        return spec.func(self.adb, *args, **kwargs)
+
+    async def run_in_thread(self, func, args: tuple, kwargs: dict, timeout=None):
+        """
+        Calls func in a worker thread. Its commands get the timeout and a
+        cancellation token, so their adb processes are killed once the call
+        times out or is cancelled.
+        """
+        token = CancellationToken()
+
+        def run():
+            with self.adb.command_options(timeout=timeout, token=token):
+                return func(*args, **kwargs)
+
+        try:
+            return await asyncio.wait_for(asyncio.to_thread(run), timeout)
+        except BaseException:
+            token.cancel()
+            raise
+
+    async def call(self, name: str, *args, timeout: float = None, **kwargs):
+        spec: CommandSpec = getattr(getattr(type(self.adb), name), "command_spec", None)
+
+        if spec is None or spec.stream:
+            return await self.run_in_thread(
+                getattr(self.adb, name),
+                args,
+                kwargs,
+                timeout if timeout is not None else self.timeout,
+            )
+
+        return await self.run_spec(spec, args, kwargs, timeout)
+
+    async def execute(
+        self,
+        command_args: str,
+        logging: bool = True,
+        base_cmd: str = "adb",
+        log_cmd: bool = False,
+        root: bool = False,
+        timeout: float = None,
+    ):
+        """
+        Executes an adb command and returns its output.
+        """
+        spec = CommandSpec(
+            base_cmd, command_args, logging, log_cmd, root, lambda cls: cls.output
+        )
+        return await self.run_spec(spec, (), {}, timeout)
+
+    async def get_devices(self, timeout: float = None) -> List["AsyncDevice"]:
+        devices = await self.call("get_devices", timeout=timeout)
+        return [AsyncDevice(device, self.timeout) for device in devices]
+
+    async def get_device(self, device_id: str = None, timeout: float = None):
+        devices = await self.get_devices(timeout=timeout)
+
+        if not device_id:
+            if len(devices) > 0:
+                return devices[0]
+            else:
+                raise ValueError("No devices found.")
+
+        return next((device for device in devices if device.id == device_id), None)
+
+
+class AsyncDevice(AsyncADB):
+    """
+    asyncio counterpart of Device.
+
+    devices = await AsyncADB().get_devices()
+    models = await asyncio.gather(*(device.get_model() for device in devices))
+    """
+
+    def __init__(self, device: Device, timeout: float = None) -> None:
+        if not isinstance(device, Device):
+            device = Device(device)
+
+        super().__init__(device, timeout)
+
+    @property
+    def id(self):
+        return self.adb.id
+
+    def __repr__(self) -> str:
+        return f"AsyncDevice({self.id})"
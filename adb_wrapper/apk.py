@@ -0,0 +1,306 @@
+"""
+Reads the package name, versionCode and signing certificate of an apk without
+the android build tools.
+
+The package name and versionCode come from the binary AndroidManifest.xml. The
+certificate is the first signer's certificate of the APK Signature Scheme v3 or
+v2 block, falling back to the v1 (jar) PKCS#7 signature in META-INF.
+"""
+
+import hashlib
+import os
+import struct
+import threading
+import zipfile
+import zlib
+from typing import Dict, NamedTuple, Optional, Tuple
+
+MANIFEST_PATH = "AndroidManifest.xml"
+
+_RES_STRING_POOL_TYPE = 0x0001
+_RES_XML_TYPE = 0x0003
+_RES_XML_START_ELEMENT_TYPE = 0x0102
+_RES_XML_RESOURCE_MAP_TYPE = 0x0180
+
+_UTF8_FLAG = 0x100
+_NO_ENTRY = 0xFFFFFFFF
+_TYPE_STRING = 0x03
+_VERSION_CODE_RESOURCE_ID = 0x0101021B
+
+_EOCD_MAGIC = b"PK\x05\x06"
+_SIGNING_BLOCK_MAGIC = b"APK Sig Block 42"
+_SIGNATURE_SCHEMES = (("v3", 0xF05368C0), ("v2", 0x7109871A))
+_V1_SIGNATURE_EXTENSIONS = (".RSA", ".DSA", ".EC")
+
+
+class ApkError(ValueError):
+    pass
+
+
+class ApkInfo(NamedTuple):
+    package_name: str
+    version_code: int
+    certificate_sha256: Optional[str] = None
+    signature_scheme: Optional[str] = None  # v3, v2, v1 or None if unsigned
+
+
+def _read_string(data: bytes, offset: int, utf8: bool) -> str:
+    if utf8:
+        # utf-16 length, then utf-8 length, each 1 or 2 bytes
+        for _ in range(2):
+            length = data[offset]
+            offset += 1
+            if length & 0x80:
+                length = ((length & 0x7F) << 8) | data[offset]
+                offset += 1
+        return data[offset : offset + length].decode("utf-8", errors="replace")
+
+    (length,) = struct.unpack_from("<H", data, offset)
+    offset += 2
+    if length & 0x8000:
+        (low,) = struct.unpack_from("<H", data, offset)
+        length = ((length & 0x7FFF) << 16) | low
+        offset += 2
+    return data[offset : offset + length * 2].decode("utf-16-le", errors="replace")
+
+
+def _parse_string_pool(data: bytes, start: int, header_size: int) -> list:
+    count, _, flags, strings_start, _ = struct.unpack_from("<5I", data, start + 8)
+    offsets = struct.unpack_from(f"<{count}I", data, start + header_size)
+    utf8 = bool(flags & _UTF8_FLAG)
+
+    return [
+        _read_string(data, start + strings_start + offset, utf8) for offset in offsets
+    ]
+
+
+def parse_manifest_attributes(data: bytes, element: str = "manifest") -> dict:
+    """
+    Returns the attributes of the first element with the given name in a binary
+    xml document. Attribute names are resolved through the resource map, so
+    versionCode is found even when attribute names are obfuscated.
+    """
+    if len(data) < 8 or struct.unpack_from("<H", data)[0] != _RES_XML_TYPE:
+        raise ApkError("Not a binary xml document.")
+
+    strings = []
+    resource_ids = []
+    offset = struct.unpack_from("<H", data, 2)[0]
+
+    while offset + 8 <= len(data):
+        chunk_type, header_size, size = struct.unpack_from("<HHI", data, offset)
+        if size < 8:
+            raise ApkError(f"Invalid chunk size at offset {offset}.")
+
+        if chunk_type == _RES_STRING_POOL_TYPE:
+            strings = _parse_string_pool(data, offset, header_size)
+        elif chunk_type == _RES_XML_RESOURCE_MAP_TYPE:
+            count = (size - header_size) // 4
+            resource_ids = struct.unpack_from(f"<{count}I", data, offset + header_size)
+        elif chunk_type == _RES_XML_START_ELEMENT_TYPE:
+            ext = offset + header_size
+            _, name_idx, attr_start, attr_size, attr_count = struct.unpack_from(
+                "<IIHHH", data, ext
+            )
+
+            if strings[name_idx] == element:
+                attributes = {}
+
+                for i in range(attr_count):
+                    attr = ext + attr_start + i * attr_size
+                    _, name_idx, raw, _, _, value_type, value = struct.unpack_from(
+                        "<IIIHBBI", data, attr
+                    )
+
+                    name = strings[name_idx]
+                    if name_idx < len(resource_ids):
+                        if resource_ids[name_idx] == _VERSION_CODE_RESOURCE_ID:
+                            name = "versionCode"
+
+                    if raw != _NO_ENTRY:
+                        attributes[name] = strings[raw]
+                    elif value_type == _TYPE_STRING:
+                        attributes[name] = strings[value]
+                    else:
+                        # ints, booleans and resource references as raw data
+                        attributes[name] = value
+
+                return attributes
+
+        offset += size
+
+    raise ApkError(f"No <{element}> element found.")
+
+
+def _length_prefixed(data: bytes, offset: int) -> Tuple[bytes, int]:
+    (length,) = struct.unpack_from("<I", data, offset)
+    start = offset + 4
+    if start + length > len(data):
+        raise ApkError("Truncated length-prefixed value.")
+    return data[start : start + length], start + length
+
+
+def _read_signing_block(file) -> Optional[bytes]:
+    # the signing block sits right before the zip central directory
+    file.seek(0, os.SEEK_END)
+    file_size = file.tell()
+    tail_size = min(file_size, 0xFFFF + 22)
+    file.seek(file_size - tail_size)
+    tail = file.read()
+
+    eocd = tail.rfind(_EOCD_MAGIC)
+    if eocd < 0:
+        raise ApkError("Not a zip file.")
+
+    (central_directory,) = struct.unpack_from("<I", tail, eocd + 16)
+    if central_directory < 24:
+        return None
+
+    file.seek(central_directory - 24)
+    footer = file.read(24)
+    if footer[8:] != _SIGNING_BLOCK_MAGIC:
+        return None
+
+    (block_size,) = struct.unpack_from("<Q", footer)
+    file.seek(central_directory - block_size - 8)
+    # pairs start after the leading size and end before the footer
+    return file.read(block_size + 8)[8:-24]
+
+
+def _certificate_from_signing_block(block: bytes) -> Tuple[bytes, str]:
+    pairs = {}
+    offset = 0
+
+    while offset + 12 <= len(block):
+        length, block_id = struct.unpack_from("<QI", block, offset)
+        pairs[block_id] = block[offset + 12 : offset + 8 + length]
+        offset += 8 + length
+
+    for scheme, block_id in _SIGNATURE_SCHEMES:
+        if block_id not in pairs:
+            continue
+
+        signers, _ = _length_prefixed(pairs[block_id], 0)
+        signer, _ = _length_prefixed(signers, 0)
+        signed_data, _ = _length_prefixed(signer, 0)
+        _, offset = _length_prefixed(signed_data, 0)  # digests
+        certificates, _ = _length_prefixed(signed_data, offset)
+        certificate, _ = _length_prefixed(certificates, 0)
+        return certificate, scheme
+
+    return None, None
+
+
+def _read_der(data: bytes, offset: int) -> Tuple[int, int, int]:
+    """Returns the tag, content start and end of the DER value at offset."""
+    tag = data[offset]
+    length = data[offset + 1]
+    start = offset + 2
+
+    if length & 0x80:
+        size = length & 0x7F
+        length = int.from_bytes(data[start : start + size], "big")
+        start += size
+
+    if start + length > len(data):
+        raise ApkError("Truncated DER value.")
+    return tag, start, start + length
+
+
+def certificate_from_pkcs7(data: bytes) -> bytes:
+    """Returns the first certificate of a DER encoded PKCS#7 SignedData."""
+    _, start, _ = _read_der(data, 0)  # ContentInfo
+    _, start, _ = _read_der(data, _read_der(data, start)[2])  # [0] content
+    _, offset, end = _read_der(data, start)  # SignedData
+
+    while offset < end:
+        tag, start, value_end = _read_der(data, offset)
+        if tag == 0xA0:  # [0] IMPLICIT certificates
+            _, _, certificate_end = _read_der(data, start)
+            return data[start:certificate_end]
+        offset = value_end
+
+    raise ApkError("No certificate in PKCS#7 signature.")
+
+
+def read_apk_info_uncached(path: str) -> ApkInfo:
+    """Raises ApkError if the apk can't be parsed."""
+    try:
+        return _read_apk_info(path)
+    except (struct.error, IndexError, UnicodeDecodeError, zlib.error, EOFError) as e:
+        # truncated or corrupt manifests and signing blocks
+        raise ApkError(f"Malformed apk {path}: {e}") from e
+
+
+def _read_apk_info(path: str) -> ApkInfo:
+    with open(path, "rb") as file:
+        try:
+            with zipfile.ZipFile(file) as apk:
+                manifest = apk.read(MANIFEST_PATH)
+                v1_signatures = sorted(
+                    name
+                    for name in apk.namelist()
+                    if name.startswith("META-INF/")
+                    and name.upper().endswith(_V1_SIGNATURE_EXTENSIONS)
+                )
+                v1_signature = apk.read(v1_signatures[0]) if v1_signatures else None
+        except (zipfile.BadZipFile, KeyError) as e:
+            raise ApkError(f"Invalid apk {path}: {e}") from e
+
+        block = _read_signing_block(file)
+
+    attributes = parse_manifest_attributes(manifest)
+    if "package" not in attributes:
+        raise ApkError(f"Missing package name in {path}.")
+
+    try:
+        version_code = int(attributes.get("versionCode", 0))
+    except ValueError as e:
+        raise ApkError(f"Invalid versionCode in {path}.") from e
+
+    certificate, scheme = (
+        _certificate_from_signing_block(block) if block else (None, None)
+    )
+
+    if certificate is None and v1_signature is not None:
+        certificate, scheme = certificate_from_pkcs7(v1_signature), "v1"
+
+    return ApkInfo(
+        attributes["package"],
+        version_code,
+        hashlib.sha256(certificate).hexdigest() if certificate else None,
+        scheme,
+    )
+
+
+_apk_info_cache: Dict[str, ApkInfo] = {}
+_apk_info_lock = threading.Lock()
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def read_apk_info(path: str) -> ApkInfo:
+    """
+    Returns the ApkInfo of an apk, cached by the file's sha256, so renamed or
+    copied apks are only parsed once.
+    """
+    path = os.fspath(path)
+    key = file_sha256(path)
+
+    with _apk_info_lock:
+        info = _apk_info_cache.get(key)
+
+    if info is None:
+        info = read_apk_info_uncached(path)
+        with _apk_info_lock:
+            _apk_info_cache[key] = info
+
+    return info
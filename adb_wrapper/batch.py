@@ -0,0 +1,138 @@
+"""
+Batches shell commands into scripts, so N commands cost one adb round trip.
+"""
+
+import time
+from typing import Any, Callable, List
+
+from .scripts import build_script, parse_script_output, split_commands
+
+# the longest script sent in one call. adb sends the command as a single request,
+# whose length older adbd versions limit to a few KiB, and the device's shell
+# limits the length of its arguments
+MAX_SCRIPT_LENGTH = 16 * 1024
+
+
+class BatchCall:
+    """
+    The placeholder result of a command queued in a batch. value holds what the
+    command method returns once the batch has run.
+    """
+
+    def __init__(self, command_line: str, finish: Callable[[int, str, float], Any]):
+        self.command_line = command_line
+        self.finish = finish
+        self.done = False
+        self.error: BaseException = None
+        self._value = None
+
+    def set_output(self, return_code: int, output: str, duration: float):
+        try:
+            self._value = self.finish(return_code, output, duration)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+
+    def set_error(self, error: BaseException):
+        self.error = error
+        self.done = True
+
+    @property
+    def ok(self) -> bool:
+        return self.done and self.error is None
+
+    @property
+    def value(self):
+        if not self.done:
+            raise RuntimeError("The batch hasn't run yet.")
+        if self.error is not None:
+            raise self.error
+        return self._value
+
+    def __bool__(self) -> bool:
+        # a pending call would always be true, e.g. in `if device.file_exists(path):`
+        if not self.done:
+            raise RuntimeError(
+                f"The batch hasn't run yet, {self.command_line} has no value to test."
+            )
+        return bool(self.value)
+
+    def __repr__(self) -> str:
+        if not self.done:
+            status = "pending"
+        else:
+            status = "ok" if self.ok else f"error: {self.error!r}"
+        return f"BatchCall({self.command_line}: {status})"
+
+
+class CommandBatch:
+    """
+    Queues shell command lines and runs them as scripts with run_script, at
+    most max_script_length characters each. Every command's exit status and
+    output are demultiplexed back into its BatchCall.
+    """
+
+    def __init__(
+        self,
+        run_script: Callable[[str], str],
+        max_script_length: int = MAX_SCRIPT_LENGTH,
+    ) -> None:
+        self.run_script = run_script
+        self.max_script_length = max_script_length
+        self.calls: List[BatchCall] = []
+        self.pending: List[BatchCall] = []
+        self.scripts = 0  # scripts run so far
+
+    def __len__(self) -> int:
+        return len(self.calls)
+
+    def add(
+        self, command_line: str, finish: Callable[[int, str, float], Any]
+    ) -> BatchCall:
+        call = BatchCall(command_line, finish)
+        self.calls.append(call)
+        self.pending.append(call)
+        return call
+
+    def flush(self):
+        """Runs the pending commands."""
+        pending, self.pending = self.pending, []
+        lines = [call.command_line for call in pending]
+
+        for chunk in split_commands(lines, self.max_script_length):
+            calls = [pending[idx] for idx in chunk]
+            script, marker = build_script(
+                [call.command_line for call in calls], subshells=True
+            )
+
+            start = time.perf_counter()
+            try:
+                output = self.run_script(script)
+            except Exception as e:
+                for call in calls:
+                    call.set_error(e)
+                continue
+            finally:
+                self.scripts += 1
+
+            # every command is credited with the duration of its script
+            duration = time.perf_counter() - start
+            results = parse_script_output(output, marker, len(calls))
+
+            for call, result in zip(calls, results):
+                if result is None:
+                    call.set_error(
+                        RuntimeError(f"Batched command didn't run: {call.command_line}")
+                    )
+                else:
+                    call.set_output(*result, duration)
+
+    def cancel(self, error: BaseException):
+        for call in self.pending:
+            call.set_error(error)
+        self.pending = []
+
+    @property
+    def errors(self) -> List[BaseException]:
+        return [call.error for call in self.calls if call.error is not None]
@@ -0,0 +1,64 @@
+"""
+Loading of the google.json package catalogue.
+
+google.json is precompiled into the _google_catalogue module, which is imported
+from its cached bytecode instead of parsing json. Regenerate it after editing
+google.json with:
+
+    python -m adb_wrapper.catalogue
+"""
+
+import json
+import os
+from functools import lru_cache
+from importlib import resources
+from typing import Tuple
+
+CATALOGUE_FIELDS = ("package_name", "name", "genre", "img_src")
+
+_source_file = "google.json"
+_compiled_module = "_google_catalogue.py"
+
+
+def read_catalogue_source() -> Tuple[dict, ...]:
+    with resources.files(__package__).joinpath(_source_file).open() as file:
+        return tuple(json.load(file))
+
+
+@lru_cache(maxsize=None)
+def load_catalogue_entries() -> Tuple[dict, ...]:
+    """
+    Returns the catalogue entries, loaded once per process.
+    """
+    try:
+        from ._google_catalogue import PACKAGES
+    except ImportError:
+        return read_catalogue_source()
+
+    return tuple(dict(zip(CATALOGUE_FIELDS, package)) for package in PACKAGES)
+
+
+def compile_catalogue(output_path: str = None) -> str:
+    """
+    Writes the catalogue entries as a python module of tuples.
+    """
+    if output_path is None:
+        output_path = os.path.join(os.path.dirname(__file__), _compiled_module)
+
+    lines = [
+        f"# generated from {_source_file} by `python -m adb_wrapper.catalogue`, "
+        "do not edit",
+        "PACKAGES = (",
+    ]
+    for entry in read_catalogue_source():
+        lines.append(f"    {tuple(entry.get(key) for key in CATALOGUE_FIELDS)!r},")
+    lines.append(")")
+
+    with open(output_path, "w") as file:
+        file.write("\n".join(lines) + "\n")
+
+    return output_path
+
+
+if __name__ == "__main__":
+    print(f"Compiled catalogue to {compile_catalogue()}.")
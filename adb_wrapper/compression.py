@@ -0,0 +1,91 @@
+"""
+Compression policies for adb push and pull.
+
+A policy is None (adb's default), "none" (-Z), "auto" or an algorithm passed to
+adb's -z option. auto compresses files unless their extension is a compressed
+format, or a sample of a local file doesn't shrink with zlib.
+"""
+
+import os
+import zlib
+from typing import List
+
+COMPRESSION_ALGORITHMS = ("any", "brotli", "lz4", "zstd")
+COMPRESSION_POLICIES = ("none", "auto") + COMPRESSION_ALGORITHMS
+
+# the algorithm auto uses for compressible files, adb picks the best supported one
+AUTO_ALGORITHM = "any"
+
+COMPRESSED_EXTENSIONS = frozenset(
+    (
+        # images, audio and video
+        ".jpg", ".jpeg", ".png", ".gif", ".webp", ".heic", ".heif", ".avif",
+        ".mp4", ".m4v", ".mkv", ".webm", ".3gp", ".mov",
+        ".mp3", ".m4a", ".aac", ".ogg", ".opus", ".flac",
+        # archives and packages
+        ".zip", ".apk", ".apks", ".aab", ".jar", ".obb",
+        ".gz", ".tgz", ".xz", ".bz2", ".zst", ".br", ".lz4", ".7z", ".rar",
+    )
+)  # fmt: skip
+
+COMPRESSIBLE_EXTENSIONS = frozenset(
+    (
+        ".txt", ".log", ".csv", ".tsv", ".json", ".xml", ".html", ".htm",
+        ".js", ".css", ".md", ".ini", ".conf", ".prop", ".yaml", ".yml",
+        ".db", ".sqlite", ".bmp", ".wav", ".tar",
+    )
+)  # fmt: skip
+
+SAMPLE_SIZE = 64 * 1024
+# compressed samples above this fraction of their size aren't worth compressing
+MAX_COMPRESSION_RATIO = 0.9
+
+
+def validate_policy(policy: str):
+    if policy is not None and policy not in COMPRESSION_POLICIES:
+        raise ValueError(
+            f"Unsupported compression '{policy}', use one of {COMPRESSION_POLICIES}."
+        )
+
+
+def is_compressible(path: str, local: bool = True) -> bool:
+    """
+    Guesses whether a file compresses well, from its extension and, for local
+    files, from compressing a sample taken from its middle.
+    """
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension in COMPRESSED_EXTENSIONS:
+        return False
+    if extension in COMPRESSIBLE_EXTENSIONS or not local:
+        return True
+
+    try:
+        with open(path, "rb") as file:
+            size = file.seek(0, os.SEEK_END)
+            file.seek(max(0, size // 2 - SAMPLE_SIZE // 2))
+            sample = file.read(SAMPLE_SIZE)
+    except OSError:
+        return True
+
+    if len(sample) < 512:
+        # too small for compression to matter
+        return False
+
+    return len(zlib.compress(sample, 1)) < len(sample) * MAX_COMPRESSION_RATIO
+
+
+def compression_flags(policy: str, path: str = None, local: bool = True) -> List[str]:
+    """Returns the adb push/pull options of a policy for the file at path."""
+    validate_policy(policy)
+
+    if policy is None:
+        return []
+    if policy == "none":
+        return ["-Z"]
+    if policy == "auto":
+        if not is_compressible(path, local):
+            return ["-Z"]
+        policy = AUTO_ALGORITHM
+
+    return ["-z", policy]
@@ -0,0 +1,298 @@
+"""
+Keeps a set of TCP/IP (wireless debugging) devices connected.
+"""
+
+import random
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List
+
+from .adb import ADB, Device
+
+DEFAULT_TCPIP_PORT = 5555
+# adb connect exits with 0 on some failures, so its output is checked as well
+CONNECTED_OUTPUTS = ("connected to", "already connected to")
+
+
+@dataclass
+class Endpoint:
+    address: str  # ip:port
+    state: str = "disconnected"  # connecting, connected or disconnected
+    attempts: int = 0  # failed connects since the last success
+    last_error: str = None
+    next_attempt: float = 0.0  # time.monotonic() of the next connect
+    disconnected_at: float = None  # when a connection was lost
+    reconnects: int = 0
+    latencies: List[float] = field(default_factory=list)  # lost to reconnected
+
+    def __repr__(self) -> str:
+        error = f", {self.last_error!r}" if self.last_error else ""
+        return f"Endpoint({self.address}: {self.state}{error})"
+
+
+@dataclass
+class ConnectionMetrics:
+    states: Dict[str, int]
+    reconnects: int
+    latencies: List[float]  # seconds from losing a connection to reconnecting
+
+    @property
+    def mean_latency(self) -> float:
+        return statistics.fmean(self.latencies) if self.latencies else 0.0
+
+    @property
+    def max_latency(self) -> float:
+        return max(self.latencies, default=0.0)
+
+    def __repr__(self) -> str:
+        states = ", ".join(f"{state}={n}" for state, n in sorted(self.states.items()))
+        return (
+            f"ConnectionMetrics({states}, reconnects={self.reconnects}, "
+            f"latency mean={self.mean_latency:.2f}s max={self.max_latency:.2f}s)"
+        )
+
+
+def normalize_endpoint(address: str, port: int = DEFAULT_TCPIP_PORT) -> str:
+    return address if ":" in address else f"{address}:{port}"
+
+
+def backoff_delay(
+    attempts: int, base_delay: float, max_delay: float, rng: random.Random = random
+) -> float:
+    """
+    Returns a random delay between 0 and the exponential backoff of attempts
+    ("full jitter"), so failed devices don't retry in lockstep.
+    """
+    return rng.uniform(0, min(max_delay, base_delay * 2**attempts))
+
+
+class ConnectionManager:
+    """
+    Keeps a target set of ip:port endpoints connected.
+
+    manager = ConnectionManager(["192.168.1.20:5555", "192.168.1.21:5555"])
+    manager.connect_all(timeout=30)
+    manager.start()  # probes and reconnects in the background
+    devices = manager.get_devices()
+
+    Endpoints are probed with get-state, which costs no process when the adb
+    has an AdbServerTransport. Lost endpoints are reconnected in parallel, right
+    away and then with jittered exponential backoff while connecting fails.
+    """
+
+    def __init__(
+        self,
+        endpoints: Iterable[str] = (),
+        adb: ADB = None,
+        max_workers: int = 16,
+        probe_interval: float = 5.0,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+    ) -> None:
+        self.adb = adb if adb is not None else ADB()
+        self.max_workers = max_workers
+        self.probe_interval = probe_interval
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.endpoints: Dict[str, Endpoint] = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread: threading.Thread = None
+
+        for address in endpoints:
+            self.add(address)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def add(self, address: str) -> Endpoint:
+        address = normalize_endpoint(address)
+
+        with self.lock:
+            if address not in self.endpoints:
+                self.endpoints[address] = Endpoint(address)
+            return self.endpoints[address]
+
+    def remove(self, address: str, disconnect: bool = True):
+        address = normalize_endpoint(address)
+
+        with self.lock:
+            endpoint = self.endpoints.pop(address, None)
+
+        if endpoint is not None and disconnect:
+            self._run("disconnect", address)
+
+    def enable_tcpip(self, device: Device, port: int = DEFAULT_TCPIP_PORT) -> Endpoint:
+        """Switches a usb device to tcpip mode and adds its endpoint."""
+        ip = device.get_device_ip()
+        if ip is None:
+            raise ValueError(f"Device {device.id} has no ip address.")
+
+        device.enable_tcpip_mode(port)
+        return self.add(f"{ip}:{port}")
+
+    def _run(self, *args: str):
+        # _run_command_args doesn't touch the adb's output, so it is thread safe
+        return_code, output = self.adb._run_command_args(["adb", *args])
+        return return_code, output.decode(errors="backslashreplace").strip()
+
+    def probe(self, address: str) -> bool:
+        return_code, output = self._run("-s", address, "get-state")
+        return return_code == 0 and output == "device"
+
+    def connect(self, endpoint: Endpoint) -> bool:
+        with self.lock:
+            endpoint.state = "connecting"
+
+        return_code, output = self._run("connect", endpoint.address)
+        connected = (
+            return_code == 0
+            and output.startswith(CONNECTED_OUTPUTS)
+            and self.probe(endpoint.address)
+        )
+        now = time.monotonic()
+
+        with self.lock:
+            if connected:
+                if endpoint.disconnected_at is not None:
+                    endpoint.latencies.append(now - endpoint.disconnected_at)
+                    endpoint.reconnects += 1
+
+                endpoint.state = "connected"
+                endpoint.attempts = 0
+                endpoint.last_error = None
+                endpoint.disconnected_at = None
+            else:
+                endpoint.state = "disconnected"
+                endpoint.last_error = output
+                endpoint.next_attempt = now + backoff_delay(
+                    endpoint.attempts, self.base_delay, self.max_delay
+                )
+                endpoint.attempts += 1
+
+        return connected
+
+    def _mark_lost(self, endpoint: Endpoint):
+        with self.lock:
+            endpoint.state = "disconnected"
+            endpoint.disconnected_at = time.monotonic()
+            endpoint.next_attempt = 0.0
+            endpoint.attempts = 0
+
+    def _keep_alive(self, endpoint: Endpoint):
+        if endpoint.state == "connected":
+            if self.probe(endpoint.address):
+                return
+            self._mark_lost(endpoint)
+
+        if time.monotonic() >= endpoint.next_attempt:
+            self.connect(endpoint)
+
+    def check(self) -> Dict[str, str]:
+        """
+        Probes connected endpoints and connects the others whose backoff has
+        expired, all in parallel. Returns the state of every endpoint.
+        """
+        with self.lock:
+            endpoints = list(self.endpoints.values())
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(self._keep_alive, endpoints))
+
+        return self.states()
+
+    def _next_check_delay(self) -> float:
+        with self.lock:
+            retries = [
+                endpoint.next_attempt
+                for endpoint in self.endpoints.values()
+                if endpoint.state != "connected"
+            ]
+
+        delay = self.probe_interval
+        if retries:
+            delay = min(delay, max(0.0, min(retries) - time.monotonic()))
+        return delay
+
+    def connect_all(self, timeout: float = None) -> bool:
+        """Connects every endpoint, returns whether all connected in time."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            if all(state == "connected" for state in self.check().values()):
+                return True
+
+            delay = self._next_check_delay()
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= delay:
+                    return False
+
+            time.sleep(delay)
+
+    def disconnect_all(self):
+        with self.lock:
+            endpoints = list(self.endpoints.values())
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(lambda e: self._run("disconnect", e.address), endpoints))
+
+        with self.lock:
+            for endpoint in endpoints:
+                endpoint.state = "disconnected"
+
+    def start(self) -> "ConnectionManager":
+        """Starts checking the endpoints in the background."""
+        if self.thread is None:
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self._run_checks, daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def _run_checks(self):
+        while not self.stopped.is_set():
+            self.check()
+            self.stopped.wait(self._next_check_delay())
+
+    def states(self) -> Dict[str, str]:
+        with self.lock:
+            return {address: e.state for address, e in self.endpoints.items()}
+
+    def get_devices(self) -> List[Device]:
+        """Returns the connected endpoints as Device objects."""
+        return [
+            Device(
+                address,
+                transport=self.adb.transport,
+                state="device",
+                scheduler=self.adb.scheduler,
+            )
+            for address, state in self.states().items()
+            if state == "connected"
+        ]
+
+    def metrics(self) -> ConnectionMetrics:
+        with self.lock:
+            endpoints = list(self.endpoints.values())
+            return ConnectionMetrics(
+                states=dict(Counter(endpoint.state for endpoint in endpoints)),
+                reconnects=sum(endpoint.reconnects for endpoint in endpoints),
+                latencies=[
+                    latency for endpoint in endpoints for latency in endpoint.latencies
+                ],
+            )
@@ -0,0 +1,189 @@
+"""
+Finds devices listening for adb over TCP/IP and connects them.
+
+Subnets are probed with asyncio socket connects, thousands at a time, so an
+unreachable address costs one probe timeout in parallel with all the others.
+"""
+
+import asyncio
+import ipaddress
+from typing import Iterable, List, Union
+
+from .adb import ADB, Device
+from .aio import run_command_args
+from .connections import CONNECTED_OUTPUTS, DEFAULT_TCPIP_PORT
+
+MAX_PROBES = 4096
+MAX_CONNECTS = 64
+# seconds an adb connect, get-state or mdns services call may take
+CONNECT_TIMEOUT = 10
+# mdns service types adb can connect to, _adb-tls-pairing is for pairing only
+MDNS_CONNECT_SERVICES = ("_adb._tcp", "_adb-tls-connect._tcp")
+
+
+def default_max_probes() -> int:
+    """MAX_PROBES, capped to half the open file limit as every probe is a socket."""
+    try:
+        import resource
+    except ImportError:
+        return MAX_PROBES
+
+    soft_limit, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft_limit == resource.RLIM_INFINITY:
+        return MAX_PROBES
+    return max(1, min(MAX_PROBES, soft_limit // 2))
+
+
+def iter_hosts(network: Union[str, Iterable[str]]) -> List[str]:
+    """Returns the host addresses of a CIDR range, e.g. 192.168.0.0/22."""
+    if not isinstance(network, str):
+        return list(network)
+
+    return [str(host) for host in ipaddress.ip_network(network, strict=False).hosts()]
+
+
+async def probe(host: str, port: int, timeout: float = 0.5) -> bool:
+    """Whether host accepts tcp connections on port within timeout seconds."""
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True
+
+
+async def scan(
+    network: Union[str, Iterable[str]],
+    port: int = DEFAULT_TCPIP_PORT,
+    timeout: float = 0.5,
+    max_probes: int = None,
+) -> List[str]:
+    """
+    Probes every host of network (a CIDR range or a list of addresses), at most
+    max_probes at a time, and returns the ip:port endpoints that are listening.
+    """
+    hosts = iter_hosts(network)
+    semaphore = asyncio.Semaphore(max_probes or default_max_probes())
+
+    async def bounded_probe(host: str) -> bool:
+        async with semaphore:
+            return await probe(host, port, timeout)
+
+    listening = await asyncio.gather(*(bounded_probe(host) for host in hosts))
+    return [f"{host}:{port}" for host, ok in zip(hosts, listening) if ok]
+
+
+def parse_mdns_services(output: str) -> List[str]:
+    """
+    Parses `adb mdns services` output into the ip:port endpoints that can be
+    connected to.
+    """
+    endpoints = []
+
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) < 3:
+            continue
+
+        service, endpoint = parts[1].rstrip("."), parts[-1]
+        if service in MDNS_CONNECT_SERVICES and ":" in endpoint:
+            endpoints.append(endpoint)
+
+    return endpoints
+
+
+async def mdns_endpoints(timeout: float = CONNECT_TIMEOUT) -> List[str]:
+    try:
+        return_code, output = await run_command_args(
+            ["adb", "mdns", "services"], timeout=timeout
+        )
+    except asyncio.TimeoutError:
+        return []
+
+    if return_code != 0:
+        return []
+    return parse_mdns_services(output.decode(errors="backslashreplace"))
+
+
+async def connect_endpoints(
+    endpoints: Iterable[str],
+    adb: ADB = None,
+    max_connects: int = MAX_CONNECTS,
+    timeout: float = CONNECT_TIMEOUT,
+) -> List[Device]:
+    """
+    Runs adb connect for every endpoint, at most max_connects at a time, and
+    returns the endpoints that connected and are ready (their get-state is
+    device) as Device objects.
+    """
+    adb = adb if adb is not None else ADB()
+    endpoints = list(dict.fromkeys(endpoints))
+    semaphore = asyncio.Semaphore(max_connects)
+
+    async def run(*args: str):
+        async with semaphore:
+            try:
+                return_code, output = await run_command_args(
+                    ["adb", *args], timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                return 1, ""
+
+        return return_code, output.decode(errors="backslashreplace").strip()
+
+    async def connect(endpoint: str) -> bool:
+        return_code, output = await run("connect", endpoint)
+        if return_code != 0 or not output.startswith(CONNECTED_OUTPUTS):
+            return False
+
+        # unauthorized and offline devices connect too
+        return_code, output = await run("-s", endpoint, "get-state")
+        return return_code == 0 and output == "device"
+
+    connected = await asyncio.gather(*(connect(endpoint) for endpoint in endpoints))
+
+    return [
+        Device(
+            endpoint,
+            transport=adb.transport,
+            state="device",
+            scheduler=adb.scheduler,
+        )
+        for endpoint, ok in zip(endpoints, connected)
+        if ok
+    ]
+
+
+async def discover(
+    network: Union[str, Iterable[str]] = None,
+    port: int = DEFAULT_TCPIP_PORT,
+    mdns: bool = False,
+    adb: ADB = None,
+    timeout: float = 0.5,
+    max_probes: int = None,
+    max_connects: int = MAX_CONNECTS,
+    connect_timeout: float = CONNECT_TIMEOUT,
+) -> List[Device]:
+    """
+    Scans network and/or adb's mdns services, connects every endpoint found and
+    returns the connected devices. timeout applies to every socket probe, and
+    connect_timeout to the mdns listing and every adb connect.
+    """
+    endpoints = []
+
+    if network is not None:
+        endpoints += await scan(network, port, timeout, max_probes)
+    if mdns:
+        endpoints += await mdns_endpoints(connect_timeout)
+
+    return await connect_endpoints(endpoints, adb, max_connects, connect_timeout)
+
+
+def discover_devices(*args, **kwargs) -> List[Device]:
+    """Synchronous discover, see discover for the arguments."""
+    return asyncio.run(discover(*args, **kwargs))
@@ -0,0 +1,181 @@
+import time
+from collections import Counter
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass
+from typing import Any, Callable, List
+
+from .adb import ADB, Device
+
+
+@dataclass
+class FleetResult:
+    device: Device
+    result: Any = None
+    error: BaseException = None
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        status = "ok" if self.ok else f"error: {self.error!r}"
+        return f"{self.device.id}: {status} ({self.duration:.2f}s)"
+
+
+def usb_hub(device: Device):
+    """
+    Groups devices by the host of tcp devices, or by the usb hub of usb devices.
+    """
+    if ":" in device.id and "." in device.id:
+        return device.id.rsplit(":", 1)[0]
+
+    usb_path = device.attributes.get("usb")
+    if usb_path:
+        # usb:1-1.2.3 is port 3 of the hub at 1-1.2
+        return usb_path.rsplit(".", 1)[0] if "." in usb_path else usb_path
+
+    return None
+
+
+def _run_on_device(func: Callable, device: Device):
+    start = time.perf_counter()
+
+    try:
+        result = func(device)
+    except Exception as e:
+        return FleetResult(device, error=e, duration=time.perf_counter() - start)
+
+    return FleetResult(device, result=result, duration=time.perf_counter() - start)
+
+
+class Fleet:
+    """
+    Runs an operation on many devices at once.
+
+    fleet = Fleet.from_adb(max_workers=16, max_per_group=4)
+    results = fleet.map(lambda device: device.google_debloat())
+
+    Concurrency is capped per group (usb hub or tcp host by default). A failing
+    device doesn't stop the rest of the fleet, its error is returned as part of
+    its FleetResult. Process executors need picklable functions (no lambdas).
+    """
+
+    def __init__(
+        self,
+        devices: List[Device],
+        max_workers: int = 8,
+        executor: str = "thread",
+        max_per_group: int = None,
+        group_key: Callable[[Device], Any] = usb_hub,
+    ) -> None:
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unsupported executor '{executor}'.")
+        if max_per_group is not None and max_per_group < 1:
+            raise ValueError(f"max_per_group must be at least 1, got {max_per_group}.")
+
+        self.devices = list(devices)
+        self.max_workers = max_workers
+        self.executor = executor
+        self.max_per_group = max_per_group
+        self.group_key = group_key
+
+    @classmethod
+    def from_adb(cls, adb: ADB = None, **kwargs) -> "Fleet":
+        adb = adb if adb is not None else ADB()
+        return cls(adb.get_devices(), **kwargs)
+
+    def __iter__(self):
+        return iter(self.devices)
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def _create_executor(self):
+        if self.executor == "process":
+            return ProcessPoolExecutor(max_workers=self.max_workers)
+        return ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def map(self, func: Callable[[Device], Any]) -> List[FleetResult]:
+        """
+        Calls func with every device and returns a FleetResult per device, in the
+        same order as the fleet's devices.
+        """
+        results = [None] * len(self.devices)
+        pending = list(enumerate(self.devices))
+        running = {}
+        in_flight = Counter()
+
+        def can_start(device: Device) -> bool:
+            group = self.group_key(device)
+            return (
+                self.max_per_group is None
+                or group is None
+                or in_flight[group] < self.max_per_group
+            )
+
+        with self._create_executor() as executor:
+            while pending or running:
+                for item in list(pending):
+                    if len(running) >= self.max_workers:
+                        break
+
+                    idx, device = item
+                    if not can_start(device):
+                        continue
+
+                    pending.remove(item)
+                    in_flight[self.group_key(device)] += 1
+                    running[executor.submit(_run_on_device, func, device)] = item
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                future: Future
+                for future in done:
+                    idx, device = running.pop(future)
+                    in_flight[self.group_key(device)] -= 1
+
+                    try:
+                        results[idx] = future.result()
+                    except Exception as e:
+                        # the worker itself failed, e.g. an unpicklable result
+                        results[idx] = FleetResult(device, error=e)
+
+        return results
+
+    def execute(self, command_args: str, **kwargs) -> List[FleetResult]:
+        """Executes an adb command on every device."""
+        return self.map(_Execute(command_args, kwargs))
+
+    def install(self, packages: list, **kwargs) -> List[FleetResult]:
+        """
+        Installs the same packages on every device, at most max_workers devices
+        at a time. Each FleetResult holds the device's InstallResults, see
+        Device.install_packages for the keyword arguments.
+        """
+        return self.map(_Install(packages, kwargs))
+
+
+class _Execute:
+    # a picklable callable, so Fleet.execute works with process executors
+    def __init__(self, command_args: str, kwargs: dict) -> None:
+        self.command_args = command_args
+        self.kwargs = kwargs
+
+    def __call__(self, device: Device):
+        return device.execute(self.command_args, **self.kwargs)
+
+
+class _Install:
+    def __init__(self, packages: list, kwargs: dict) -> None:
+        self.packages = packages
+        self.kwargs = kwargs
+
+    def __call__(self, device: Device):
+        return device.install_packages(self.packages, **self.kwargs)
@@ -0,0 +1,62 @@
+import os
+import shlex
+from dataclasses import dataclass
+from typing import List, Tuple
+
+
+@dataclass
+class InstallResult:
+    apks: Tuple[str, ...]  # local apk paths, device apk paths or a package name
+    ok: bool = False
+    output: str = ""
+    duration: float = 0.0
+    skipped: bool = False  # up to date, not installed again
+
+    def __repr__(self) -> str:
+        status = "ok" if self.ok else f"failed: {self.output}"
+        status = "skipped" if self.skipped else status
+        return f"{', '.join(self.apks)}: {status} ({self.duration:.2f}s)"
+
+
+def is_local_apk(path) -> bool:
+    return isinstance(path, os.PathLike) or (
+        isinstance(path, str) and os.path.isfile(path)
+    )
+
+
+def build_install_command(
+    apks: List[str],
+    streaming: bool = None,
+    replace: bool = True,
+    multi_package: bool = False,
+    install_args: List[str] = None,
+) -> str:
+    """
+    Returns the adb command installing local apks. A single apk uses `install`,
+    the splits of one app use `install-multiple`, and several apps installed
+    atomically use `install-multi-package`. streaming forces streamed (True) or
+    staged (False) installs, None leaves the choice to adb.
+    """
+    if multi_package:
+        cmd = ["install-multi-package"]
+    else:
+        cmd = ["install-multiple" if len(apks) > 1 else "install"]
+
+    if replace:
+        cmd.append("-r")
+
+    if streaming is not None:
+        cmd.append("--streaming" if streaming else "--no-streaming")
+
+    cmd.extend(install_args or ())
+    cmd.extend(os.fspath(apk) for apk in apks)
+
+    return " ".join(shlex.quote(arg) for arg in cmd)
+
+
+def is_install_success(return_code: int, output: str) -> bool:
+    # adb exits with 0 on some failures of older devices, so the output is checked too
+    if return_code != 0 or "Failure" in output:
+        return False
+    # pm install-existing reports "Package <name> installed for user: <id>"
+    return "Success" in output or "installed for user" in output
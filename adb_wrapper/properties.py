@@ -0,0 +1,112 @@
+import re
+import threading
+import time
+from typing import Iterable, Union
+
+BOOT_ID_PATH = "/proc/sys/kernel/random/boot_id"
+
+_property_pattern = re.compile(r"^\[(.*?)\]: \[(.*)$")
+
+
+def parse_properties(output: Union[str, Iterable[str]]) -> dict:
+    """
+    Parses a bare `getprop` dump of `[key]: [value]` lines into a dictionary.
+    Multi-line values are joined back together.
+    """
+    lines = output.splitlines() if isinstance(output, str) else output
+    properties = {}
+    key = None
+    value = None
+
+    for line in lines:
+        match = _property_pattern.match(line)
+
+        if match:
+            key, value = match.group(1), match.group(2)
+        elif key is not None:
+            value = f"{value}\n{line}"
+        else:
+            continue
+
+        if value.endswith("]"):
+            properties[key] = value[:-1]
+            key = None
+
+    return properties
+
+
+class PropertyCache:
+    """
+    Snapshot of a device's system properties.
+
+    Read-only (ro.*) properties can't change until the device reboots, so they
+    are served for as long as the boot id stays the same, which is rechecked
+    every ttl seconds. Other properties are served for ttl seconds.
+
+    Reads and writes take lock, which callers also hold while they check and
+    reload the cache, so only one thread reloads it.
+    """
+
+    def __init__(self, ttl: float = 60.0) -> None:
+        self.ttl = ttl
+        self.properties: dict = None
+        self.boot_id: str = None
+        self.loaded_at = 0.0
+        self.boot_checked_at = 0.0
+        self.lock = threading.RLock()
+
+    def __getstate__(self):
+        # locks can't be pickled, e.g. for process executors
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+
+    def update(self, boot_id: str, properties: dict):
+        with self.lock:
+            self.boot_id = boot_id
+            self.properties = properties
+            self.loaded_at = self.boot_checked_at = time.monotonic()
+
+    def invalidate(self):
+        with self.lock:
+            self.properties = None
+            self.boot_id = None
+
+    def get(self, prop: str, default: str = "") -> str:
+        with self.lock:
+            if self.properties is None:
+                return default
+            return self.properties.get(prop, default)
+
+    def is_loaded(self) -> bool:
+        return self.properties is not None
+
+    def is_fresh(self, prop: str = None) -> bool:
+        with self.lock:
+            if not self.is_loaded():
+                return False
+
+            checked_at = self.boot_checked_at if is_read_only(prop) else self.loaded_at
+            return time.monotonic() - checked_at < self.ttl
+
+    def needs_boot_check(self, prop: str) -> bool:
+        """Whether prop can be served once the boot id is confirmed unchanged."""
+        with self.lock:
+            return self.is_loaded() and is_read_only(prop) and not self.is_fresh(prop)
+
+    def confirm_boot_id(self, boot_id: str) -> bool:
+        with self.lock:
+            if boot_id and boot_id == self.boot_id:
+                self.boot_checked_at = time.monotonic()
+                return True
+
+            self.invalidate()
+            return False
+
+
+def is_read_only(prop: str) -> bool:
+    return bool(prop) and prop.startswith("ro.")
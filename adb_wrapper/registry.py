@@ -0,0 +1,313 @@
+"""
+A live view of the devices known to the adb server, kept up to date by a single
+track-devices stream instead of polling `adb devices`.
+"""
+
+import asyncio
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .transport import AdbServerTransport
+from .utils import is_valid_command
+
+DEVICE_STATES = ("device", "offline", "unauthorized", "bootloader", "recovery")
+# seconds to wait before reopening the stream, e.g. after the adb server restarted
+RECONNECT_DELAY = 1.0
+
+
+@dataclass
+class DeviceEvent:
+    kind: str  # attach, detach or change
+    device: Any
+    previous_state: Optional[str] = None
+
+    def __repr__(self) -> str:
+        return f"DeviceEvent({self.kind} {self.device.id}: {self.device.state})"
+
+
+def parse_device_list(output: str) -> Dict[str, Tuple[str, dict]]:
+    """
+    Parses `adb devices -l` output, or a track-devices message, into a
+    dictionary of serial: (state, attributes).
+    """
+    devices = {}
+
+    for line in output.splitlines():
+        parts = line.strip().split()
+
+        if len(parts) < 2 or parts[0] in ("List", "*"):
+            continue
+
+        serial, state = parts[0], parts[1]
+        # "no permissions (...)" states span several words
+        attributes = dict(part.split(":", 1) for part in parts[2:] if ":" in part)
+        devices[serial] = (state, attributes)
+
+    return devices
+
+
+def read_message(stream: IO[bytes]) -> Optional[str]:
+    """Reads one hex length-prefixed message, None once the stream has ended."""
+    header = stream.read(4)
+    if len(header) < 4:
+        return None
+
+    length = int(header, 16)
+    data = stream.read(length)
+    if len(data) < length:
+        return None
+
+    return data.decode(errors="backslashreplace")
+
+
+class DeviceRegistry:
+    """
+    Tracks devices with one `track-devices` stream, over the adb server socket
+    if a transport is given, otherwise through an `adb track-devices` process.
+
+    registry = DeviceRegistry(Device).start()
+    registry.on_attach(lambda event: print("attached", event.device.id))
+    devices = registry.get_devices()
+
+    Device objects are created with device_factory(serial, state=state,
+    attributes=attributes) and reused for as long as the registry runs, also
+    across reconnects.
+    """
+
+    def __init__(
+        self,
+        device_factory: Callable,
+        transport: AdbServerTransport = None,
+        base_cmd: str = "adb",
+    ) -> None:
+        self.device_factory = device_factory
+        self.transport = transport
+        self.base_cmd = base_cmd
+
+        self.devices: Dict[str, Any] = {}  # attached devices by serial
+        self.known: Dict[str, Any] = {}  # every device seen, for reuse
+        self.callbacks: Dict[str, List[Callable]] = {
+            "attach": [],
+            "detach": [],
+            "change": [],
+        }
+        self.queues: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self.updates = 0
+
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.stopped = threading.Event()
+        self.thread: threading.Thread = None
+        self.closer: Callable = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self, timeout: float = 5.0) -> "DeviceRegistry":
+        """Starts tracking and waits up to timeout seconds for the first list."""
+        if self.transport is None:
+            # imported here, as the adb module imports this one
+            from . import adb as _adb
+
+            _adb.command_checked, sdk_path = is_valid_command(
+                self.base_cmd, _adb.command_checked
+            )
+
+        if self.thread is None:
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+        self.ready.wait(timeout)
+        return self
+
+    def stop(self):
+        self.stopped.set()
+
+        if self.closer is not None:
+            self.closer()
+
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def is_running(self) -> bool:
+        return self.thread is not None and not self.stopped.is_set()
+
+    def get_devices(self, states: Tuple[str, ...] = None) -> List[Any]:
+        """Returns the attached devices, optionally only those in states."""
+        with self.lock:
+            devices = list(self.devices.values())
+
+        if states is None:
+            return devices
+        return [device for device in devices if device.state in states]
+
+    def get_device(self, serial: str) -> Optional[Any]:
+        with self.lock:
+            return self.devices.get(serial)
+
+    def on_attach(self, callback: Callable[[DeviceEvent], Any]):
+        self.callbacks["attach"].append(callback)
+        return callback
+
+    def on_detach(self, callback: Callable[[DeviceEvent], Any]):
+        self.callbacks["detach"].append(callback)
+        return callback
+
+    def on_change(self, callback: Callable[[DeviceEvent], Any]):
+        """Called when an attached device changes state, e.g. to unauthorized."""
+        self.callbacks["change"].append(callback)
+        return callback
+
+    async def events(self):
+        """
+        Yields DeviceEvents as they happen, e.g.
+
+        async for event in registry.events():
+            if event.kind == "attach":
+                ...
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        entry = (loop, queue)
+        self.queues.append(entry)
+
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.queues.remove(entry)
+
+    def _open_stream(self) -> IO[bytes]:
+        if self.transport is not None:
+            sock = self.transport.connect()
+            sock.settimeout(None)
+            self.transport.send_request(sock, "host:track-devices-l")
+            self.closer = lambda: _close_socket(sock)
+            return sock.makefile("rb")
+
+        process = subprocess.Popen(
+            [self.base_cmd, "track-devices", "-l"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self.closer = process.kill
+        return process.stdout
+
+    def _messages(self) -> Iterator[str]:
+        stream = self._open_stream()
+
+        try:
+            while not self.stopped.is_set():
+                message = read_message(stream)
+                if message is None:
+                    return
+                yield message
+        finally:
+            stream.close()
+            self.closer()
+
+    def _run(self):
+        while not self.stopped.is_set():
+            try:
+                for message in self._messages():
+                    self.update(parse_device_list(message))
+            except (OSError, ValueError):
+                pass
+
+            # the stream ended, e.g. the server restarted. The first list after
+            # reconnecting is diffed against the last one, so nothing is lost
+            self.stopped.wait(RECONNECT_DELAY)
+
+    def update(self, listed: Dict[str, Tuple[str, dict]]):
+        """Applies a device list and dispatches the resulting events."""
+        events = []
+
+        with self.lock:
+            for serial in list(self.devices):
+                if serial not in listed:
+                    device = self.devices.pop(serial)
+                    events.append(DeviceEvent("detach", device, device.state))
+
+            for serial, (state, attributes) in listed.items():
+                device = self.devices.get(serial)
+
+                if device is None:
+                    device = self.known.get(serial)
+                    if device is None:
+                        device = self.device_factory(
+                            serial, state=state, attributes=attributes
+                        )
+                        self.known[serial] = device
+
+                    previous, device.state = device.state, state
+                    device.attributes = attributes
+                    self.devices[serial] = device
+                    events.append(DeviceEvent("attach", device, previous))
+                elif device.state != state:
+                    previous, device.state = device.state, state
+                    device.attributes = attributes
+                    events.append(DeviceEvent("change", device, previous))
+
+            self.updates += 1
+
+        self.ready.set()
+
+        for event in events:
+            self._dispatch(event)
+
+    def _dispatch(self, event: DeviceEvent):
+        for callback in self.callbacks[event.kind]:
+            try:
+                callback(event)
+            except Exception as e:
+                # a failing callback mustn't stop tracking
+                print(f"Device {event.kind} callback failed: {e!r}")
+
+        for loop, queue in list(self.queues):
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    def wait_for(
+        self, serial: str, state: str = "device", timeout: float = None
+    ) -> Optional[Any]:
+        """Waits until a device is attached in state, returns None on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        attached = threading.Event()
+
+        def check(event: DeviceEvent):
+            if event.device.id == serial and event.device.state == state:
+                attached.set()
+
+        self.on_attach(check)
+        self.on_change(check)
+
+        try:
+            while True:
+                device = self.get_device(serial)
+                if device is not None and device.state == state:
+                    return device
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+
+                attached.wait(remaining)
+                attached.clear()
+        finally:
+            self.callbacks["attach"].remove(check)
+            self.callbacks["change"].remove(check)
+
+
+def _close_socket(sock):
+    try:
+        sock.shutdown(2)
+    except OSError:
+        pass
+    sock.close()
@@ -0,0 +1,544 @@
+"""
+A per-device command scheduler.
+
+The adb server serializes the work of each device, so a long transfer blocks
+every later command of that device. The scheduler queues commands per device in
+priority classes, runs interactive commands next to a running transfer, shares
+workers fairly between devices and caps concurrent bulk transfers per USB bus.
+"""
+
+import subprocess
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional
+
+PRIORITIES = ("interactive", "bulk", "background")
+# adb commands that move data over the link, scheduled as bulk by default
+BULK_COMMANDS = frozenset(
+    (
+        "push",
+        "pull",
+        "install",
+        "install-multiple",
+        "install-multi-package",
+        "backup",
+        "restore",
+        "sideload",
+        "exec-in",
+        "sync",
+    )
+)
+HOST_KEY = "host"  # the queue of commands without a device, e.g. connect
+# how often a command with a cancellation token checks it, in seconds
+CANCEL_POLL_INTERVAL = 0.1
+# how long a killed command may take to close its output
+KILL_GRACE_PERIOD = 1.0
+
+
+class CommandCancelled(Exception):
+    pass
+
+
+class CancellationToken:
+    """
+    Cancels the commands it is passed to: queued commands are dropped and the
+    process of a running command is killed.
+    """
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.callbacks: List[Callable] = []
+        self.lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.event.is_set()
+
+    def cancel(self):
+        with self.lock:
+            self.event.set()
+            callbacks = list(self.callbacks)
+
+        for callback in callbacks:
+            callback()
+
+    def on_cancel(self, callback: Callable):
+        """Calls callback on cancel, or right away if already cancelled."""
+        with self.lock:
+            if not self.event.is_set():
+                self.callbacks.append(callback)
+                return
+        callback()
+
+    def remove(self, callback: Callable):
+        with self.lock:
+            if callback in self.callbacks:
+                self.callbacks.remove(callback)
+
+
+class CallOptions(NamedTuple):
+    priority: str = None  # None picks it from the command, see command_priority
+    deadline: float = None  # time.monotonic() by which the command must be done
+    token: CancellationToken = None
+
+
+def validate_priority(priority: str):
+    if priority is not None and priority not in PRIORITIES:
+        raise ValueError(f"Unsupported priority '{priority}', use one of {PRIORITIES}.")
+
+
+def command_priority(args: List[str]) -> str:
+    """Transfers are bulk, everything else is interactive."""
+    return "bulk" if args and args[0] in BULK_COMMANDS else "interactive"
+
+
+def usb_bus(usb_path: str) -> Optional[str]:
+    """The bus of a usb path from adb devices -l, e.g. 1 of usb:1-1.2"""
+    return usb_path.split("-", 1)[0] if usb_path else None
+
+
+def remaining(deadline: float) -> Optional[float]:
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def wait_timeout(deadline: float = None, token: CancellationToken = None):
+    """
+    How long to block before checking deadline and token again, None for as
+    long as it takes.
+    """
+    left = remaining(deadline)
+    timeout = None if left is None else max(0, left)
+    if token is not None:
+        # wakes up regularly to check the token
+        timeout = min(CANCEL_POLL_INTERVAL, timeout or CANCEL_POLL_INTERVAL)
+    return timeout
+
+
+def check_call(deadline: float = None, token: CancellationToken = None):
+    """Raises if the token was cancelled or the deadline has passed."""
+    if token is not None and token.cancelled:
+        raise CommandCancelled("Command cancelled.")
+
+    left = remaining(deadline)
+    if left is not None and left <= 0:
+        raise TimeoutError("Command deadline exceeded.")
+
+
+def kill(process: subprocess.Popen):
+    """
+    Kills process and waits for it. Its output is dropped after a grace period,
+    as children of the process (e.g. of a shell) may still hold it open.
+    """
+    process.kill()
+
+    try:
+        process.communicate(timeout=KILL_GRACE_PERIOD)
+    except subprocess.TimeoutExpired:
+        process.stdout.close()
+        process.wait()
+
+
+def communicate(
+    process: subprocess.Popen,
+    deadline: float = None,
+    token: CancellationToken = None,
+) -> bytes:
+    """
+    Returns the output of process. The process is killed once the deadline
+    passes (raising TimeoutError) or the token is cancelled (CommandCancelled).
+    """
+    while True:
+        try:
+            return process.communicate(timeout=wait_timeout(deadline, token))[0]
+        except subprocess.TimeoutExpired:
+            pass
+
+        if token is not None and token.cancelled:
+            kill(process)
+            raise CommandCancelled(f"Command cancelled: {process.args}")
+
+        left = remaining(deadline)
+        if left is not None and left <= 0:
+            kill(process)
+            raise TimeoutError(f"Command timed out: {process.args}")
+
+
+@dataclass
+class _Job:
+    key: str
+    priority: str
+    func: Callable[[float, CancellationToken], Any]
+    deadline: float
+    token: CancellationToken
+    bus: str
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class WaitStats:
+    count: int = 0
+    mean: float = 0.0
+    p95: float = 0.0
+    max: float = 0.0
+
+    @classmethod
+    def from_waits(cls, waits: List[float]) -> "WaitStats":
+        if not waits:
+            return cls()
+
+        waits = sorted(waits)
+        return cls(
+            len(waits),
+            sum(waits) / len(waits),
+            waits[min(len(waits) - 1, int(len(waits) * 0.95))],
+            waits[-1],
+        )
+
+
+@dataclass
+class SchedulerMetrics:
+    queued: Dict[str, Dict[str, int]]  # device: priority: queued commands
+    running: Dict[str, int]  # device: running commands
+    bulk_per_bus: Dict[str, int]  # usb bus: running bulk commands
+    oldest_wait: Dict[str, float]  # device: seconds its oldest command has waited
+    waits: Dict[str, WaitStats]  # priority: recent queue waits
+
+    @property
+    def depth(self) -> int:
+        return sum(sum(queued.values()) for queued in self.queued.values())
+
+    def __repr__(self) -> str:
+        waits = ", ".join(
+            f"{priority} p95={stats.p95:.3f}s" for priority, stats in self.waits.items()
+        )
+        return (
+            f"SchedulerMetrics(depth={self.depth}, "
+            f"running={sum(self.running.values())}, {waits})"
+        )
+
+
+class CommandScheduler:
+    """
+    Runs commands in worker threads, queued per device and priority.
+
+    scheduler = CommandScheduler(max_workers=8, max_bulk_per_bus=2)
+    adb = ADB(scheduler=scheduler)
+
+    Per device, at most max_per_device bulk or background commands and
+    max_interactive_per_device interactive commands run at once, so an
+    interactive command never waits behind a transfer. Devices take turns
+    for free workers. Host commands (without a device) are only limited by
+    max_workers. Queued commands are dropped once their deadline passes or
+    their token is cancelled.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        max_per_device: int = 1,
+        max_interactive_per_device: int = 1,
+        max_bulk_per_bus: int = 2,
+        history: int = 1024,
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_per_device = max_per_device
+        self.max_interactive_per_device = max_interactive_per_device
+        self.max_bulk_per_bus = max_bulk_per_bus
+
+        self.queues: Dict[str, Dict[str, Deque[_Job]]] = {}
+        self.keys: Deque[str] = deque()  # devices in round robin order
+        self.running: Counter = Counter()  # (device, interactive or not)
+        self.bulk_per_bus: Counter = Counter()
+        self.waits = {priority: deque(maxlen=history) for priority in PRIORITIES}
+
+        self.condition = threading.Condition()
+        self.workers: List[threading.Thread] = []
+        self.closed = False
+        self.held = threading.local()  # the slots held by each thread, see hold
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    def submit(
+        self,
+        key: str,
+        func: Callable[[float, CancellationToken], Any],
+        priority: str = "interactive",
+        deadline: float = None,
+        token: CancellationToken = None,
+        bus: str = None,
+    ) -> Future:
+        """
+        Queues func(deadline, token) for device key and returns its Future.
+        deadline is a time.monotonic() timestamp.
+        """
+        validate_priority(priority)
+        key = key or HOST_KEY
+        job = _Job(key, priority, func, deadline, token, bus)
+
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("Scheduler is shut down.")
+
+            if key not in self.queues:
+                self.queues[key] = {priority: deque() for priority in PRIORITIES}
+                # a new device hasn't had a turn yet
+                self.keys.appendleft(key)
+
+            self.queues[key][priority].append(job)
+            self._start_worker()
+            self.condition.notify()
+
+        if token is not None:
+            token.on_cancel(self._wake)
+
+        return job.future
+
+    def run(
+        self,
+        key: str,
+        func: Callable[[float, CancellationToken], Any],
+        priority: str = "interactive",
+        deadline: float = None,
+        token: CancellationToken = None,
+        bus: str = None,
+    ):
+        """
+        Submits a command and waits for its result, see submit. A command still
+        queued when its deadline passes or its token is cancelled is dropped
+        right away, instead of once a worker gets to it. A thread holding a slot
+        of the device runs the command right away, in that slot.
+        """
+        if self._held_keys()[key or HOST_KEY]:
+            check_call(deadline, token)
+            return func(deadline, token)
+
+        future = self.submit(key, func, priority, deadline, token, bus)
+
+        while True:
+            try:
+                return future.result(timeout=wait_timeout(deadline, token))
+            except FutureTimeoutError:
+                pass
+
+            try:
+                check_call(deadline, token)
+            except (CommandCancelled, TimeoutError):
+                if future.cancel():
+                    raise
+                # the command is running, and stops on its own deadline or token
+                return future.result()
+
+    @contextmanager
+    def hold(
+        self,
+        key: str,
+        priority: str = "bulk",
+        deadline: float = None,
+        token: CancellationToken = None,
+        bus: str = None,
+    ):
+        """
+        Takes a slot of device key for the duration of the context, like a
+        command submitted with the same arguments. Used by streams, whose output
+        is read by the caller while the command runs. The commands the thread
+        runs within the context use the held slot, instead of waiting for one
+        behind it.
+        """
+        held = self._held_keys()
+        key = key or HOST_KEY
+
+        if held[key]:
+            yield
+            return
+
+        acquired = threading.Event()
+        released = threading.Event()
+
+        def job(deadline, token):
+            acquired.set()
+            released.wait()
+
+        future = self.submit(key, job, priority, deadline, token, bus)
+        # a dropped job never runs, so wakes the caller as well
+        future.add_done_callback(lambda future: acquired.set())
+
+        while not acquired.wait(wait_timeout(deadline, token)):
+            try:
+                check_call(deadline, token)
+            except (CommandCancelled, TimeoutError):
+                if future.cancel():
+                    raise
+
+        if future.done():
+            future.result()  # raises why the job was dropped
+
+        # the counter of this thread, even if the context is left by another
+        held[key] += 1
+        try:
+            yield
+        finally:
+            held[key] -= 1
+            released.set()
+
+    def _held_keys(self) -> Counter:
+        keys = getattr(self.held, "keys", None)
+        if keys is None:
+            keys = self.held.keys = Counter()
+        return keys
+
+    def _wake(self):
+        with self.condition:
+            self.condition.notify_all()
+
+    def _start_worker(self):
+        # workers are started on demand, up to max_workers
+        queued = sum(len(q) for queues in self.queues.values() for q in queues.values())
+        idle = len(self.workers) - sum(self.running.values())
+        if queued > idle and len(self.workers) < self.max_workers:
+            worker = threading.Thread(target=self._work, daemon=True)
+            self.workers.append(worker)
+            worker.start()
+
+    def _drop(self, job: _Job) -> bool:
+        """Fails a cancelled or expired queued job, returns whether it was."""
+        if job.future.cancelled():
+            return True
+
+        try:
+            check_call(job.deadline, job.token)
+        except (CommandCancelled, TimeoutError) as e:
+            job.future.set_exception(e)
+            return True
+        return False
+
+    def _can_run(self, job: _Job) -> bool:
+        if job.key == HOST_KEY:
+            # host commands (connect, devices...) don't share a device, and
+            # e.g. a ConnectionManager reconnects many endpoints at once
+            return True
+
+        interactive = job.priority == "interactive"
+        limit = self.max_interactive_per_device if interactive else self.max_per_device
+        if self.running[(job.key, interactive)] >= limit:
+            return False
+
+        return (
+            job.priority != "bulk"
+            or job.bus is None
+            or self.bulk_per_bus[job.bus] < self.max_bulk_per_bus
+        )
+
+    def _next_job(self) -> Optional[_Job]:
+        for key in list(self.keys):
+            for priority in PRIORITIES:
+                queue = self.queues[key][priority]
+
+                while queue and self._drop(queue[0]):
+                    queue.popleft()
+
+                if queue and self._can_run(queue[0]):
+                    # the device goes to the back of the line
+                    self.keys.remove(key)
+                    self.keys.append(key)
+                    return queue.popleft()
+
+        return None
+
+    def _next_deadline(self) -> Optional[float]:
+        deadlines = [
+            job.deadline
+            for queues in self.queues.values()
+            for queue in queues.values()
+            for job in queue
+            if job.deadline is not None
+        ]
+        return remaining(min(deadlines)) if deadlines else None
+
+    def _work(self):
+        while True:
+            with self.condition:
+                job = None
+                while not self.closed:
+                    job = self._next_job()
+                    if job is not None:
+                        break
+                    timeout = self._next_deadline()
+                    self.condition.wait(None if timeout is None else max(0, timeout))
+
+                if job is None:
+                    return
+
+                interactive = job.priority == "interactive"
+                self.running[(job.key, interactive)] += 1
+                if job.priority == "bulk" and job.bus is not None:
+                    self.bulk_per_bus[job.bus] += 1
+                self.waits[job.priority].append(time.monotonic() - job.enqueued_at)
+
+            try:
+                if job.future.set_running_or_notify_cancel():
+                    job.future.set_result(job.func(job.deadline, job.token))
+            except BaseException as e:
+                job.future.set_exception(e)
+            finally:
+                with self.condition:
+                    self.running[(job.key, interactive)] -= 1
+                    if job.priority == "bulk" and job.bus is not None:
+                        self.bulk_per_bus[job.bus] -= 1
+                    self.condition.notify_all()
+
+    def shutdown(self, wait: bool = True):
+        """Stops the workers. Queued commands fail with CommandCancelled."""
+        with self.condition:
+            self.closed = True
+            for queues in self.queues.values():
+                for queue in queues.values():
+                    while queue:
+                        future = queue.popleft().future
+                        if not future.cancelled():
+                            future.set_exception(
+                                CommandCancelled("Scheduler shut down.")
+                            )
+            self.condition.notify_all()
+
+        if wait:
+            for worker in self.workers:
+                worker.join()
+
+    def metrics(self) -> SchedulerMetrics:
+        now = time.monotonic()
+
+        with self.condition:
+            queued = {
+                key: {priority: len(queue) for priority, queue in queues.items()}
+                for key, queues in self.queues.items()
+            }
+            oldest_wait = {
+                key: now
+                - min(queue[0].enqueued_at for queue in queues.values() if queue)
+                for key, queues in self.queues.items()
+                if any(queues.values())
+            }
+            running = Counter()
+            for (key, _), count in self.running.items():
+                running[key] += count
+
+            return SchedulerMetrics(
+                queued=queued,
+                running={key: count for key, count in running.items() if count},
+                bulk_per_bus={bus: n for bus, n in self.bulk_per_bus.items() if n},
+                oldest_wait=oldest_wait,
+                waits={
+                    priority: WaitStats.from_waits(list(waits))
+                    for priority, waits in self.waits.items()
+                },
+            )
@@ -0,0 +1,69 @@
+import uuid
+from typing import List, Optional, Tuple
+
+
+def build_script(commands: List[str], subshells: bool = False) -> Tuple[str, str]:
+    """
+    Joins commands into a single shell script. After each command, a line with
+    a unique marker, the command's index and its exit status is printed.
+    If subshells is set, every command runs in a subshell, so one calling exit
+    or changing directory doesn't affect the others.
+    Returns the script and the marker.
+    """
+    marker = f"__adb_wrapper_{uuid.uuid4().hex}__"
+    start, end = ("(", ")") if subshells else ("{", "}")
+    script = " ".join(
+        f"{start} {command}\n{end} 2>&1; printf '\\n{marker} {idx} %d\\n' $?;"
+        for idx, command in enumerate(commands)
+    )
+    return script, marker
+
+
+def parse_script_output(
+    output: str, marker: str, count: int
+) -> List[Optional[Tuple[int, str]]]:
+    """
+    Splits the output of a script made by build_script into a (return code,
+    output) tuple per command. Commands that didn't run are None.
+    """
+    results = [None] * count
+    lines = []
+
+    for line in output.splitlines():
+        if not line.startswith(marker):
+            lines.append(line)
+            continue
+
+        idx, return_code = line[len(marker) :].split()
+        results[int(idx)] = (int(return_code), "\n".join(lines).strip())
+        lines = []
+
+    return results
+
+
+# the length build_script adds around each command, with room for the index
+COMMAND_OVERHEAD = 96
+
+
+def split_commands(commands: List[str], max_length: int) -> List[List[int]]:
+    """
+    Groups the indices of commands into scripts of at most max_length
+    characters. A command longer than max_length gets a script of its own.
+    """
+    chunks = []
+    chunk, length = [], 0
+
+    for idx, command in enumerate(commands):
+        size = len(command) + COMMAND_OVERHEAD
+
+        if chunk and length + size > max_length:
+            chunks.append(chunk)
+            chunk, length = [], 0
+
+        chunk.append(idx)
+        length += size
+
+    if chunk:
+        chunks.append(chunk)
+
+    return chunks
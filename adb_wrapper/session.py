@@ -0,0 +1,149 @@
+import queue
+import subprocess
+import threading
+import uuid
+from typing import IO, Tuple
+
+from .scheduler import CancellationToken, CommandCancelled, check_call, wait_timeout
+
+
+class ShellSessionError(RuntimeError):
+    pass
+
+
+def _read_lines(stdout: IO[bytes], lines: queue.Queue):
+    # runs in a thread, so a command can time out while it prints nothing
+    try:
+        for line in iter(stdout.readline, b""):
+            lines.put(line)
+    finally:
+        lines.put(b"")
+        stdout.close()
+
+
+class ShellSession:
+    """
+    A long-lived `adb shell` process. Commands are written to its stdin, each
+    run in a subshell, and their output is framed by a unique sentinel line
+    that carries the exit status.
+    """
+
+    def __init__(self, device_id: str, base_cmd: str = "adb") -> None:
+        self.device_id = device_id
+        self.base_cmd = base_cmd
+        self.process: subprocess.Popen = None
+        self.lines: queue.Queue = None  # output lines of the process
+        self.restarts = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        if self.is_alive():
+            return
+
+        if self.process is not None:
+            self.close()
+            self.restarts += 1
+
+        self.process = subprocess.Popen(
+            [self.base_cmd, "-s", self.device_id, "shell"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        self.lines = queue.Queue()
+        threading.Thread(
+            target=_read_lines, args=(self.process.stdout, self.lines), daemon=True
+        ).start()
+
+    def close(self):
+        process, self.process = self.process, None
+
+        if process is None:
+            return
+
+        try:
+            process.stdin.close()
+            process.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+        # stdout is closed by its reader thread
+
+    def run(
+        self,
+        command: str,
+        deadline: float = None,
+        token: CancellationToken = None,
+    ) -> Tuple[int, bytes]:
+        """
+        Runs a shell command in the session and returns a (return code, output) tuple.
+        Dead sessions are restarted before the command is sent. The session is
+        killed if the deadline passes (raising TimeoutError) or the token is
+        cancelled (CommandCancelled) while the command runs.
+        """
+        with self.lock:
+            check_call(deadline, token)
+            try:
+                self.start()
+                return self._run(command, deadline, token)
+            except BrokenPipeError:
+                # the shell died between commands, so nothing was executed yet
+                self.start()
+                return self._run(command, deadline, token)
+
+    def _next_line(self, deadline: float, token: CancellationToken) -> bytes:
+        while True:
+            try:
+                return self.lines.get(timeout=wait_timeout(deadline, token))
+            except queue.Empty:
+                pass
+
+            try:
+                check_call(deadline, token)
+            except (CommandCancelled, TimeoutError):
+                # the rest of the command's output would end up in the next one
+                self.process.kill()
+                self.process.wait()
+                raise
+
+    def _run(
+        self, command: str, deadline: float = None, token: CancellationToken = None
+    ) -> Tuple[int, bytes]:
+        sentinel = f"__adb_wrapper_{uuid.uuid4().hex}__"
+
+        # a subshell, so cd, exit or variables don't leak into the next commands.
+        # stdin is redirected so commands can't consume the rest of the session input
+        script = f"( {command}\n) </dev/null 2>&1; printf '\\n{sentinel} %d\\n' $?\n"
+        self.process.stdin.write(script.encode())
+        self.process.stdin.flush()
+
+        marker = sentinel.encode()
+        output = bytearray()
+
+        while True:
+            line = self._next_line(deadline, token)
+
+            if not line:
+                # kept as the process, so start() counts the restart
+                self.process.kill()
+                self.process.wait()
+                raise ShellSessionError(
+                    f"Shell session of {self.device_id} closed while running: {command}"
+                )
+
+            if line.startswith(marker):
+                return_code = int(line[len(marker) :].strip() or 1)
+                # drop the newline that separates the output from the sentinel
+                return return_code, bytes(output[:-1])
+
+            output.extend(line)
@@ -0,0 +1,72 @@
+import shlex
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from .scripts import build_script, parse_script_output
+
+Setting = Tuple[str, str, str]  # namespace, key, value
+
+
+@dataclass
+class SettingsReport:
+    changed: Dict[str, tuple] = field(default_factory=dict)  # name: (old, new)
+    unchanged: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)  # name: error output
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def __repr__(self) -> str:
+        return (
+            f"SettingsReport(changed={len(self.changed)}, "
+            f"unchanged={len(self.unchanged)}, failed={len(self.failed)})"
+        )
+
+
+def setting_name(setting: Setting) -> str:
+    return f"{setting[0]}.{setting[1]}"
+
+
+def diff_settings(current: Dict[str, dict], desired: List[Setting]):
+    """
+    Compares the desired settings against the current settings of each
+    namespace, and returns a (changes, unchanged) tuple.
+    """
+    changes = []
+    unchanged = []
+
+    for namespace, key, value in desired:
+        if current.get(namespace, {}).get(key) == str(value):
+            unchanged.append((namespace, key, str(value)))
+        else:
+            changes.append((namespace, key, str(value)))
+
+    return changes, unchanged
+
+
+def build_settings_script(changes: List[Setting]):
+    """
+    Returns a shell script that applies all changes, and the marker that prefixes
+    the exit status line printed after each change.
+    """
+    return build_script(
+        [
+            f"settings put {shlex.quote(namespace)} {shlex.quote(key)} {shlex.quote(value)}"
+            for namespace, key, value in changes
+        ]
+    )
+
+
+def parse_settings_script_output(output: str, changes: List[Setting], marker: str):
+    """Returns a dictionary of failed setting names and their error output."""
+    failed = {}
+    results = parse_script_output(output, marker, len(changes))
+
+    for change, result in zip(changes, results):
+        if result is None:
+            failed[setting_name(change)] = "not applied"
+        elif result[0] != 0:
+            failed[setting_name(change)] = result[1]
+
+    return failed
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+import shlex
+from dataclasses import dataclass, field
+from typing import Dict, List, NamedTuple, Optional
+
+MANIFEST_NAME = ".adb_wrapper_sync.json"
+MISSING_DIRECTORY_EXIT_CODE = 3
+
+
+class FileEntry(NamedTuple):
+    size: int
+    mtime: int  # seconds
+    md5: Optional[str] = None
+
+
+@dataclass
+class SyncReport:
+    transferred: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)  # path: error output
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def __repr__(self) -> str:
+        return (
+            f"SyncReport(transferred={len(self.transferred)}, "
+            f"unchanged={len(self.unchanged)}, deleted={len(self.deleted)}, "
+            f"failed={len(self.failed)})"
+        )
+
+
+def build_manifest_script(remote_dir: str, checksum: bool, marker: str) -> str:
+    """
+    Returns a script printing the size, mtime and path of every file under
+    remote_dir, followed by marker and md5sum lines if checksum is set.
+    Paths are relative to remote_dir, the script fails if it doesn't exist.
+    """
+    script = (
+        f"cd {shlex.quote(remote_dir)} 2>/dev/null "
+        f"|| exit {MISSING_DIRECTORY_EXIT_CODE}; "
+        "find . -type f -exec stat -c '%s %Y %n' {} + 2>/dev/null"
+    )
+    if checksum:
+        script += f"; echo {marker}; find . -type f -exec md5sum {{}} + 2>/dev/null"
+    return script
+
+
+def _relative(path: str) -> str:
+    return path[2:] if path.startswith("./") else path
+
+
+def parse_manifest_output(output: str, marker: str) -> Dict[str, FileEntry]:
+    manifest = {}
+    hashes = {}
+    target = manifest
+
+    for line in output.splitlines():
+        if line == marker:
+            target = hashes
+            continue
+
+        if target is manifest:
+            parts = line.split(" ", 2)
+            if len(parts) == 3 and parts[0].isdigit() and parts[1].isdigit():
+                manifest[_relative(parts[2])] = FileEntry(int(parts[0]), int(parts[1]))
+        else:
+            md5, _, path = line.partition("  ")
+            if path:
+                hashes[_relative(path)] = md5
+
+    return {
+        path: entry._replace(md5=hashes.get(path)) for path, entry in manifest.items()
+    }
+
+
+def file_md5(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.md5()
+
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def scan_local_directory(
+    local_dir: str, manifest_path: str = None
+) -> Dict[str, os.stat_result]:
+    """
+    Returns the stat of every file under local_dir by relative posix path,
+    without sync manifests: MANIFEST_NAME and manifest_path, if it is inside
+    local_dir.
+    """
+    manifests = {MANIFEST_NAME}
+    if manifest_path is not None:
+        manifest = os.path.relpath(
+            os.path.realpath(manifest_path), os.path.realpath(local_dir)
+        )
+        manifests.add(manifest.replace(os.sep, "/"))
+
+    files = {}
+
+    for root, _, names in os.walk(local_dir):
+        for name in names:
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, local_dir).replace(os.sep, "/")
+            if relative not in manifests:
+                files[relative] = os.stat(path)
+
+    return files
+
+
+def is_same_file(
+    direction: str,
+    remote: FileEntry,
+    local_path: str,
+    local: os.stat_result,
+    checksum: bool,
+) -> bool:
+    """
+    Compares files without a manifest entry. adb push keeps mtimes, so pushed
+    files match by size and mtime. Pulled files only match by checksum.
+    """
+    if remote is None or local is None or remote.size != local.st_size:
+        return False
+
+    if checksum:
+        return remote.md5 is not None and remote.md5 == file_md5(local_path)
+
+    return direction == "push" and remote.mtime == int(local.st_mtime)
+
+
+def local_key(stat: os.stat_result) -> list:
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class SyncManifest:
+    """
+    The state of a synced directory pair after the last sync, persisted as json
+    in the local directory: the remote entry and the local size and mtime of
+    every file. Files whose entries are unchanged on both sides are skipped.
+    """
+
+    def __init__(self, path: str, key: str) -> None:
+        self.path = path
+        self.key = key
+        self.files: Dict[str, dict] = {}
+        self.manifests: Dict[str, dict] = {}
+
+    def load(self):
+        try:
+            with open(self.path) as file:
+                self.manifests = json.load(file)
+        except (OSError, ValueError):
+            self.manifests = {}
+
+        self.files = self.manifests.get(self.key, {})
+        return self
+
+    def save(self):
+        self.manifests[self.key] = self.files
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        with open(self.path, "w") as file:
+            json.dump(self.manifests, file)
+
+    def is_unchanged(
+        self, path: str, remote: FileEntry, local: os.stat_result, checksum: bool
+    ) -> bool:
+        entry = self.files.get(path)
+        if entry is None or local is None or remote is None:
+            return False
+
+        remote_entry = FileEntry(*entry["remote"])
+        if checksum and remote_entry.md5 != remote.md5:
+            return False
+
+        return remote_entry[:2] == remote[:2] and entry["local"] == local_key(local)
+
+    def update(self, path: str, remote: FileEntry, local: os.stat_result):
+        self.files[path] = {"remote": list(remote), "local": local_key(local)}
+
+    def remove(self, path: str):
+        self.files.pop(path, None)
@@ -0,0 +1,122 @@
+"""
+Streams directory trees through tar, so a tree is moved with one adb call
+instead of one call per file. Archives are never written to disk: pulls extract
+members as the bytes arrive, pushes write the archive straight into adb's stdin.
+"""
+
+import fnmatch
+import io
+import os
+import tarfile
+from typing import IO, Iterable, Iterator, List
+
+TAR_BUFFER_SIZE = 64 * 1024
+
+
+class IterableReader(io.RawIOBase):
+    """A read-only file over an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self.chunks = iter(chunks)
+        self.buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self.buffer:
+            try:
+                self.buffer = next(self.chunks)
+            except StopIteration:
+                return 0
+
+        size = min(len(buffer), len(self.buffer))
+        buffer[:size] = self.buffer[:size]
+        self.buffer = self.buffer[size:]
+        return size
+
+
+def normalize_member_name(name: str) -> str:
+    while name.startswith("./"):
+        name = name[2:]
+    return name
+
+
+def matches_filters(name: str, include: List[str] = None, exclude: List[str] = None):
+    """
+    Whether a relative path passes the include and exclude glob patterns.
+    Patterns match the whole path or any of its parts, like tar's --exclude,
+    e.g. "*.jpg", "cache" or "DCIM/*".
+    """
+    parts = name.split("/")
+
+    def matches(patterns: List[str]) -> bool:
+        return any(
+            fnmatch.fnmatch(name, p) or any(fnmatch.fnmatch(part, p) for part in parts)
+            for p in patterns
+        )
+
+    if exclude and matches(exclude):
+        return False
+    return not include or matches(include)
+
+
+def extract_stream(
+    chunks: Iterable[bytes],
+    local_dir: str,
+    include: List[str] = None,
+    exclude: List[str] = None,
+) -> List[str]:
+    """
+    Extracts a tar stream into local_dir while it is read, and returns the
+    extracted file names. Members are checked by tarfile's data filter, so
+    absolute paths, links out of local_dir and device files are rejected.
+    """
+    extracted = []
+    reader = io.BufferedReader(IterableReader(chunks), TAR_BUFFER_SIZE)
+
+    with tarfile.open(fileobj=reader, mode="r|") as tar:
+        for member in tar:
+            name = normalize_member_name(member.name)
+
+            if not name or name == "." or member.isdir():
+                continue
+            if not matches_filters(name, include, exclude):
+                continue
+
+            member.name = name
+            try:
+                tar.extract(member, local_dir, filter="data")
+            except tarfile.FilterError:
+                # unsafe members are skipped, the rest of the tree is still pulled
+                continue
+
+            if member.isfile():
+                extracted.append(name)
+
+    return extracted
+
+
+def iter_local_files(
+    local_dir: str, include: List[str] = None, exclude: List[str] = None
+) -> Iterator[str]:
+    """Yields the relative posix paths of local files passing the filters."""
+    for root, _, names in os.walk(local_dir):
+        for name in sorted(names):
+            path = os.path.relpath(os.path.join(root, name), local_dir)
+            path = path.replace(os.sep, "/")
+
+            if matches_filters(path, include, exclude):
+                yield path
+
+
+def write_stream(file: IO[bytes], local_dir: str, paths: Iterable[str]) -> List[str]:
+    """Writes the files of local_dir as a tar stream to file, e.g. a pipe."""
+    written = []
+
+    with tarfile.open(fileobj=file, mode="w|", bufsize=TAR_BUFFER_SIZE) as tar:
+        for path in paths:
+            tar.add(os.path.join(local_dir, *path.split("/")), arcname=path)
+            written.append(path)
+
+    return written
@@ -0,0 +1,240 @@
+import os
+import posixpath
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import chain, zip_longest
+from typing import Dict, List, NamedTuple, Tuple
+
+from .compression import compression_flags, validate_policy
+
+# files per adb invocation, keeps command lines well below the os limit
+TRANSFER_BATCH_SIZE = 64
+
+
+@dataclass
+class TransferResult:
+    source: str
+    destination: str
+    ok: bool = False
+    output: str = ""
+    duration: float = 0.0  # of the adb invocation that transferred the file
+
+    def __repr__(self) -> str:
+        status = "ok" if self.ok else f"failed: {self.output}"
+        return f"{self.source} -> {self.destination}: {status}"
+
+
+class TransferBatch(NamedTuple):
+    direction: str  # push or pull
+    indices: Tuple[int, ...]  # positions of the files in the requested sources
+    sources: Tuple[str, ...]
+    destinations: Tuple[str, ...]  # final path of each source
+    target: str  # last argument of adb push/pull, a directory for several sources
+    flags: Tuple[str, ...] = ()  # compression options
+
+
+def plan_transfers(
+    direction: str,
+    sources: List[str],
+    destinations: List[str],
+    destination_directory: str,
+    batch_size: int = TRANSFER_BATCH_SIZE,
+    compression: str = None,
+) -> List[TransferBatch]:
+    """
+    Groups files that keep their name in the same destination directory, and
+    use the same compression options, into multi-source batches. Renamed files
+    get a batch of their own. See compression_flags for compression policies.
+    """
+    # device paths are posix paths, whatever the host is
+    source_path, path = (
+        (os.path, posixpath) if direction == "push" else (posixpath, os.path)
+    )
+    groups = defaultdict(list)
+    batches = []
+
+    for idx, (source, destination) in enumerate(
+        zip_longest(sources, destinations or ())
+    ):
+        if source is None:
+            break
+
+        name = source_path.basename(source)
+        flags = tuple(compression_flags(compression, source, direction == "push"))
+
+        if destination is None:
+            destination = path.join(destination_directory, name)
+
+        if path.basename(destination) == name:
+            directory = path.dirname(destination) or "."
+            groups[directory, flags].append((idx, source, destination))
+        else:
+            batches.append(
+                TransferBatch(
+                    direction, (idx,), (source,), (destination,), destination, flags
+                )
+            )
+
+    for (directory, flags), files in groups.items():
+        for start in range(0, len(files), batch_size):
+            indices, batch_sources, batch_destinations = zip(
+                *files[start : start + batch_size]
+            )
+            target = batch_destinations[0] if len(indices) == 1 else directory
+            batches.append(
+                TransferBatch(
+                    direction, indices, batch_sources, batch_destinations, target, flags
+                )
+            )
+
+    return batches
+
+
+def parse_transfer_output(
+    batch: TransferBatch, return_code: int, output: str, duration: float = 0.0
+) -> List[TransferResult]:
+    """
+    Splits the output of a multi-source adb push/pull into a result per file.
+    adb names failed files in its error lines and goes on with the rest.
+    """
+    error_lines = [
+        line for line in output.splitlines() if "error" in line or "failed" in line
+    ]
+    named = {
+        source
+        for source in batch.sources
+        for line in error_lines
+        if f"'{source}'" in line
+    }
+    results = []
+
+    for source, destination in zip(batch.sources, batch.destinations):
+        if source in named:
+            errors = [line for line in error_lines if f"'{source}'" in line]
+            ok, file_output = False, "\n".join(errors)
+        elif return_code != 0 and not named:
+            # the whole invocation failed, e.g. the device went offline
+            ok, file_output = False, output.strip()
+        else:
+            ok, file_output = True, ""
+
+        results.append(TransferResult(source, destination, ok, file_output, duration))
+
+    return results
+
+
+class TransferEngine:
+    """
+    Pushes or pulls files on one or more devices.
+
+    Files are grouped into multi-source `adb push a b c dest/` invocations,
+    which run on a pool of max_workers threads, at most max_per_device at a time
+    on each device. Every file gets a TransferResult, failures don't stop the
+    other transfers.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_per_device: int = 2,
+        batch_size: int = TRANSFER_BATCH_SIZE,
+        compression: str = None,
+    ) -> None:
+        validate_policy(compression)
+        self.max_workers = max_workers
+        self.max_per_device = max_per_device
+        self.batch_size = batch_size
+        self.compression = compression
+
+    def push(
+        self,
+        devices: list,
+        pc_files: List[str],
+        device_files: List[str] = None,
+        destination_directory: str = None,
+    ) -> Dict[str, List[TransferResult]]:
+        return self.run(devices, "push", pc_files, device_files, destination_directory)
+
+    def pull(
+        self,
+        devices: list,
+        device_files: List[str],
+        pc_files: List[str] = None,
+        destination_directory: str = None,
+    ) -> Dict[str, List[TransferResult]]:
+        return self.run(devices, "pull", device_files, pc_files, destination_directory)
+
+    def _plan(self, device, direction: str, sources, destinations, directory):
+        if directory is None:
+            push = direction == "push"
+            directory = device.get_default_download_directory() if push else os.getcwd()
+
+        batches = plan_transfers(
+            direction,
+            sources,
+            destinations,
+            directory,
+            self.batch_size,
+            self.compression,
+        )
+
+        if direction == "push":
+            # several sources need an existing target directory
+            directories = {b.target for b in batches if len(b.sources) > 1}
+            if directories:
+                device.create_directories(*sorted(directories))
+        else:
+            for batch in batches:
+                target = batch.target if len(batch.sources) > 1 else None
+                os.makedirs(
+                    target or os.path.dirname(batch.target) or ".", exist_ok=True
+                )
+
+        return batches
+
+    def run(
+        self,
+        devices: list,
+        direction: str,
+        sources: List[str],
+        destinations: List[str] = None,
+        destination_directory: str = None,
+    ) -> Dict[str, List[TransferResult]]:
+        """
+        Returns the results of each device by device id, in the order of sources.
+        Pulls from several devices should use a destination directory per device.
+        """
+        if direction not in ("push", "pull"):
+            raise ValueError(f"Unsupported direction '{direction}'.")
+
+        sources = list(sources)
+        planned = [
+            [
+                (device, batch)
+                for batch in self._plan(
+                    device, direction, sources, destinations, destination_directory
+                )
+            ]
+            for device in devices
+        ]
+        # interleaves devices, so every device gets going right away
+        jobs = [job for job in chain(*zip_longest(*planned)) if job is not None]
+        limits = {
+            device.id: threading.Semaphore(self.max_per_device) for device in devices
+        }
+
+        def transfer(device, batch: TransferBatch):
+            with limits[device.id]:
+                return device.transfer_batch(batch)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(transfer, *job) for job in jobs]
+
+        results = {device.id: [None] * len(sources) for device in devices}
+        for (device, batch), future in zip(jobs, futures):
+            for idx, result in zip(batch.indices, future.result()):
+                results[device.id][idx] = result
+
+        return results
@@ -0,0 +1,411 @@
+import shlex
+import socket
+import struct
+from typing import List, Tuple
+
+from .scheduler import CancellationToken, check_call, remaining
+
+ADB_SERVER_HOST = "127.0.0.1"
+ADB_SERVER_PORT = 5037
+
+# shell protocol v2 packet ids
+SHELL_STDIN = 0
+SHELL_STDOUT = 1
+SHELL_STDERR = 2
+SHELL_EXIT = 3
+SHELL_CLOSE_STDIN = 4
+
+_LEGACY_EXIT_MARKER = b"\x00__adb_wrapper_exit__:"
+
+
+class AdbProtocolError(RuntimeError):
+    pass
+
+
+class AdbServiceError(AdbProtocolError):
+    """Raised when a device rejects the requested service."""
+
+
+def split_command_args(command_args: List[str]):
+    """
+    Splits adb command args into a (serial, args) tuple.
+    """
+    args = list(command_args[1:])
+    serial = None
+
+    if len(args) >= 2 and args[0] == "-s":
+        serial = args[1]
+        args = args[2:]
+
+    return serial, args
+
+
+def quote_call_args(command_args: List[str], call_args: List[str]) -> List[str]:
+    """
+    Quotes the call args of an adb shell or exec-out command for the device's
+    shell, which gets all args joined into one command line, so they reach the
+    command as they are. The call args of a bare shell or exec-out command are
+    a script, and are left as they are.
+    """
+    if not command_args or command_args[0] != "adb":
+        return list(call_args)
+
+    serial, args = split_command_args(command_args)
+    if len(args) < 2 or args[0] not in ("shell", "exec-out"):
+        return list(call_args)
+
+    return [shlex.quote(arg) for arg in call_args]
+
+
+def socket_timeout(timeout: float, deadline: float) -> float:
+    """The socket timeout of an operation: timeout, shortened to the deadline."""
+    left = remaining(deadline)
+    if left is None:
+        return timeout
+    return left if timeout is None else min(timeout, left)
+
+
+class CommandSocket:
+    """
+    A socket connection of one command. Its reads raise TimeoutError once the
+    deadline passes and CommandCancelled once the token is cancelled, which
+    shuts the socket down to wake up a blocked read.
+    """
+
+    def __init__(
+        self,
+        sock: socket.socket,
+        deadline: float = None,
+        token: CancellationToken = None,
+        timeout: float = None,
+    ) -> None:
+        self.sock = sock
+        self.deadline = deadline
+        self.token = token
+        self.timeout = timeout  # of every single read
+
+        if token is not None:
+            token.on_cancel(self.abort)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def abort(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def sendall(self, data: bytes):
+        check_call(self.deadline, self.token)
+        self.sock.sendall(data)
+
+    def recv(self, size: int) -> bytes:
+        check_call(self.deadline, self.token)
+        self.sock.settimeout(socket_timeout(self.timeout, self.deadline))
+
+        try:
+            data = self.sock.recv(size)
+        except OSError:
+            # a timeout, or the socket was shut down by a cancel
+            check_call(self.deadline, self.token)
+            raise
+
+        if not data:
+            check_call(self.deadline, self.token)
+        return data
+
+    def close(self):
+        if self.token is not None:
+            self.token.remove(self.abort)
+        self.sock.close()
+
+
+class AdbServerTransport:
+    """
+    Talks the adb host protocol directly to the adb server socket, instead of
+    spawning an adb client process per command.
+
+    Only shell, exec-out and device listing commands are supported, every other
+    command (push, pull, install, etc.) is still executed through the adb binary.
+    """
+
+    host_commands = {
+        ("devices",): "host:devices",
+        ("devices", "-l"): "host:devices-l",
+    }
+    device_commands = {"shell", "exec-out", "get-state"}
+
+    def __init__(
+        self,
+        host: str = ADB_SERVER_HOST,
+        port: int = ADB_SERVER_PORT,
+        timeout: float = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.shell_v2 = True
+
+    def supports(self, command_args: List[str]) -> bool:
+        if not command_args or command_args[0] != "adb":
+            return False
+
+        serial, args = split_command_args(command_args)
+
+        if not args:
+            return False
+
+        if serial is None and tuple(args) in self.host_commands:
+            return True
+
+        return args[0] in self.device_commands
+
+    def run(
+        self,
+        command_args: List[str],
+        deadline: float = None,
+        token: CancellationToken = None,
+    ) -> Tuple[int, bytes]:
+        """
+        Executes command args over the adb server socket and returns a
+        (return code, output) tuple, just like the adb binary would.
+        Raises TimeoutError once deadline (a time.monotonic() timestamp) passes,
+        and CommandCancelled once token is cancelled.
+        """
+        serial, args = split_command_args(command_args)
+
+        if serial is None and tuple(args) in self.host_commands:
+            with self.open(deadline, token) as sock:
+                try:
+                    self.send_request(sock, self.host_commands[tuple(args)])
+                except AdbProtocolError as e:
+                    return 1, f"error: {e}".encode()
+                return 0, self.read_length_prefixed(sock)
+
+        name, args = args[0], args[1:]
+
+        if name == "get-state":
+            request = f"host-serial:{serial}:get-state" if serial else "host:get-state"
+            with self.open(deadline, token) as sock:
+                try:
+                    self.send_request(sock, request)
+                except AdbProtocolError as e:
+                    return 1, f"error: {e}".encode()
+                return 0, self.read_length_prefixed(sock)
+
+        if name == "exec-out":
+            return self.exec_out(serial, " ".join(args), deadline, token)
+
+        return self.shell(serial, " ".join(args), deadline, token)
+
+    def stream(
+        self,
+        command_args: List[str],
+        chunk_size: int = 65536,
+        deadline: float = None,
+        token: CancellationToken = None,
+    ):
+        """
+        Yields output chunks of shell and exec-out commands as they arrive, and
+        returns the return code. Other commands are yielded in a single chunk.
+        """
+        serial, args = split_command_args(command_args)
+        name = args[0] if args else None
+
+        if name not in ("shell", "exec-out") or (name == "shell" and not self.shell_v2):
+            return_code, output = self.run(command_args, deadline, token)
+            yield output
+            return return_code
+
+        command = " ".join(args[1:])
+        service = f"shell,v2,raw:{command}" if name == "shell" else f"exec:{command}"
+
+        try:
+            sock = self.open_device_service(serial, service, deadline, token)
+        except AdbServiceError:
+            if name == "shell":
+                self.shell_v2 = False
+            return_code, output = self.run(command_args, deadline, token)
+            yield output
+            return return_code
+        except AdbProtocolError as e:
+            yield f"error: {e}".encode()
+            return 1
+
+        with sock:
+            if name == "exec-out":
+                while True:
+                    chunk = sock.recv(chunk_size)
+                    if not chunk:
+                        return 0
+                    yield chunk
+
+            return (yield from self.iter_shell_v2(sock))
+
+    def connect(self, timeout: float = None) -> socket.socket:
+        if timeout is None:
+            timeout = self.timeout
+        sock = socket.create_connection((self.host, self.port), timeout=timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def open(
+        self, deadline: float = None, token: CancellationToken = None
+    ) -> CommandSocket:
+        """Connects to the adb server for a command with a deadline and token."""
+        check_call(deadline, token)
+
+        try:
+            sock = self.connect(socket_timeout(self.timeout, deadline))
+        except OSError:
+            check_call(deadline, token)
+            raise
+
+        return CommandSocket(sock, deadline, token, self.timeout)
+
+    def send_request(self, sock: socket.socket, request: str):
+        data = request.encode()
+        sock.sendall(b"%04x" % len(data) + data)
+        status = self.read_exactly(sock, 4)
+
+        if status == b"OKAY":
+            return
+
+        if status == b"FAIL":
+            message = self.read_length_prefixed(sock)
+            raise AdbProtocolError(message.decode(errors="backslashreplace"))
+
+        raise AdbProtocolError(f"Unexpected response from adb server: {status!r}")
+
+    def read_exactly(self, sock: socket.socket, size: int) -> bytes:
+        data = bytearray()
+
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                raise AdbProtocolError("Connection closed by adb server.")
+            data.extend(chunk)
+
+        return bytes(data)
+
+    def read_length_prefixed(self, sock: socket.socket) -> bytes:
+        length = int(self.read_exactly(sock, 4), 16)
+        return self.read_exactly(sock, length)
+
+    def read_until_close(self, sock: socket.socket) -> bytes:
+        data = bytearray()
+
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                return bytes(data)
+            data.extend(chunk)
+
+    def open_device_service(
+        self,
+        serial: str,
+        service: str,
+        deadline: float = None,
+        token: CancellationToken = None,
+    ) -> CommandSocket:
+        sock = self.open(deadline, token)
+
+        try:
+            transport = f"host:transport:{serial}" if serial else "host:transport-any"
+            self.send_request(sock, transport)
+            try:
+                self.send_request(sock, service)
+            except AdbProtocolError as e:
+                raise AdbServiceError(str(e)) from e
+        except BaseException:
+            sock.close()
+            raise
+
+        return sock
+
+    def shell(
+        self,
+        serial: str,
+        command: str,
+        deadline: float = None,
+        token: CancellationToken = None,
+    ) -> Tuple[int, bytes]:
+        try:
+            if self.shell_v2:
+                try:
+                    with self.open_device_service(
+                        serial, f"shell,v2,raw:{command}", deadline, token
+                    ) as sock:
+                        return self.read_shell_v2(sock)
+                except AdbServiceError:
+                    # devices older than android 7 don't support the v2 shell protocol
+                    self.shell_v2 = False
+
+            return self.shell_legacy(serial, command, deadline, token)
+        except AdbProtocolError as e:
+            return 1, f"error: {e}".encode()
+
+    def read_shell_v2(self, sock: socket.socket) -> Tuple[int, bytes]:
+        output = bytearray()
+        packets = self.iter_shell_v2(sock)
+
+        while True:
+            try:
+                output.extend(next(packets))
+            except StopIteration as stop:
+                return stop.value, bytes(output)
+
+    def iter_shell_v2(self, sock: socket.socket):
+        """Yields stdout and stderr packets, and returns the exit status."""
+        while True:
+            header = sock.recv(5)
+            if not header:
+                return 1
+            if len(header) < 5:
+                header += self.read_exactly(sock, 5 - len(header))
+
+            packet_id, length = struct.unpack("<BI", header)
+            data = self.read_exactly(sock, length)
+
+            if packet_id in (SHELL_STDOUT, SHELL_STDERR):
+                yield data
+            elif packet_id == SHELL_EXIT:
+                return data[0] if data else 0
+
+    def shell_legacy(
+        self,
+        serial: str,
+        command: str,
+        deadline: float = None,
+        token: CancellationToken = None,
+    ) -> Tuple[int, bytes]:
+        # the legacy shell protocol has no exit status, so it is appended to the output
+        service = f"shell:{command}; printf '\\000__adb_wrapper_exit__:%s' $?"
+
+        with self.open_device_service(serial, service, deadline, token) as sock:
+            output = self.read_until_close(sock)
+
+        output, sep, return_code = output.rpartition(_LEGACY_EXIT_MARKER)
+        if not sep:
+            return 1, output + return_code
+
+        return int(return_code.strip() or 1), output
+
+    def exec_out(
+        self,
+        serial: str,
+        command: str,
+        deadline: float = None,
+        token: CancellationToken = None,
+    ) -> Tuple[int, bytes]:
+        try:
+            with self.open_device_service(
+                serial, f"exec:{command}", deadline, token
+            ) as sock:
+                return 0, self.read_until_close(sock)
+        except AdbProtocolError as e:
+            return 1, f"error: {e}".encode()
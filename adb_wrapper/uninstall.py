@@ -0,0 +1,55 @@
+import shlex
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from .scripts import build_script, parse_script_output
+
+# package names per script, keeps each script well below the shell's argument limit
+UNINSTALL_BATCH_SIZE = 200
+
+
+@dataclass
+class UninstallReport:
+    removed: List[str] = field(default_factory=list)
+    not_installed: List[str] = field(default_factory=list)
+    excluded: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)  # name: error output
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def __repr__(self) -> str:
+        return (
+            f"UninstallReport(removed={len(self.removed)}, "
+            f"not_installed={len(self.not_installed)}, "
+            f"excluded={len(self.excluded)}, failed={len(self.failed)})"
+        )
+
+
+def build_uninstall_script(package_names: List[str], user: int = 0):
+    """
+    Returns a shell script that uninstalls all packages for the given user, and
+    the marker that prefixes the exit status line printed after each package.
+    """
+    return build_script(
+        [f"pm uninstall --user {user} {shlex.quote(name)}" for name in package_names]
+    )
+
+
+def parse_uninstall_script_output(output: str, package_names: List[str], marker: str):
+    """Returns a (removed, failed) tuple, failed maps package names to pm's output."""
+    removed = []
+    failed = {}
+    results = parse_script_output(output, marker, len(package_names))
+
+    for name, result in zip(package_names, results):
+        # older versions of pm exit with 0 on failure, so the output is checked too
+        if result is None:
+            failed[name] = "not uninstalled"
+        elif result[0] == 0 and "Success" in result[1]:
+            removed.append(name)
+        else:
+            failed[name] = result[1]
+
+    return removed, failed
@@ -0,0 +1,211 @@
+import json
+import posixpath
+import shlex
+import stat
+import time
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+# raw mode in hex, size, mtime and path, which comes last as it may hold spaces
+STAT_FORMAT = "%f %s %Y %n"
+# prefixes the stat of what a symlink points to
+LINK_PREFIX = "L "
+
+
+class RemoteEntry(NamedTuple):
+    path: str
+    type: str  # file, directory, symlink or other
+    size: int
+    mtime: int
+    mode: int  # permission bits
+    target_type: str = None  # of what a symlink points to, None if it dangles
+
+    @property
+    def resolved_type(self) -> str:
+        """The type of the entry, or of its target if it is a symlink."""
+        return self.target_type if self.type == "symlink" else self.type
+
+    @property
+    def is_directory(self) -> bool:
+        # like test -d, a symlink to a directory is a directory
+        return self.resolved_type == "directory"
+
+    @property
+    def is_file(self) -> bool:
+        return self.resolved_type == "file"
+
+
+def build_walk_script(root: str, max_depth: int = None) -> str:
+    """
+    Returns a script that stats root and everything below it. Symlinks are
+    also stated with -L, on lines starting with LINK_PREFIX.
+    """
+    root = shlex.quote(root)
+    stat_format = shlex.quote(STAT_FORMAT)
+    link_format = shlex.quote(LINK_PREFIX + STAT_FORMAT)
+    depth = f" -maxdepth {int(max_depth)}" if max_depth is not None else ""
+    # root is followed if it is a symlink, as /sdcard is
+    return (
+        f"stat -L -c {stat_format} {root} 2>/dev/null && "
+        f"find -H {root} -mindepth 1{depth} "
+        f"-exec stat -c {stat_format} {{}} + "
+        f"-type l -exec stat -L -c {link_format} {{}} + 2>/dev/null"
+    )
+
+
+def entry_type(mode: int) -> str:
+    if stat.S_ISDIR(mode):
+        return "directory"
+    if stat.S_ISREG(mode):
+        return "file"
+    if stat.S_ISLNK(mode):
+        return "symlink"
+    return "other"
+
+
+def parse_entry(line: str) -> Optional[RemoteEntry]:
+    parts = line.split(" ", 3)
+    if len(parts) != 4:
+        return None
+
+    try:
+        mode, size, mtime = int(parts[0], 16), int(parts[1]), int(parts[2])
+    except ValueError:
+        return None
+
+    return RemoteEntry(parts[3], entry_type(mode), size, mtime, stat.S_IMODE(mode))
+
+
+def iter_entries(lines: Iterable[str]) -> Iterator[RemoteEntry]:
+    """
+    Yields the entries of the output lines of a walk script. Symlinks are
+    yielded once the type of their target is known, or at the end if they
+    dangle.
+    """
+    links: Dict[str, RemoteEntry] = {}  # symlinks waiting for their target
+    targets: Dict[str, str] = {}  # target types that came before their symlink
+
+    for line in lines:
+        if line.startswith(LINK_PREFIX):
+            target = parse_entry(line[len(LINK_PREFIX) :])
+            if target is None:
+                continue
+
+            entry = links.pop(target.path, None)
+            if entry is None:
+                targets[target.path] = target.type
+            else:
+                yield entry._replace(target_type=target.type)
+            continue
+
+        entry = parse_entry(line)
+        if entry is None:
+            continue
+
+        if entry.type != "symlink":
+            yield entry
+        elif entry.path in targets:
+            yield entry._replace(target_type=targets.pop(entry.path))
+        else:
+            links[entry.path] = entry
+
+    yield from links.values()
+
+
+def normalize_path(path: str) -> str:
+    return posixpath.normpath(path) if path else path
+
+
+class TreeIndex:
+    """
+    The entries of a walked remote directory tree by path. Lookups under the
+    root are answered from the index, see covers. ttl limits how long the index
+    is trusted, None trusts it until it is invalidated.
+    """
+
+    def __init__(self, root: str, ttl: float = None) -> None:
+        self.root = normalize_path(root)
+        self.ttl = ttl
+        self.entries: Dict[str, RemoteEntry] = {}
+        self.walked_at = time.time()
+
+    @classmethod
+    def from_entries(cls, root: str, entries: Iterable[RemoteEntry], ttl=None):
+        index = cls(root, ttl)
+        for entry in entries:
+            index.add(entry)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries.values())
+
+    def add(self, entry: RemoteEntry):
+        self.entries[normalize_path(entry.path)] = entry
+
+    def get(self, path: str) -> Optional[RemoteEntry]:
+        return self.entries.get(normalize_path(path))
+
+    def is_fresh(self) -> bool:
+        return self.ttl is None or time.time() - self.walked_at < self.ttl
+
+    def covers(self, path: str) -> bool:
+        """
+        Whether path is the walked root or below it, in a fresh index. Paths
+        below a symlink aren't, as the walk doesn't follow symlinks.
+        """
+        path = normalize_path(path)
+        if not self.is_fresh() or not (
+            path == self.root or path.startswith(self.root.rstrip("/") + "/")
+        ):
+            return False
+
+        parent = posixpath.dirname(path)
+        while len(parent) > len(self.root):
+            entry = self.entries.get(parent)
+            if entry is not None and entry.type == "symlink":
+                return False
+            parent = posixpath.dirname(parent)
+        return True
+
+    def exists(self, path: str) -> bool:
+        return self.get(path) is not None
+
+    def is_directory(self, path: str) -> bool:
+        entry = self.get(path)
+        return entry is not None and entry.is_directory
+
+    def is_file(self, path: str) -> bool:
+        entry = self.get(path)
+        return entry is not None and entry.is_file
+
+    def children(self, directory: str) -> List[RemoteEntry]:
+        directory = normalize_path(directory)
+        return [
+            entry
+            for path, entry in self.entries.items()
+            if posixpath.dirname(path) == directory and path != directory
+        ]
+
+    def save(self, path: str):
+        with open(path, "w") as file:
+            json.dump(
+                {
+                    "root": self.root,
+                    "walked_at": self.walked_at,
+                    "entries": [list(entry) for entry in self.entries.values()],
+                },
+                file,
+            )
+
+    @classmethod
+    def load(cls, path: str, ttl: float = None) -> "TreeIndex":
+        with open(path) as file:
+            data = json.load(file)
+
+        index = cls.from_entries(
+            data["root"], (RemoteEntry(*entry) for entry in data["entries"]), ttl
+        )
+        index.walked_at = data["walked_at"]
+        return index
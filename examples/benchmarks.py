@@ -0,0 +1,242 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from adb_wrapper.adb import Device, Package
+from adb_wrapper.compression import COMPRESSION_POLICIES
+from adb_wrapper.transport import AdbServerTransport
+from tests.fakes import FAKE_SERIAL, FakeAdbServer, install_fake_adb
+
+"""
+Benchmarks for adb-wrapper. Without a device serial, they run against the fake
+adb binary and adb server used by the tests.
+"""
+
+
+def timed(func, iterations: int):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed / iterations * 1000
+
+
+def benchmark_transport(serial: str = None, iterations: int = 100):
+    """Compares the adb server socket transport with one adb process per command."""
+
+    def run(device: Device):
+        return timed(lambda: device.execute("shell echo ok", logging=False), iterations)
+
+    if serial:
+        results = {
+            "popen": run(Device(serial)),
+            "socket": run(Device(serial, transport=AdbServerTransport())),
+        }
+    else:
+        with tempfile.TemporaryDirectory() as directory, FakeAdbServer() as server:
+            sdk_path = install_fake_adb(directory)
+            os.environ["PATH"] = sdk_path + os.pathsep + os.environ.get("PATH", "")
+
+            results = {
+                "popen": run(Device(FAKE_SERIAL)),
+                "socket": run(
+                    Device(FAKE_SERIAL, transport=AdbServerTransport(port=server.port))
+                ),
+            }
+
+    for name, (elapsed, per_command) in results.items():
+        print(f"{name:>8}: {elapsed:.2f}s total, {per_command:.2f}ms per command")
+
+    return results
+
+
+class LegacyPackage:
+    # the dict based package model, without __eq__ and __hash__
+    def __init__(self, package_name=None, package_path=None, name=None):
+        self.package_name = package_name
+        self.package_path = package_path
+        self.img_src = None
+        self.name = name
+        self.genre = None
+        self.package_type = None
+
+
+def legacy_normalize_packages(packages, excluded_packages):
+    def to_package(p):
+        return p if isinstance(p, LegacyPackage) else LegacyPackage(p)
+
+    excluded_packages = [to_package(p) for p in excluded_packages]
+    return [
+        pkg for pkg in (to_package(p) for p in packages) if pkg not in excluded_packages
+    ]
+
+
+def benchmark_package(serial: str = None, iterations: int = 100, size: int = 5000):
+    """Compares memory use and exclusion time of the package models."""
+    names = [f"com.example.package{i}" for i in range(size)]
+    excluded = names[::10]
+    results = {}
+
+    for label, cls, normalize in (
+        ("legacy", LegacyPackage, legacy_normalize_packages),
+        ("slotted", Package, Package.normalize_packages),
+    ):
+        tracemalloc.start()
+        packages = [
+            cls(package_name=name, package_path=f"/data/app/{name}/base.apk")
+            for name in names
+        ]
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        rounds = max(1, iterations // 50)
+        elapsed, per_round = timed(lambda: normalize(packages, excluded), rounds)
+        results[label] = (memory, per_round)
+        print(
+            f"{label:>8}: {memory / 1024:.0f} KiB for {size} packages, "
+            f"{per_round:.2f}ms to exclude {len(excluded)} packages"
+        )
+
+    return results
+
+
+def benchmark_tar(serial: str = None, iterations: int = 100, size: int = 10000):
+    """
+    Compares pulling a directory of small files with one tar stream, with
+    multi-source pulls and with one adb pull per file. Per-file pulls are timed
+    on a sample of iterations files and extrapolated.
+    """
+
+    def run(device: Device, remote_dir: str, local_dir: str):
+        files = device.get_all_files_in_directory(remote_dir)
+        sample = files[:iterations]
+        per_file_dir = os.path.join(local_dir, "per_file")
+        os.makedirs(per_file_dir, exist_ok=True)
+
+        per_file, _ = timed(
+            lambda: [device.execute(f"pull {f} {per_file_dir}", False) for f in sample],
+            1,
+        )
+        batched, _ = timed(
+            lambda: device.pull_files(
+                files, destination_directory=os.path.join(local_dir, "batched")
+            ),
+            1,
+        )
+        streamed, _ = timed(
+            lambda: device.pull_directory(remote_dir, os.path.join(local_dir, "tar")),
+            1,
+        )
+
+        return {
+            "per file": per_file * len(files) / max(1, len(sample)),
+            "batched": batched,
+            "tar": streamed,
+        }, len(files)
+
+    with tempfile.TemporaryDirectory() as directory:
+        if serial:
+            results, count = run(Device(serial), "/sdcard/DCIM", directory)
+        else:
+            sdk_path = install_fake_adb(directory)
+            os.environ["PATH"] = sdk_path + os.pathsep + os.environ.get("PATH", "")
+
+            remote_dir = os.path.join(directory, "device")
+            for i in range(size):
+                path = os.path.join(remote_dir, f"dir{i % 100}", f"file{i}.txt")
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as file:
+                    file.write(os.urandom(2048))
+
+            results, count = run(Device(FAKE_SERIAL), remote_dir, directory)
+
+    for name, elapsed in results.items():
+        print(f"{name:>8}: {elapsed:.2f}s, {count / elapsed:.0f} files/s")
+
+    return results
+
+
+def benchmark_compression(serial: str = None, iterations: int = 100, size_mb: int = 8):
+    """
+    Reports the effective push throughput of each compression policy, for a
+    compressible (logs) and an incompressible (random bytes) payload. Run it
+    with a device serial on every link type to pick defaults. The fake adb
+    ignores compression, so without a serial only the harness is exercised.
+    """
+    policies = (None,) + COMPRESSION_POLICIES
+    rounds = max(1, iterations // 100)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        payloads = {}
+        for kind in ("logs", "random"):
+            payload_dir = os.path.join(directory, kind)
+            os.makedirs(payload_dir)
+            payloads[kind] = []
+
+            for i in range(size_mb):
+                path = os.path.join(payload_dir, f"{kind}{i}.bin")
+                with open(path, "wb") as file:
+                    if kind == "logs":
+                        line = f"{i:08} I ActivityManager: Start proc for activity\n"
+                        file.write(line.encode() * (1024 * 1024 // len(line)))
+                    else:
+                        file.write(os.urandom(1024 * 1024))
+                payloads[kind].append(path)
+
+        if serial:
+            device = Device(serial)
+            remote_dir = "/data/local/tmp/adb_wrapper_benchmark"
+        else:
+            sdk_path = install_fake_adb(directory)
+            os.environ["PATH"] = sdk_path + os.pathsep + os.environ.get("PATH", "")
+            device = Device(FAKE_SERIAL)
+            remote_dir = os.path.join(directory, "device")
+
+        for kind, files in payloads.items():
+            size = sum(os.path.getsize(path) for path in files) / (1024 * 1024)
+
+            for policy in policies:
+                elapsed, _ = timed(
+                    lambda: device.push_files(
+                        files, destination_directory=remote_dir, compression=policy
+                    ),
+                    rounds,
+                )
+                results[kind, policy] = size * rounds / elapsed
+                print(f"{kind:>7} {str(policy):>7}: {results[kind, policy]:.1f} MB/s")
+
+        if serial:
+            device.execute(f"shell rm -rf {remote_dir}", logging=False)
+
+    return results
+
+
+benchmarks = {
+    "transport": benchmark_transport,
+    "package": benchmark_package,
+    "tar": benchmark_tar,
+    "compression": benchmark_compression,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("benchmark", choices=list(benchmarks), nargs="?", default=None)
+    parser.add_argument("-s", "--serial", default=None)
+    parser.add_argument("-n", "--iterations", default=100, type=int)
+
+    args = vars(parser.parse_args())
+    selected = [args["benchmark"]] if args["benchmark"] else list(benchmarks)
+
+    for name in selected:
+        print(f"[{name}]")
+        benchmarks[name](args["serial"], args["iterations"])
@@ -1,4 +1,5 @@
 from adb_wrapper.adb import ADB, Device
+from adb_wrapper.fleet import Fleet
 import argparse
 import os
 
@@ -22,14 +23,13 @@ parser.add_argument("path", type=lambda x: is_valid_file(parser, x))
 args = vars(parser.parse_args())
 path = args["path"]
 
-adb = ADB()
-device: Device
-for device in adb.get_devices():
+
+def provision(device: Device):
     # get device model
-    print(device.get_model())
+    model = device.get_model()
     device.do_not_delete_packages = []
 
-    device.set_settings(
+    report = device.apply_settings(
         [
             "global.heads_up_notifications_enabled=0",
             "global.slide_down_notificationcenter_when_locked=0",
@@ -42,6 +42,8 @@ for device in adb.get_devices():
         ]
     )
 
+    print(device.id, report)
+
     device.google_debloat()
     device.install_package(path)
     device.disable_lock_screen()
@@ -52,3 +54,11 @@ for device in adb.get_devices():
     )
     device.set_home_app("com.example.example")
     device.uninstall_packages(["com.tblenovo.launcher"])
+    return model
+
+
+adb = ADB()
+fleet = Fleet.from_adb(adb, max_workers=8, max_per_group=4)
+
+for result in fleet.map(provision):
+    print(result)
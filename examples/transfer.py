@@ -63,15 +63,24 @@ if __name__ == "__main__":
 
     if is_push:
         source_files = get_pc_directory_files(source_directory, nested_files)
-        device.push_files(source_files, destination_directory=destination_directory)
+        results = device.push_files(
+            source_files, destination_directory=destination_directory
+        )
     else:
         source_files = (
             device.get_all_files_in_directory(source_directory)
             if nested_files
             else device.get_files_in_directory(source_directory)
         )
-        device.pull_files(source_files, destination_directory=destination_directory)
+        results = device.pull_files(
+            source_files, destination_directory=destination_directory
+        )
 
     pp = PrettyPrinter(indent=2)
     print(f"Source files ({len(source_files)}):")
     pp.pprint(source_files)
+
+    failed = [result for result in results if not result.ok]
+    if failed:
+        print(f"Failed transfers ({len(failed)}):")
+        pp.pprint(failed)
@@ -0,0 +1,14 @@
+import os
+import pytest
+
+from adb_wrapper import adb
+from tests.fakes import install_fake_adb
+
+
+@pytest.fixture
+def fake_adb(tmp_path, monkeypatch):
+    """Puts the fake adb binary first in PATH."""
+    sdk_path = install_fake_adb(str(tmp_path))
+    monkeypatch.setenv("PATH", sdk_path + os.pathsep + os.environ.get("PATH", ""))
+    monkeypatch.setattr(adb, "command_checked", False)
+    return sdk_path
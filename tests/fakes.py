@@ -0,0 +1,574 @@
+"""
+Fake adb binary and adb server, used by the tests and benchmarks in place of
+real devices. Shell commands are executed by the host's sh.
+"""
+
+import io
+import json
+import os
+import socketserver
+import struct
+import subprocess
+import sys
+import threading
+import zipfile
+
+FAKE_SERIAL = "emulator-5554"
+
+FAKE_ADB = r"""#!{python}
+import os
+import shutil
+import subprocess
+import sys
+
+args = sys.argv[1:]
+serial = None
+devices = os.environ.get("FAKE_ADB_DEVICES", "{serial}").split(",")
+
+# tcpip devices connected with adb connect, one ip:port per line
+connected_path = os.environ.get("FAKE_ADB_CONNECTED")
+connected = []
+if connected_path and os.path.exists(connected_path):
+    connected = open(connected_path).read().split()
+devices += connected
+
+if args[:1] == ["-s"]:
+    serial, args = args[1], args[2:]
+    if serial not in devices:
+        print(f"adb: device '{{serial}}' not found")
+        sys.exit(1)
+
+name, args = (args[0], args[1:]) if args else ("help", [])
+
+log_path = os.environ.get("FAKE_ADB_LOG")
+if log_path:
+    with open(log_path, "a") as file:
+        file.write(" ".join([str(serial), name] + args) + "\n")
+
+if name == "devices":
+    print("List of devices attached")
+    for device in devices:
+        print(f"{{device}}\tdevice")
+elif name == "track-devices":
+    # sends the device list whenever FAKE_ADB_DEVICES_FILE, if set, changes
+    import time
+    devices_path = os.environ.get("FAKE_ADB_DEVICES_FILE")
+    last = None
+    while True:
+        if devices_path and os.path.exists(devices_path):
+            listed = open(devices_path).read()
+        else:
+            listed = "".join(f"{{device}}\tdevice\n" for device in devices)
+        if listed != last:
+            data = listed.encode()
+            sys.stdout.buffer.write(b"%04x" % len(data) + data)
+            sys.stdout.buffer.flush()
+            last = listed
+        time.sleep(0.02)
+elif name in ("shell", "exec-out", "exec-in"):
+    # replaces this process, so killing the client kills the shell too
+    if not args:
+        os.execvp("sh", ["sh"])
+    os.dup2(1, 2)
+    os.execvp("sh", ["sh", "-c", " ".join(args)])
+elif name == "connect":
+    # every endpoint is reachable, unless FAKE_ADB_REACHABLE says otherwise
+    address = args[0] if ":" in args[0] else args[0] + ":5555"
+    reachable = os.environ.get("FAKE_ADB_REACHABLE")
+    if reachable is not None and address not in reachable.split(","):
+        print(f"failed to connect to '{{address}}': Connection refused")
+        sys.exit(1)
+    if address in connected:
+        print(f"already connected to {{address}}")
+    else:
+        if connected_path:
+            with open(connected_path, "a") as file:
+                file.write(address + "\n")
+        print(f"connected to {{address}}")
+elif name == "mdns" and args[:1] == ["services"]:
+    print("List of discovered mdns services")
+    print(os.environ.get("FAKE_ADB_MDNS", ""))
+elif name == "disconnect":
+    if connected_path and os.path.exists(connected_path):
+        import fcntl
+        # concurrent disconnects rewrite the file one at a time
+        with open(connected_path, "r+") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            remaining = [a for a in file.read().split() if a not in args]
+            file.seek(0)
+            file.truncate()
+            file.writelines(f"{{a}}\n" for a in remaining)
+    print(f"disconnected {{' '.join(args)}}")
+elif name == "get-state":
+    # devices in FAKE_ADB_UNAUTHORIZED haven't accepted the host's key
+    if serial in os.environ.get("FAKE_ADB_UNAUTHORIZED", "").split(","):
+        print("error: device unauthorized.")
+        sys.exit(1)
+    print("device")
+elif name in ("install", "install-multiple", "install-multi-package"):
+    # apks are installed unless they are missing or their content starts with "bad"
+    apks = [arg for arg in args if not arg.startswith("-")]
+    for apk in apks:
+        if not os.path.isfile(apk) or open(apk, "rb").read(3) == b"bad":
+            print(f"adb: failed to install {{apk}}: Failure [INSTALL_FAILED_INVALID_APK]")
+            sys.exit(1)
+    streamed = "--no-streaming" not in args
+    print("Performing Streamed Install" if streamed else "Performing Push Install")
+    print("Success")
+elif name in ("push", "pull"):
+    # the device's file system is the host's
+    # compression options don't change what the fake copies
+    while args[0] in ("-z", "-Z", "-a", "--sync"):
+        args = args[2:] if args[0] == "-z" else args[1:]
+    sources, target = args[:-1], args[-1]
+    if len(sources) > 1 and not os.path.isdir(target):
+        print(f"adb: error: target '{{target}}' is not a directory")
+        sys.exit(1)
+    if name == "push" and not os.path.isdir(target):
+        # adb push creates the missing parents of a target file
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+    failed = False
+    for source in sources:
+        if not os.path.exists(source):
+            if name == "push":
+                print(f"adb: error: cannot stat '{{source}}': No such file or directory")
+            else:
+                print(f"adb: error: failed to stat remote object '{{source}}': No such file or directory")
+            failed = True
+            continue
+        shutil.copy(source, target)
+        print(f"{{source}}: 1 file {{name}}ed, 0 skipped.")
+    sys.exit(1 if failed else 0)
+else:
+    print(f"adb: unknown command {{name}}")
+    sys.exit(1)
+"""
+
+
+def install_fake_adb(directory: str) -> str:
+    """
+    Writes the fake adb binary to a platform-tools folder inside directory and
+    returns the folder path, which should be prepended to PATH.
+    """
+    sdk_path = os.path.join(directory, "platform-tools")
+    os.makedirs(sdk_path, exist_ok=True)
+
+    adb_path = os.path.join(sdk_path, "adb")
+    with open(adb_path, "w") as file:
+        file.write(FAKE_ADB.format(python=sys.executable, serial=FAKE_SERIAL))
+
+    os.chmod(adb_path, 0o755)
+    return sdk_path
+
+
+def install_fake_getprop(directory: str, properties: dict) -> str:
+    """
+    Writes a fake getprop to directory, which serves the given properties.
+    """
+    lines = "".join(f"[{key}]: [{value}]\n" for key, value in properties.items())
+    path = os.path.join(directory, "getprop")
+
+    with open(path, "w") as file:
+        file.write(f"""#!{sys.executable}
+import sys
+lines = {lines!r}.splitlines()
+if len(sys.argv) == 1:
+    print("\\n".join(lines))
+for line in lines:
+    if len(sys.argv) > 1 and line.startswith("[" + sys.argv[1] + "]"):
+        print(line.split(": [", 1)[1][:-1])
+""")
+
+    os.chmod(path, 0o755)
+    return path
+
+
+def install_fake_settings(directory: str, settings: dict) -> str:
+    """
+    Writes a fake settings command to directory, which lists and updates the
+    given {namespace: {key: value}} settings, stored in settings.json.
+    """
+    state_path = os.path.join(directory, "settings.json")
+    with open(state_path, "w") as file:
+        json.dump(settings, file)
+
+    path = os.path.join(directory, "settings")
+    with open(path, "w") as file:
+        file.write(f"""#!{sys.executable}
+import json
+import sys
+with open({state_path!r}) as file:
+    settings = json.load(file)
+command, namespace, args = sys.argv[1], sys.argv[2], sys.argv[3:]
+if namespace not in ("system", "secure", "global"):
+    print(f"Invalid namespace '{{namespace}}'")
+    sys.exit(1)
+if command == "list":
+    for key, value in settings.get(namespace, {{}}).items():
+        print(f"{{key}}={{value}}")
+elif command == "put":
+    if args[1] == "invalid":
+        print(f"Invalid value for {{args[0]}}")
+        sys.exit(1)
+    settings.setdefault(namespace, {{}})[args[0]] = args[1]
+    with open({state_path!r}, "w") as file:
+        json.dump(settings, file)
+""")
+
+    os.chmod(path, 0o755)
+    return path
+
+
+def install_fake_pm(directory: str, packages: list) -> str:
+    """
+    Writes a fake pm command to directory, which lists and uninstalls the given
+    packages, stored in packages.json. Packages are dictionaries with name,
+    path, version_code, installer, third_party and protected keys. Uninstalling
+    a protected package fails.
+    """
+    state_path = os.path.join(directory, "packages.json")
+    with open(state_path, "w") as file:
+        json.dump(packages, file)
+
+    path = os.path.join(directory, "pm")
+    with open(path, "w") as file:
+        file.write(f"""#!{sys.executable}
+import json
+import sys
+with open({state_path!r}) as file:
+    packages = json.load(file)
+args = sys.argv[1:]
+if args[:2] == ["list", "packages"]:
+    for package in packages:
+        if "-3" in args and not package.get("third_party"):
+            continue
+        if "-s" in args and package.get("third_party"):
+            continue
+        line = "package:"
+        if "-f" in args:
+            line += package["path"] + "="
+        line += package["name"]
+        if "--show-versioncode" in args:
+            line += " versionCode:" + str(package.get("version_code", 1))
+        if "-i" in args:
+            line += " installer=" + str(package.get("installer"))
+        if "-U" in args:
+            line += " uid:" + str(package.get("uid", 10000))
+        print(line)
+elif args[:1] == ["path"]:
+    for package in packages:
+        if package["name"] == args[-1]:
+            print("package:" + package["path"])
+elif args[:1] == ["uninstall"]:
+    remaining = [package for package in packages if package["name"] != args[-1]]
+    protected = any(p.get("protected") for p in packages if p["name"] == args[-1])
+    if len(remaining) == len(packages) or protected:
+        print("Failure [DELETE_FAILED_INTERNAL_ERROR]")
+        sys.exit(1)
+    with open({state_path!r}, "w") as file:
+        json.dump(remaining, file)
+    print("Success")
+""")
+
+    os.chmod(path, 0o755)
+    return path
+
+
+def _binary_xml_string_pool(strings: list, utf8: bool) -> bytes:
+    data = b""
+    offsets = []
+
+    for string in strings:
+        offsets.append(len(data))
+        if utf8:
+            encoded = string.encode()
+            data += bytes([len(string), len(encoded)]) + encoded + b"\0"
+        else:
+            data += struct.pack("<H", len(string)) + string.encode("utf-16-le")
+            data += b"\0\0"
+
+    data += b"\0" * (-len(data) % 4)
+    header_size = 28
+    strings_start = header_size + 4 * len(strings)
+    return (
+        struct.pack(
+            "<HHIIIIII",
+            0x0001,
+            header_size,
+            strings_start + len(data),
+            len(strings),
+            0,
+            0x100 if utf8 else 0,
+            strings_start,
+            0,
+        )
+        + struct.pack(f"<{len(strings)}I", *offsets)
+        + data
+    )
+
+
+def build_binary_manifest(package_name: str, version_code: int, utf8=False) -> bytes:
+    """
+    Returns a minimal binary AndroidManifest.xml, as written by aapt2, with a
+    <manifest> element holding android:versionCode and package.
+    """
+    strings = [
+        "versionCode",
+        "package",
+        "android",
+        "http://schemas.android.com/apk/res/android",
+        "manifest",
+        package_name,
+    ]
+    resource_map = struct.pack("<HHII", 0x0180, 8, 12, 0x0101021B)
+
+    no_entry = 0xFFFFFFFF
+    attributes = struct.pack(
+        "<IIIHBBI", 3, 0, no_entry, 8, 0, 0x10, version_code
+    ) + struct.pack("<IIIHBBI", no_entry, 1, 5, 8, 0, 0x03, 5)
+    element = struct.pack("<IIHHHHHH", no_entry, 4, 20, 20, 2, 0, 0, 0) + attributes
+    start_element = (
+        struct.pack("<HHIII", 0x0102, 16, 16 + len(element), 1, no_entry) + element
+    )
+
+    body = _binary_xml_string_pool(strings, utf8) + resource_map + start_element
+    return struct.pack("<HHI", 0x0003, 8, 8 + len(body)) + body
+
+
+def _der(tag: int, content: bytes) -> bytes:
+    length = len(content)
+    if length < 0x80:
+        return bytes([tag, length]) + content
+
+    size = (length.bit_length() + 7) // 8
+    return bytes([tag, 0x80 | size]) + length.to_bytes(size, "big") + content
+
+
+def build_pkcs7(certificate: bytes) -> bytes:
+    """Returns a PKCS#7 SignedData structure holding certificate, as in META-INF."""
+    signed_data = _der(
+        0x30,
+        _der(0x02, b"\x01")
+        + _der(0x31, b"")
+        + _der(0x30, _der(0x06, bytes.fromhex("2a864886f70d010701")))
+        + _der(0xA0, certificate)
+        + _der(0x31, b""),
+    )
+    return _der(
+        0x30,
+        _der(0x06, bytes.fromhex("2a864886f70d010702")) + _der(0xA0, signed_data),
+    )
+
+
+def _length_prefixed(data: bytes) -> bytes:
+    return struct.pack("<I", len(data)) + data
+
+
+def build_signing_block(certificate: bytes, block_id: int = 0x7109871A) -> bytes:
+    """Returns an APK Signing Block with one signer, v2 by default."""
+    signed_data = (
+        _length_prefixed(b"")
+        + _length_prefixed(_length_prefixed(certificate))
+        + _length_prefixed(b"")
+    )
+    signer = (
+        _length_prefixed(signed_data) + _length_prefixed(b"") + _length_prefixed(b"")
+    )
+    value = _length_prefixed(_length_prefixed(signer))
+    pairs = struct.pack("<QI", len(value) + 4, block_id) + value
+    size = len(pairs) + 8 + 16
+    return (
+        struct.pack("<Q", size) + pairs + struct.pack("<Q", size) + b"APK Sig Block 42"
+    )
+
+
+def build_fake_apk(
+    path: str,
+    package_name: str,
+    version_code: int,
+    certificate: bytes = None,
+    scheme: str = "v2",
+    utf8: bool = False,
+) -> str:
+    """
+    Writes an apk with a binary manifest, signed with certificate (a fake DER
+    certificate) using the given scheme: v1, v2, v3 or None for unsigned.
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as apk:
+        apk.writestr(
+            "AndroidManifest.xml",
+            build_binary_manifest(package_name, version_code, utf8),
+        )
+        apk.writestr("classes.dex", b"dex\n035\0")
+        if scheme == "v1":
+            apk.writestr("META-INF/CERT.RSA", build_pkcs7(certificate))
+
+    data = buffer.getvalue()
+
+    if scheme in ("v2", "v3"):
+        block_id = 0x7109871A if scheme == "v2" else 0xF05368C0
+        block = build_signing_block(certificate, block_id)
+
+        # the block goes before the central directory, whose offset moves
+        eocd = data.rfind(b"PK\x05\x06")
+        (central_directory,) = struct.unpack_from("<I", data, eocd + 16)
+        eocd_record = bytearray(data[eocd:])
+        struct.pack_into("<I", eocd_record, 16, central_directory + len(block))
+        data = (
+            data[:central_directory]
+            + block
+            + data[central_directory:eocd]
+            + bytes(eocd_record)
+        )
+
+    with open(path, "wb") as file:
+        file.write(data)
+
+    return path
+
+
+class _FakeAdbHandler(socketserver.BaseRequestHandler):
+    def read_exactly(self, size):
+        data = b""
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError
+            data += chunk
+        return data
+
+    def okay(self, data: bytes = None):
+        self.request.sendall(b"OKAY")
+        if data is not None:
+            self.request.sendall(b"%04x" % len(data) + data)
+
+    def fail(self, message: str):
+        data = message.encode()
+        self.request.sendall(b"FAIL" + b"%04x" % len(data) + data)
+
+    def run_shell(self, command: str):
+        return subprocess.run(
+            ["sh", "-c", command], stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+
+    def track_devices(self):
+        server: FakeAdbServer = self.server
+        self.okay()
+        version = None
+
+        while not server.closed:
+            with server.changed:
+                if version == server.version:
+                    server.changed.wait(0.1)
+                    continue
+                version, output = server.version, server.device_list()
+
+            data = output.encode()
+            try:
+                self.request.sendall(b"%04x" % len(data) + data)
+            except OSError:
+                return
+
+    def handle(self):
+        server: FakeAdbServer = self.server
+        serial = None
+
+        while True:
+            try:
+                length = int(self.read_exactly(4), 16)
+                request = self.read_exactly(length).decode()
+            except ConnectionError:
+                return
+
+            server.requests.append(request)
+            service, _, argument = request.partition(":")
+
+            if request in ("host:devices", "host:devices-l"):
+                return self.okay(server.device_list().encode())
+
+            if request in ("host:track-devices", "host:track-devices-l"):
+                return self.track_devices()
+
+            if request.startswith("host:transport:"):
+                serial = request.split(":", 2)[2]
+                if serial not in server.devices:
+                    return self.fail(f"device '{serial}' not found")
+                self.okay()
+                continue
+
+            if request == "host:transport-any":
+                self.okay()
+                continue
+
+            if request.startswith("host-serial:") and request.endswith(":get-state"):
+                return self.okay(b"device")
+
+            if service == "shell,v2,raw" and server.shell_v2:
+                self.okay()
+                process = self.run_shell(argument)
+                for packet_id, data in ((1, process.stdout), (2, process.stderr)):
+                    if data:
+                        self.request.sendall(struct.pack("<BI", packet_id, len(data)))
+                        self.request.sendall(data)
+                self.request.sendall(struct.pack("<BI", 3, 1))
+                self.request.sendall(bytes([process.returncode & 0xFF]))
+                return
+
+            if service in ("shell", "exec"):
+                self.okay()
+                process = self.run_shell(argument)
+                self.request.sendall(process.stdout + process.stderr)
+                return
+
+            return self.fail(f"unknown service {request}")
+
+
+class FakeAdbServer(socketserver.ThreadingTCPServer):
+    """
+    A local adb server that answers the host protocol requests used by
+    AdbServerTransport. devices is a list of serials or a dictionary of
+    serial: state, set_devices changes them for device trackers.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, devices=None, shell_v2: bool = True):
+        super().__init__(("127.0.0.1", 0), _FakeAdbHandler)
+        self.devices = self._states(devices or [FAKE_SERIAL])
+        self.shell_v2 = shell_v2
+        self.requests = []
+        self.thread = None
+        self.changed = threading.Condition()
+        self.version = 0
+        self.closed = False
+
+    @staticmethod
+    def _states(devices) -> dict:
+        if isinstance(devices, dict):
+            return dict(devices)
+        return {device: "device" for device in devices}
+
+    def device_list(self) -> str:
+        return "".join(f"{d}\t{state}\n" for d, state in self.devices.items())
+
+    def set_devices(self, devices):
+        with self.changed:
+            self.devices = self._states(devices)
+            self.version += 1
+            self.changed.notify_all()
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.closed = True
+        self.shutdown()
+        self.server_close()
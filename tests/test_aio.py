@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+import pytest
+
+from adb_wrapper.adb import Device
+from adb_wrapper.aio import AsyncADB, AsyncDevice
+from tests.fakes import FAKE_SERIAL
+
+
+def test_async_get_devices(fake_adb, monkeypatch):
+    monkeypatch.setenv("FAKE_ADB_DEVICES", "serial-1,serial-2,serial-3")
+
+    async def main():
+        devices = await AsyncADB().get_devices()
+        return await asyncio.gather(
+            *(
+                device.execute(f"shell echo {device.id}", logging=False)
+                for device in devices
+            )
+        )
+
+    assert asyncio.run(main()) == ["serial-1", "serial-2", "serial-3"]
+
+
+def test_async_command_methods(fake_adb, tmp_path):
+    device = AsyncDevice(FAKE_SERIAL)
+
+    async def main():
+        return await asyncio.gather(
+            device.is_directory(str(tmp_path)),
+            device.is_directory(str(tmp_path / "missing")),
+        )
+
+    assert asyncio.run(main()) == [True, False]
+
+
+def test_async_timeout_kills_process(fake_adb):
+    device = AsyncDevice(FAKE_SERIAL)
+    start = time.perf_counter()
+
+    # exec, so the fake adb process is the only one holding the output pipe
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(device.execute("shell exec sleep 10", logging=False, timeout=0.5))
+
+    assert time.perf_counter() - start < 5
+
+
+def test_async_timeout_kills_process_of_thread(fake_adb):
+    class SlowDevice(Device):
+        def wait(self):
+            return self.execute("shell exec sleep 10", logging=False)
+
+    device = AsyncDevice(SlowDevice(FAKE_SERIAL))
+    start = time.perf_counter()
+
+    # methods without a command spec run in a thread, which asyncio.run waits for
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(device.wait(timeout=0.5))
+
+    assert time.perf_counter() - start < 5
+
+
+def test_async_cancellation(fake_adb):
+    device = AsyncDevice(FAKE_SERIAL)
+
+    async def main():
+        task = asyncio.create_task(device.execute("shell exec sleep 10", logging=False))
+        await asyncio.sleep(0.5)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return task.cancelled()
+
+    assert asyncio.run(main())
@@ -0,0 +1,106 @@
+import hashlib
+import os
+import shutil
+import struct
+import zipfile
+
+import pytest
+
+from adb_wrapper import apk
+from adb_wrapper.adb import Device
+from adb_wrapper.transport import AdbServerTransport
+from tests.fakes import FAKE_SERIAL, FakeAdbServer, build_fake_apk, install_fake_pm
+
+CERTIFICATE = b"\x30\x0a" + b"fake cert!"
+
+
+@pytest.mark.parametrize("scheme", ["v1", "v2", "v3"])
+def test_read_apk_info(tmp_path, scheme):
+    path = build_fake_apk(
+        str(tmp_path / "app.apk"), "org.example.app", 42, CERTIFICATE, scheme
+    )
+
+    info = apk.read_apk_info_uncached(path)
+
+    assert info.package_name == "org.example.app"
+    assert info.version_code == 42
+    assert info.certificate_sha256 == hashlib.sha256(CERTIFICATE).hexdigest()
+    assert info.signature_scheme == scheme
+
+
+def test_read_unsigned_utf8_apk(tmp_path):
+    path = build_fake_apk(
+        str(tmp_path / "app.apk"), "org.example.app", 7, scheme=None, utf8=True
+    )
+
+    assert apk.read_apk_info_uncached(path) == ("org.example.app", 7, None, None)
+
+
+def test_read_invalid_apk(tmp_path):
+    path = tmp_path / "invalid.apk"
+    path.write_bytes(b"not a zip")
+
+    with pytest.raises(apk.ApkError):
+        apk.read_apk_info(str(path))
+
+
+def test_read_malformed_apk(tmp_path, fake_adb):
+    # a string pool chunk that ends before its header
+    manifest = struct.pack("<HHI", 3, 8, 20) + struct.pack("<HHI", 1, 28, 12)
+    path = str(tmp_path / "malformed.apk")
+    with zipfile.ZipFile(path, "w") as file:
+        file.writestr(apk.MANIFEST_PATH, manifest + b"\0" * 4)
+
+    with pytest.raises(apk.ApkError):
+        apk.read_apk_info(path)
+
+    # installed anyway, the device tells whether it is a valid apk
+    assert not Device(FAKE_SERIAL).is_up_to_date([path])
+
+
+def test_apk_info_cached_by_file_hash(tmp_path, monkeypatch):
+    path = build_fake_apk(
+        str(tmp_path / "app.apk"), "org.example.cached", 3, CERTIFICATE
+    )
+    copy = shutil.copy(path, tmp_path / "copy.apk")
+    calls = []
+
+    def read(path):
+        calls.append(path)
+        return read_uncached(path)
+
+    read_uncached = apk.read_apk_info_uncached
+    monkeypatch.setattr(apk, "read_apk_info_uncached", read)
+    monkeypatch.setattr(apk, "_apk_info_cache", {})
+
+    assert apk.read_apk_info(path) == apk.read_apk_info(copy)
+    assert len(calls) == 1
+
+
+def test_install_skips_up_to_date_apks(fake_adb, tmp_path, monkeypatch):
+    install_fake_pm(
+        str(tmp_path),
+        [{"name": "org.example.app", "path": "/data/app/base.apk", "version_code": 42}],
+    )
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+
+    current = build_fake_apk(
+        str(tmp_path / "current.apk"), "org.example.app", 42, CERTIFICATE
+    )
+    newer = build_fake_apk(
+        str(tmp_path / "newer.apk"), "org.example.app", 43, CERTIFICATE
+    )
+    other = build_fake_apk(
+        str(tmp_path / "other.apk"), "org.example.other", 1, CERTIFICATE
+    )
+
+    with FakeAdbServer() as server:
+        device = Device(FAKE_SERIAL, transport=AdbServerTransport(port=server.port))
+        results = device.install_packages([current, newer, other])
+
+        assert [result.skipped for result in results] == [True, False, False]
+        assert all(result.ok for result in results)
+        assert len([r for r in server.requests if r.startswith("shell")]) == 1
+
+        results = device.install_packages([current], skip_up_to_date=False)
+        assert not results[0].skipped and results[0].ok
@@ -0,0 +1,158 @@
+import os
+
+import pytest
+
+from adb_wrapper.adb import Device, command
+from adb_wrapper.batch import BatchCall
+from adb_wrapper.scripts import split_commands
+from tests.fakes import FAKE_SERIAL, install_fake_getprop
+
+
+class EchoDevice(Device):
+    @command("shell printf %s.")
+    def echo(self, *words):
+        return self.output
+
+
+@pytest.fixture
+def adb_log(fake_adb, tmp_path, monkeypatch):
+    path = tmp_path / "adb.log"
+    monkeypatch.setenv("FAKE_ADB_LOG", str(path))
+
+    def invocations():
+        # scripts span several lines of the log
+        lines = path.read_text().splitlines() if path.exists() else []
+        return [line for line in lines if line.startswith(f"{FAKE_SERIAL} ")]
+
+    return invocations
+
+
+def test_quoting_matches_unbatched(fake_adb):
+    device = EchoDevice(FAKE_SERIAL)
+    words = ["a b", "it's", "$HOME", "*"]
+
+    with device.batch():
+        batched = device.echo(*words)
+        script = device.run_shell_script("echo a | wc -c")
+
+    assert batched.value == device.echo(*words) == "a b.it's.$HOME.*."
+    assert script.value == device.run_shell_script("echo a | wc -c") == "2"
+
+
+def test_split_commands():
+    assert split_commands(["a" * 10] * 4, 250) == [[0, 1], [2, 3]]
+    assert split_commands(["a" * 500, "b"], 250) == [[0], [1]]
+
+
+def test_batch_runs_once(adb_log):
+    device = EchoDevice(FAKE_SERIAL)
+
+    with device.batch() as batch:
+        first = device.execute("shell echo one", logging=False)
+        second = device.echo("a b", "it's", "$HOME")
+        assert isinstance(first, BatchCall) and not first.done
+        assert adb_log() == []
+
+    assert first.value == "one"
+    assert second.value == "a b.it's.$HOME."
+    assert batch.scripts == 1 and len(adb_log()) == 1
+    assert device.output == "a b.it's.$HOME." and device.return_code == 0
+
+
+def test_batch_exit_codes(fake_adb):
+    device = Device(FAKE_SERIAL)
+
+    with device.batch(raise_errors=False) as batch:
+        failed = device.execute("shell echo error; exit 3", logging=False)
+        after = device.execute("shell echo after", logging=False)
+
+    assert isinstance(failed.error, RuntimeError) and after.value == "after"
+    assert device.result.exit_code == 0 and batch.errors == [failed.error]
+
+    with pytest.raises(RuntimeError):
+        with device.batch():
+            device.execute("shell echo error; exit 1", logging=False)
+
+
+def test_batch_splits_long_scripts(adb_log):
+    device = Device(FAKE_SERIAL)
+
+    with device.batch(max_script_length=400) as batch:
+        calls = [device.execute(f"shell echo {i}", logging=False) for i in range(10)]
+
+    assert [call.value for call in calls] == [str(i) for i in range(10)]
+    assert batch.scripts == len(adb_log()) > 1
+
+
+def test_other_commands_keep_order(adb_log, tmp_path):
+    device = Device(FAKE_SERIAL)
+    (tmp_path / "a.txt").write_text("a")
+
+    with device.batch() as batch:
+        queued = device.execute("shell echo queued", logging=False)
+        device.push_file(str(tmp_path / "a.txt"), str(tmp_path / "b.txt"))
+        assert queued.value == "queued"
+
+        with device.batch() as nested:
+            last = device.execute("shell echo last", logging=False)
+        assert nested is batch and not last.done
+
+    assert last.value == "last"
+    assert [line.split()[1] for line in adb_log()] == ["shell", "push", "shell"]
+
+
+def test_batch_is_cancelled_on_error(adb_log):
+    device = Device(FAKE_SERIAL)
+
+    with pytest.raises(KeyError):
+        with device.batch():
+            call = device.execute("shell echo never", logging=False)
+            raise KeyError()
+
+    assert isinstance(call.error, RuntimeError) and adb_log() == []
+    assert device.execute("shell echo direct", logging=False) == "direct"
+
+
+def test_composite_methods_run_directly(fake_adb, tmp_path, monkeypatch):
+    install_fake_getprop(str(tmp_path), {"ro.product.model": "TB-X104F"})
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+    device = Device(FAKE_SERIAL)
+
+    with device.batch():
+        queued = device.execute("shell echo queued", logging=False)
+        assert device.get_model() == "TB-X104F"
+        assert queued.value == "queued"
+
+        after = device.execute("shell echo after", logging=False)
+        assert not after.done
+
+    assert after.value == "after"
+
+
+def test_grant_permissions_is_batched(adb_log, tmp_path, monkeypatch):
+    # a fake package manager on the "device"
+    pm = tmp_path / "pm"
+    pm.write_text('#!/bin/sh\necho "$@" >> "$PM_LOG"\n')
+    pm.chmod(0o755)
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+    monkeypatch.setenv("PM_LOG", str(tmp_path / "pm.log"))
+
+    permissions = [f"android.permission.P{i}" for i in range(5)]
+    Device(FAKE_SERIAL).grant_permissions("com.example", permissions)
+
+    assert len(adb_log()) == 1
+    assert (tmp_path / "pm.log").read_text().splitlines() == [
+        f"grant com.example {permission}" for permission in permissions
+    ]
+
+
+def test_pending_calls_cannot_be_tested(fake_adb, tmp_path):
+    device = Device(FAKE_SERIAL)
+    (tmp_path / "a.txt").write_text("a")
+
+    with device.batch():
+        exists = device.fetch_file_exists(str(tmp_path / "a.txt"))
+        with pytest.raises(RuntimeError):
+            bool(exists)
+
+    assert exists and exists.value is True
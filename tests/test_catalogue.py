@@ -0,0 +1,42 @@
+from adb_wrapper import adb
+from adb_wrapper.adb import (
+    ADB,
+    Package,
+    PackageType,
+    extend_google_catalogue,
+    get_google_catalogue,
+)
+from adb_wrapper.catalogue import CATALOGUE_FIELDS, read_catalogue_source
+
+
+def test_compiled_catalogue_matches_source():
+    # run `python -m adb_wrapper.catalogue` if google.json was edited
+    from adb_wrapper._google_catalogue import PACKAGES
+
+    source = read_catalogue_source()
+    assert PACKAGES == tuple(
+        tuple(entry.get(key) for key in CATALOGUE_FIELDS) for entry in source
+    )
+
+
+def test_catalogue_is_built_once():
+    catalogue = get_google_catalogue()
+
+    assert get_google_catalogue() is catalogue
+    assert ADB().get_google_packages()[0] is catalogue.packages[0]
+    assert "com.google.android.marvin.talkback" in catalogue
+    assert all(p.package_type == PackageType.GOOGLE for p in catalogue)
+
+
+def test_extend_catalogue(monkeypatch):
+    monkeypatch.setattr(adb, "_google_package_catalogue", get_google_catalogue())
+    size = len(get_google_catalogue())
+
+    catalogue = extend_google_catalogue(
+        ["com.example.bloat", {"package_name": "com.example.other", "name": "Other"}]
+    )
+
+    assert len(catalogue) == size + 2
+    assert get_google_catalogue() is catalogue
+    assert catalogue.get("com.example.other").name == "Other"
+    assert Package("com.example.bloat") in ADB().get_google_packages()
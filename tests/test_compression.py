@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from adb_wrapper.adb import Device
+from adb_wrapper.compression import compression_flags, is_compressible
+from adb_wrapper.transfer import plan_transfers
+from tests.fakes import FAKE_SERIAL
+
+
+@pytest.fixture
+def payloads(tmp_path):
+    text = tmp_path / "data.bin"
+    text.write_bytes(b"GET /index.html 200\n" * 10000)
+    noise = tmp_path / "noise.bin"
+    noise.write_bytes(os.urandom(200000))
+    photo = tmp_path / "photo.jpg"
+    photo.write_bytes(b"\0" * 10000)
+    return str(text), str(noise), str(photo)
+
+
+def test_compression_flags(payloads):
+    text, noise, photo = payloads
+
+    assert compression_flags(None, text) == []
+    assert compression_flags("none", text) == ["-Z"]
+    assert compression_flags("zstd", photo) == ["-z", "zstd"]
+    assert compression_flags("auto", text) == ["-z", "any"]
+    assert compression_flags("auto", noise) == ["-Z"]
+    assert compression_flags("auto", photo) == ["-Z"]
+    assert compression_flags("auto", "/sdcard/log.txt", local=False) == ["-z", "any"]
+
+    with pytest.raises(ValueError):
+        compression_flags("gzip", text)
+
+
+def test_is_compressible_samples_unknown_extensions(payloads):
+    text, noise, photo = payloads
+
+    assert is_compressible(text)
+    assert not is_compressible(noise)
+    assert not is_compressible(photo)
+
+
+def test_auto_compression_splits_batches(payloads, fake_adb, tmp_path, monkeypatch):
+    batches = plan_transfers("push", payloads, None, "/sdcard", compression="auto")
+    assert sorted((b.sources, b.flags) for b in batches) == sorted(
+        [
+            (payloads[:1], ("-z", "any")),
+            (payloads[1:], ("-Z",)),
+        ]
+    )
+
+    log_path = tmp_path / "adb.log"
+    monkeypatch.setenv("FAKE_ADB_LOG", str(log_path))
+
+    results = Device(FAKE_SERIAL).push_files(
+        list(payloads),
+        destination_directory=str(tmp_path / "device"),
+        compression="lz4",
+    )
+
+    assert all(result.ok for result in results)
+    assert " push -z lz4 " in log_path.read_text()
@@ -0,0 +1,76 @@
+import random
+import time
+
+from adb_wrapper.connections import ConnectionManager, backoff_delay
+
+
+def endpoints(count):
+    return [f"192.168.1.{i}:5555" for i in range(1, count + 1)]
+
+
+def test_backoff_delay():
+    rng = random.Random(0)
+    delays = [backoff_delay(attempts, 0.5, 4.0, rng) for attempts in range(8)]
+
+    assert all(0 <= delay <= min(4.0, 0.5 * 2**n) for n, delay in enumerate(delays))
+    # jittered, so devices failing together don't retry together
+    assert len(set(delays)) == len(delays)
+
+
+def test_connect_all_and_reconnect(fake_adb, tmp_path, monkeypatch):
+    connected_path = tmp_path / "connected"
+    monkeypatch.setenv("FAKE_ADB_CONNECTED", str(connected_path))
+
+    manager = ConnectionManager(endpoints(20), max_workers=20)
+    assert manager.connect_all(timeout=30)
+    assert len(connected_path.read_text().split()) == 20
+    assert {device.id for device in manager.get_devices()} == set(endpoints(20))
+    assert manager.metrics().reconnects == 0
+
+    # the adb server restarted and forgot every connection
+    connected_path.write_text("")
+    states = manager.check()
+
+    assert set(states.values()) == {"connected"}
+    metrics = manager.metrics()
+    assert metrics.states == {"connected": 20}
+    assert metrics.reconnects == 20 and len(metrics.latencies) == 20
+
+
+def test_unreachable_endpoint_backs_off(fake_adb, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_ADB_CONNECTED", str(tmp_path / "connected"))
+    monkeypatch.setenv("FAKE_ADB_REACHABLE", "192.168.1.1:5555")
+
+    manager = ConnectionManager(endpoints(2), base_delay=60, max_delay=60)
+    assert not manager.connect_all(timeout=0.5)
+
+    reachable, unreachable = manager.endpoints.values()
+    assert reachable.state == "connected"
+    assert unreachable.state == "disconnected"
+    assert unreachable.attempts == 1
+    assert "Connection refused" in unreachable.last_error
+
+    # still backing off, so the next check doesn't try again
+    if unreachable.next_attempt > time.monotonic():
+        manager.check()
+        assert unreachable.attempts == 1
+
+
+def test_keep_alive(fake_adb, tmp_path, monkeypatch):
+    connected_path = tmp_path / "connected"
+    monkeypatch.setenv("FAKE_ADB_CONNECTED", str(connected_path))
+
+    with ConnectionManager(endpoints(3), probe_interval=0.05) as manager:
+        deadline = time.monotonic() + 10
+        while manager.metrics().states != {"connected": 3}:
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+
+        connected_path.write_text("")
+        while manager.metrics().reconnects < 3:
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+
+    manager.disconnect_all()
+    assert connected_path.read_text() == ""
+    assert set(manager.states().values()) == {"disconnected"}
@@ -0,0 +1,108 @@
+import asyncio
+import socket
+import time
+from contextlib import ExitStack
+
+import pytest
+
+from adb_wrapper import discovery
+from adb_wrapper.discovery import (
+    connect_endpoints,
+    discover_devices,
+    iter_hosts,
+    parse_mdns_services,
+    scan,
+)
+
+
+def listen(stack: ExitStack, host: str, port: int = 0) -> int:
+    sock = stack.enter_context(socket.socket())
+    sock.bind((host, port))
+    sock.listen(16)
+    return sock.getsockname()[1]
+
+
+def test_iter_hosts():
+    assert iter_hosts("10.0.0.0/30") == ["10.0.0.1", "10.0.0.2"]
+    assert len(iter_hosts("10.0.0.7/22")) == 1022
+    assert iter_hosts(["10.0.0.9"]) == ["10.0.0.9"]
+
+
+def test_parse_mdns_services():
+    output = (
+        "List of discovered mdns services\n"
+        "adb-R58M-AbCd\t_adb-tls-connect._tcp\t192.168.1.20:37261\n"
+        "adb-R58M-AbCd\t_adb-tls-pairing._tcp\t192.168.1.20:41033\n"
+        "adb-emulator\t_adb._tcp.\t192.168.1.21:5555\n"
+    )
+
+    assert parse_mdns_services(output) == ["192.168.1.20:37261", "192.168.1.21:5555"]
+
+
+def test_scan_local_sockets():
+    with ExitStack() as stack:
+        port = listen(stack, "127.0.0.1")
+        try:
+            for host in ("127.0.0.3", "127.0.0.6"):
+                listen(stack, host, port)
+        except OSError:
+            pytest.skip("port taken on another loopback address")
+
+        start = time.perf_counter()
+        # a /22, every other address refuses the connection
+        endpoints = asyncio.run(scan("127.0.0.0/22", port, timeout=2))
+
+        assert endpoints == [f"127.0.0.{i}:{port}" for i in (1, 3, 6)]
+        assert time.perf_counter() - start < 10
+
+
+def test_discover_devices(fake_adb, tmp_path, monkeypatch):
+    connected_path = tmp_path / "connected"
+    monkeypatch.setenv("FAKE_ADB_CONNECTED", str(connected_path))
+    monkeypatch.setenv(
+        "FAKE_ADB_MDNS", "adb-R58M\t_adb-tls-connect._tcp\t192.168.1.20:37261"
+    )
+
+    with ExitStack() as stack:
+        port = listen(stack, "127.0.0.1")
+        devices = discover_devices("127.0.0.0/29", port=port, mdns=True)
+
+    assert [device.id for device in devices] == [
+        f"127.0.0.1:{port}",
+        "192.168.1.20:37261",
+    ]
+    assert set(connected_path.read_text().split()) == {device.id for device in devices}
+
+
+def test_connect_endpoints_skips_unauthorized(fake_adb, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_ADB_CONNECTED", str(tmp_path / "connected"))
+    monkeypatch.setenv("FAKE_ADB_UNAUTHORIZED", "192.168.1.21:5555")
+    monkeypatch.setenv("FAKE_ADB_REACHABLE", "192.168.1.20:5555,192.168.1.21:5555")
+
+    endpoints = ["192.168.1.20:5555", "192.168.1.21:5555", "192.168.1.22:5555"]
+    devices = asyncio.run(connect_endpoints(endpoints))
+
+    assert [device.id for device in devices] == ["192.168.1.20:5555"]
+
+
+def test_discover_survives_mdns_timeout(fake_adb, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_ADB_CONNECTED", str(tmp_path / "connected"))
+    run_command_args = discovery.run_command_args
+    timeouts = []
+
+    async def run(command_args, timeout=None):
+        timeouts.append(timeout)
+        if command_args[1:2] == ["mdns"]:
+            raise asyncio.TimeoutError()
+        return await run_command_args(command_args, timeout)
+
+    monkeypatch.setattr(discovery, "run_command_args", run)
+
+    with ExitStack() as stack:
+        port = listen(stack, "127.0.0.1")
+        devices = discover_devices(
+            ["127.0.0.1"], port=port, mdns=True, connect_timeout=3
+        )
+
+    assert [device.id for device in devices] == [f"127.0.0.1:{port}"]
+    assert set(timeouts) == {3}
@@ -0,0 +1,63 @@
+import threading
+import time
+
+import pytest
+
+from adb_wrapper.adb import ADB, Device
+from adb_wrapper.fleet import Fleet, usb_hub
+
+
+def test_fleet_partial_failures():
+    devices = [Device(f"serial-{i}") for i in range(5)]
+
+    def provision(device: Device):
+        if device.id == "serial-2":
+            raise RuntimeError("provisioning failed")
+        return device.id.upper()
+
+    results = Fleet(devices, max_workers=3).map(provision)
+
+    assert [result.device for result in results] == devices
+    assert [result.ok for result in results] == [True, True, False, True, True]
+    assert results[0].result == "SERIAL-0"
+    assert isinstance(results[2].error, RuntimeError)
+
+
+def test_fleet_max_per_group():
+    devices = [
+        Device(f"serial-{i}", attributes={"usb": f"1-{i % 2}.{i}"}) for i in range(8)
+    ]
+    lock = threading.Lock()
+    running, peak = {}, {}
+
+    def provision(device: Device):
+        hub = usb_hub(device)
+        with lock:
+            running[hub] = running.get(hub, 0) + 1
+            peak[hub] = max(peak.get(hub, 0), running[hub])
+        time.sleep(0.05)
+        with lock:
+            running[hub] -= 1
+
+    results = Fleet(devices, max_workers=8, max_per_group=2).map(provision)
+
+    assert all(result.ok for result in results)
+    assert peak == {"1-0": 2, "1-1": 2}
+
+    with pytest.raises(ValueError):
+        Fleet(devices, max_per_group=0)
+
+
+def test_usb_hub():
+    assert usb_hub(Device("192.168.1.20:5555")) == "192.168.1.20"
+    assert usb_hub(Device("serial", attributes={"usb": "1-1.2.3"})) == "1-1.2"
+    assert usb_hub(Device("emulator-5554")) is None
+
+
+def test_fleet_from_adb(fake_adb, monkeypatch):
+    monkeypatch.setenv("FAKE_ADB_DEVICES", "serial-1,serial-2")
+
+    fleet = Fleet.from_adb(ADB())
+    results = fleet.execute("shell echo ok", logging=False)
+
+    assert [result.result for result in results] == ["ok", "ok"]
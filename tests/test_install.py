@@ -0,0 +1,71 @@
+from adb_wrapper.adb import Device, Package
+from adb_wrapper.fleet import Fleet
+from adb_wrapper.install import build_install_command
+from tests.fakes import FAKE_SERIAL
+
+
+def write_apks(directory, *names, content=b"PK"):
+    paths = []
+    for name in names:
+        path = directory / name
+        path.write_bytes(content)
+        paths.append(str(path))
+    return paths
+
+
+def test_build_install_command():
+    assert build_install_command(["a.apk"]) == "install -r a.apk"
+    assert (
+        build_install_command(["base.apk", "split config.apk"], streaming=True)
+        == "install-multiple -r --streaming base.apk 'split config.apk'"
+    )
+    assert (
+        build_install_command(["a.apk", "b.apk"], replace=False, multi_package=True)
+        == "install-multi-package a.apk b.apk"
+    )
+
+
+def test_install_packages(fake_adb, tmp_path, monkeypatch):
+    log_path = tmp_path / "installs.log"
+    monkeypatch.setenv("FAKE_ADB_LOG", str(log_path))
+
+    app = write_apks(tmp_path, "app.apk")[0]
+    splits = write_apks(tmp_path, "base.apk", "split_config.arm64_v8a.apk")
+    broken = write_apks(tmp_path, "broken.apk", content=b"bad")[0]
+
+    device = Device(FAKE_SERIAL)
+    results = device.install_packages([app, splits, broken], streaming=False)
+
+    assert [result.ok for result in results] == [True, True, False]
+    assert results[1].apks == tuple(splits)
+    assert "INSTALL_FAILED_INVALID_APK" in results[2].output
+    assert all(result.duration > 0 for result in results)
+
+    log = log_path.read_text().splitlines()
+    assert log[0] == f"{FAKE_SERIAL} install -r --no-streaming {app}"
+    assert log[1].startswith(f"{FAKE_SERIAL} install-multiple -r --no-streaming")
+
+    results = device.install_packages(
+        [Package(package_path=app), splits], atomic=True, skip_up_to_date=False
+    )
+    assert len(results) == 2 and results[0].ok
+    assert results[0] is results[1] and results[0].apks == (app, *splits)
+    assert log_path.read_text().splitlines()[-1].split()[1:] == [
+        "install-multi-package",
+        "-r",
+        app,
+        *splits,
+    ]
+
+
+def test_fleet_install(fake_adb, tmp_path, monkeypatch):
+    serials = [f"emulator-{5554 + 2 * i}" for i in range(6)]
+    monkeypatch.setenv("FAKE_ADB_DEVICES", ",".join(serials))
+    apks = write_apks(tmp_path, "base.apk", "split_config.xxhdpi.apk")
+
+    results = Fleet([Device(serial) for serial in serials], max_workers=3).install(
+        [apks]
+    )
+
+    assert [result.device.id for result in results] == serials
+    assert all(result.ok and result.result[0].ok for result in results)
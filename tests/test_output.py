@@ -0,0 +1,59 @@
+from adb_wrapper import adb
+from adb_wrapper.adb import CommandResult, Device
+from tests.fakes import FAKE_SERIAL
+
+BINARY = bytes(range(256)) * 4
+
+
+def test_text_is_decoded_on_access():
+    result = CommandResult(("adb",), b"  \n caf\xc3\xa9\n\n", 0, 0.1)
+
+    assert "text" not in result.__dict__
+    assert bytes(result.view) == b"caf\xc3\xa9"
+    assert result.text == "café"
+    assert result.text is result.text
+
+
+def test_log_text_is_truncated():
+    result = CommandResult(("adb",), b"x" * 100 + b"\n", 0, 0.1)
+
+    assert result.log_text(limit=200) == "x" * 100
+    assert result.log_text(limit=10) == "x" * 10 + "\n... (90 more bytes)"
+
+
+def test_logging_is_truncated(fake_adb, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(adb, "MAX_LOG_BYTES", 64)
+    (tmp_path / "dump.txt").write_text("y" * 1000)
+    device = Device(FAKE_SERIAL)
+
+    output = device.execute(f"shell cat {tmp_path / 'dump.txt'}")
+
+    assert output == "y" * 1000
+    assert capsys.readouterr().out == "y" * 64 + "\n... (936 more bytes)\n"
+
+
+def test_exec_out_is_binary_safe(fake_adb, tmp_path):
+    source = tmp_path / "screen.png"
+    source.write_bytes(BINARY)
+    device = Device(FAKE_SERIAL)
+
+    assert device.exec_out(f"cat {source}") == BINARY
+    # the raw output was never decoded
+    assert "text" not in device.result.__dict__
+    assert b"".join(device.stream_exec_out(f"cat {source}")) == BINARY
+
+
+def test_screencap(fake_adb, tmp_path, monkeypatch):
+    # the fake device's screencap prints a png
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    screencap = bin_dir / "screencap"
+    screencap.write_text("#!/bin/sh\nprintf '\\211PNG\\r\\n\\032\\n\\000\\377'\n")
+    screencap.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}:{fake_adb}:/usr/bin:/bin")
+
+    path = tmp_path / "screen.png"
+    png = Device(FAKE_SERIAL).screencap(str(path))
+
+    assert png == b"\x89PNG\r\n\x1a\n\x00\xff"
+    assert path.read_bytes() == png
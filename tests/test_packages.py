@@ -0,0 +1,146 @@
+import json
+import os
+import pickle
+
+import pytest
+
+from adb_wrapper.adb import Device, Package, PackageIndex, PackageType
+from adb_wrapper.transport import AdbServerTransport
+from tests.fakes import FAKE_SERIAL, FakeAdbServer, install_fake_pm
+
+installed = [
+    {
+        "name": "com.google.android.apps.maps",
+        "path": "/product/app/Maps/Maps.apk",
+        "version_code": 1070,
+        "installer": None,
+    },
+    {
+        "name": "org.example.app",
+        "path": "/data/app/~~a==/org.example.app-b==/base.apk",
+        "version_code": 42,
+        "installer": "com.android.vending",
+        "third_party": True,
+    },
+]
+
+
+def test_parse_index_line():
+    package = PackageIndex.parse_line(
+        "package:/data/app/~~a==/org.example-b==/base.apk=org.example "
+        "versionCode:42 installer=com.android.vending uid:10101",
+        third_party_packages={"org.example"},
+    )
+
+    assert package.package_name == "org.example"
+    assert package.package_path == "/data/app/~~a==/org.example-b==/base.apk"
+    assert package.version_code == 42
+    assert package.installer == "com.android.vending"
+    assert package.uid == "10101"
+    assert package.package_type == PackageType.THIRD_PARTY
+
+
+def test_package_index(tmp_path, monkeypatch):
+    install_fake_pm(str(tmp_path), installed)
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+
+    with FakeAdbServer() as server:
+        device = Device(FAKE_SERIAL, transport=AdbServerTransport(port=server.port))
+
+        third_party = device.get_packages(PackageType.THIRD_PARTY)
+        assert [p.package_name for p in third_party] == ["org.example.app"]
+
+        system = device.get_packages(PackageType.SYSTEM)
+        assert [p.package_name for p in system] == ["com.google.android.apps.maps"]
+
+        for _ in range(100):
+            assert device.get_package_name(installed[1]["path"]) == "org.example.app"
+
+        index = device.get_package_index()
+        assert index.filter(installer="com.android.vending") == third_party
+        assert len([r for r in server.requests if r.startswith("shell")]) == 1
+
+        maps = device.get_packages(package_name="com.google.android.apps.maps")
+        assert maps[0].package_type == PackageType.SYSTEM
+
+
+def test_package_index_update():
+    index = PackageIndex()
+    first = PackageIndex.parse_line("package:/a.apk=com.a versionCode:1")
+    second = PackageIndex.parse_line("package:/b.apk=com.b versionCode:1")
+
+    assert index.update([first, second]) == (["com.a", "com.b"], [], [])
+
+    updated = PackageIndex.parse_line("package:/a2.apk=com.a versionCode:2")
+    assert index.update([updated]) == ([], ["com.b"], ["com.a"])
+    assert index.get_by_path("/a2.apk") is updated
+    assert index.get_by_path("/a.apk") is None
+
+
+def test_package_is_hashable_and_immutable():
+    first = Package("com.example", package_path="/a.apk")
+    second = Package("com.example", package_path="/b.apk")
+
+    assert first == second
+    assert len({first, second}) == 1
+    assert first.replace(version_code=2).version_code == 2
+    assert pickle.loads(pickle.dumps(first)).package_path == "/a.apk"
+
+    with pytest.raises(AttributeError):
+        first.package_name = "com.other"
+
+
+def test_normalize_packages():
+    packages = ["com.a", Package("com.b"), "com.c", "com.a"]
+    excluded = ["com.b", Package("com.c")]
+
+    assert Package.normalize_packages(packages, excluded) == [Package("com.a")]
+    assert len(Package.normalize_packages(packages)) == 3
+
+
+def test_uninstall_packages(tmp_path, monkeypatch):
+    packages = installed + [
+        {
+            "name": "com.example.protected",
+            "path": "/system/app/P.apk",
+            "protected": True,
+        },
+        {"name": "com.example.kept", "path": "/data/app/kept/base.apk"},
+    ]
+    install_fake_pm(str(tmp_path), packages)
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+
+    with FakeAdbServer() as server:
+        device = Device(FAKE_SERIAL, transport=AdbServerTransport(port=server.port))
+        report = device.uninstall_packages(
+            [
+                "com.google.android.apps.maps",
+                "org.example.app",
+                "org.example.missing",
+                "com.example.protected",
+                "com.example.kept",
+            ],
+            excluded_packages=["com.example.kept"],
+        )
+
+        assert report.removed == ["com.google.android.apps.maps", "org.example.app"]
+        assert report.not_installed == ["org.example.missing"]
+        assert report.excluded == ["com.example.kept"]
+        assert "DELETE_FAILED" in report.failed["com.example.protected"]
+        assert not report.ok
+
+        # one listing and one uninstall script
+        assert len([r for r in server.requests if r.startswith("shell")]) == 2
+
+        index = device.get_package_index()
+        assert "org.example.app" not in index
+        assert "com.example.protected" in index
+
+        # installed by someone else since the index was built
+        state = json.loads((tmp_path / "packages.json").read_text())
+        state.append({"name": "org.example.new", "path": "/data/app/new/base.apk"})
+        (tmp_path / "packages.json").write_text(json.dumps(state))
+
+        report = device.uninstall_packages(["org.example.app", "org.example.new"])
+        assert report.not_installed == ["org.example.app"]
+        assert report.removed == ["org.example.new"]
@@ -0,0 +1,70 @@
+import os
+
+from adb_wrapper.adb import Device
+from adb_wrapper.properties import parse_properties
+from adb_wrapper.transport import AdbServerTransport
+from tests.fakes import FAKE_SERIAL, FakeAdbServer, install_fake_getprop
+
+properties = {
+    "ro.product.model": "TB-X104F",
+    "ro.product.manufacturer": "LENOVO",
+    "ro.product.name": "TB-X104F",
+    "ro.build.version.sdk": "27",
+    "ro.boot.hwc": "ROW",
+    "persist.sys.timezone": "Europe/Berlin",
+}
+
+
+def test_parse_properties():
+    output = "[ro.a]: [1]\n[ro.multi]: [first\nsecond]\n[ro.empty]: []\n"
+
+    assert parse_properties(output) == {
+        "ro.a": "1",
+        "ro.multi": "first\nsecond",
+        "ro.empty": "",
+    }
+
+
+def test_property_getters_use_one_snapshot(tmp_path, monkeypatch):
+    install_fake_getprop(str(tmp_path), properties)
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+
+    with FakeAdbServer() as server:
+        device = Device(FAKE_SERIAL, transport=AdbServerTransport(port=server.port))
+
+        assert device.get_model() == "TB-X104F"
+        assert device.get_vendor() == "LENOVO"
+        assert device.get_name() == "TB-X104F"
+        assert device.get_sdk() == "27"
+        assert device.get_region_code() == "ROW"
+        assert device.get_shell_property("ro.missing") == ""
+
+        shell_requests = [r for r in server.requests if r.startswith("shell")]
+        assert len(shell_requests) == 1
+
+
+def test_property_cache_expiry(tmp_path, monkeypatch):
+    install_fake_getprop(str(tmp_path), properties)
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+
+    with FakeAdbServer() as server:
+        device = Device(FAKE_SERIAL, transport=AdbServerTransport(port=server.port))
+        device.property_cache.ttl = 0
+
+        def shell_requests():
+            return [r for r in server.requests if r.startswith("shell")]
+
+        device.get_model()
+        # read-only properties only need a boot id check once expired
+        device.get_model()
+        assert shell_requests()[-1].endswith("cat /proc/sys/kernel/random/boot_id")
+        assert len(shell_requests()) == 2
+
+        # other properties are reloaded
+        assert device.get_shell_property("persist.sys.timezone") == "Europe/Berlin"
+        assert shell_requests()[-1].endswith("getprop")
+
+        device.invalidate_properties()
+        device.property_cache.ttl = 60
+        device.get_model()
+        assert len(shell_requests()) == 4
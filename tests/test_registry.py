@@ -0,0 +1,143 @@
+import asyncio
+import time
+
+import pytest
+
+from adb_wrapper.adb import ADB, Device
+from adb_wrapper.registry import DeviceRegistry, parse_device_list
+from adb_wrapper.transport import AdbServerTransport
+from tests.fakes import FAKE_SERIAL, FakeAdbServer
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_parse_device_list():
+    output = (
+        "List of devices attached\n"
+        "emulator-5554\tdevice product:sdk model:Pixel transport_id:1\n"
+        "R58M\tunauthorized usb:1-1 transport_id:2\n"
+    )
+
+    assert parse_device_list(output) == {
+        "emulator-5554": (
+            "device",
+            {"product": "sdk", "model": "Pixel", "transport_id": "1"},
+        ),
+        "R58M": ("unauthorized", {"usb": "1-1", "transport_id": "2"}),
+    }
+
+
+def test_registry_over_server():
+    with FakeAdbServer() as server:
+        adb = ADB(transport=AdbServerTransport(port=server.port))
+        registry = adb.start_device_registry()
+        events = []
+        registry.on_attach(events.append)
+        registry.on_detach(events.append)
+        registry.on_change(events.append)
+
+        try:
+            devices = adb.get_devices()
+            assert [device.id for device in devices] == [FAKE_SERIAL]
+            assert adb.get_devices()[0] is devices[0]
+
+            server.set_devices({FAKE_SERIAL: "device", "R58M": "unauthorized"})
+            wait_until(lambda: len(events) == 1)
+            assert (events[0].kind, events[0].device.id) == ("attach", "R58M")
+
+            server.set_devices({FAKE_SERIAL: "offline", "R58M": "device"})
+            wait_until(lambda: len(events) == 3)
+            assert {(e.kind, e.device.id, e.previous_state) for e in events[1:]} == {
+                ("change", FAKE_SERIAL, "device"),
+                ("change", "R58M", "unauthorized"),
+            }
+
+            server.set_devices({"R58M": "device"})
+            wait_until(lambda: len(events) == 4)
+            assert (events[3].kind, events[3].device) == ("detach", devices[0])
+
+            # reattached devices are the same objects
+            server.set_devices({FAKE_SERIAL: "device", "R58M": "device"})
+            wait_until(lambda: len(adb.get_devices()) == 2)
+            assert adb.get_device(FAKE_SERIAL) is devices[0]
+            assert devices[0].state == "device"
+        finally:
+            adb.stop_device_registry()
+
+        # a single stream, the devices never had to be listed again
+        assert server.requests == ["host:track-devices-l"]
+
+
+def test_registry_events():
+    with FakeAdbServer() as server:
+        adb = ADB(transport=AdbServerTransport(port=server.port))
+        registry = adb.start_device_registry()
+
+        async def main():
+            events = registry.events()
+            next_event = asyncio.ensure_future(events.__anext__())
+            await asyncio.sleep(0.05)
+            server.set_devices([FAKE_SERIAL, "serial-2"])
+            event = await asyncio.wait_for(next_event, 5)
+            await events.aclose()
+            return event
+
+        try:
+            event = asyncio.run(main())
+            assert (event.kind, event.device.id) == ("attach", "serial-2")
+            assert not registry.queues
+        finally:
+            adb.stop_device_registry()
+
+
+def test_registry_wait_for():
+    with FakeAdbServer(devices={FAKE_SERIAL: "offline"}) as server:
+        adb = ADB(transport=AdbServerTransport(port=server.port))
+        registry = adb.start_device_registry()
+
+        try:
+            assert registry.wait_for(FAKE_SERIAL, timeout=0.1) is None
+            server.set_devices([FAKE_SERIAL])
+            assert registry.wait_for(FAKE_SERIAL, timeout=5).state == "device"
+        finally:
+            adb.stop_device_registry()
+
+
+def test_registry_over_adb_process(fake_adb, tmp_path, monkeypatch):
+    devices_path = tmp_path / "devices"
+    devices_path.write_text(f"{FAKE_SERIAL}\tdevice\n")
+    monkeypatch.setenv("FAKE_ADB_DEVICES_FILE", str(devices_path))
+
+    adb = ADB()
+    registry = adb.start_device_registry()
+
+    try:
+        assert [device.id for device in adb.get_devices()] == [FAKE_SERIAL]
+
+        devices_path.write_text(f"{FAKE_SERIAL}\tdevice\nserial-2\tbootloader\n")
+        wait_until(lambda: registry.get_device("serial-2") is not None)
+        assert registry.get_devices(states=("bootloader",))[0].id == "serial-2"
+    finally:
+        adb.stop_device_registry()
+
+    assert not registry.is_running()
+
+
+def test_registry_device_factory(fake_adb, tmp_path, monkeypatch):
+    devices_path = tmp_path / "devices"
+    devices_path.write_text(f"{FAKE_SERIAL}\tdevice usb:1-1\n")
+    monkeypatch.setenv("FAKE_ADB_DEVICES_FILE", str(devices_path))
+
+    with DeviceRegistry(Device) as registry:
+        device = registry.get_device(FAKE_SERIAL)
+
+    assert device.transport is None and device.state == "device"
+    assert device.attributes == {"usb": "1-1"}
+
+    with pytest.raises(ValueError):
+        DeviceRegistry(Device, base_cmd="adb-missing").start()
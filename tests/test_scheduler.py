@@ -0,0 +1,240 @@
+import threading
+import time
+
+import pytest
+
+from adb_wrapper.adb import ADB, Device
+from adb_wrapper.scheduler import (
+    CancellationToken,
+    CommandCancelled,
+    CommandScheduler,
+    command_priority,
+    usb_bus,
+)
+from tests.fakes import FAKE_SERIAL
+
+
+def job(log, name, release=None):
+    def run(deadline, token):
+        if release is not None:
+            release.wait(5)
+        log.append(name)
+        return name
+
+    return run
+
+
+def test_command_priority():
+    assert command_priority(["push", "a", "/sdcard/a"]) == "bulk"
+    assert command_priority(["shell", "ip", "route"]) == "interactive"
+    assert usb_bus("1-1.2") == "1" and usb_bus(None) is None
+
+
+def test_priorities_and_fair_sharing():
+    log = []
+    release = threading.Event()
+
+    with CommandScheduler(max_workers=1) as scheduler:
+        scheduler.submit("a", job(log, "blocker", release))
+        time.sleep(0.05)
+
+        futures = [
+            scheduler.submit("a", job(log, "a background"), "background"),
+            scheduler.submit("a", job(log, "a bulk"), "bulk"),
+            scheduler.submit("a", job(log, "a interactive"), "interactive"),
+            scheduler.submit("b", job(log, "b interactive 1")),
+            scheduler.submit("b", job(log, "b interactive 2")),
+        ]
+        assert scheduler.metrics().depth == 5
+
+        release.set()
+        for future in futures:
+            future.result(5)
+
+    # devices take turns, each device runs its highest priority first
+    assert log == [
+        "blocker",
+        "b interactive 1",
+        "a interactive",
+        "b interactive 2",
+        "a bulk",
+        "a background",
+    ]
+
+
+def test_interactive_runs_next_to_bulk():
+    release = threading.Event()
+    log = []
+
+    with CommandScheduler() as scheduler:
+        transfer = scheduler.submit(FAKE_SERIAL, job(log, "push", release), "bulk")
+        queued = scheduler.submit(FAKE_SERIAL, job(log, "pull"), "bulk")
+
+        assert scheduler.run(FAKE_SERIAL, job(log, "get ip")) == "get ip"
+        assert log == ["get ip"] and not queued.done()
+
+        metrics = scheduler.metrics()
+        assert metrics.queued[FAKE_SERIAL]["bulk"] == 1
+        assert metrics.oldest_wait[FAKE_SERIAL] > 0
+
+        release.set()
+        transfer.result(5), queued.result(5)
+
+    assert scheduler.metrics().waits["interactive"].count == 1
+
+
+def test_bulk_cap_per_bus():
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def transfer(deadline, token):
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.pop()
+
+    with CommandScheduler(max_workers=8, max_bulk_per_bus=2) as scheduler:
+        futures = [
+            scheduler.submit(f"device-{i}", transfer, "bulk", bus="1") for i in range(6)
+        ]
+        for future in futures:
+            future.result(5)
+
+    assert max(peak) == 2
+
+
+def test_queued_deadline_and_cancellation():
+    release = threading.Event()
+    token = CancellationToken()
+
+    with CommandScheduler(max_workers=1) as scheduler:
+        scheduler.submit("a", job([], "blocker", release))
+        expired = scheduler.submit(
+            "a", job([], "late"), deadline=time.monotonic() + 0.05
+        )
+        cancelled = scheduler.submit("a", job([], "cancelled"), token=token)
+
+        token.cancel()
+        with pytest.raises(CommandCancelled):
+            cancelled.result(5)
+        with pytest.raises(TimeoutError):
+            expired.result(5)
+
+        release.set()
+
+
+def test_run_times_out_while_queued():
+    release = threading.Event()
+
+    with CommandScheduler(max_workers=1) as scheduler:
+        scheduler.submit("a", job([], "transfer", release), "bulk")
+        time.sleep(0.05)
+        start = time.monotonic()
+
+        with pytest.raises(TimeoutError):
+            scheduler.run("a", job([], "late"), deadline=time.monotonic() + 0.2)
+
+        assert time.monotonic() - start < 1
+        release.set()
+
+
+def test_host_commands_run_in_parallel():
+    def connect(deadline, token):
+        time.sleep(0.2)
+
+    with CommandScheduler(max_workers=8) as scheduler:
+        start = time.monotonic()
+        futures = [scheduler.submit(None, connect) for _ in range(8)]
+        for future in futures:
+            future.result(5)
+
+    assert time.monotonic() - start < 0.8
+
+
+def test_execute_timeout_kills_command(fake_adb):
+    device = Device(FAKE_SERIAL)
+    start = time.monotonic()
+
+    with pytest.raises(TimeoutError):
+        device.execute("shell sleep 10", logging=False, timeout=0.3)
+
+    assert time.monotonic() - start < 5
+
+
+def test_cancel_running_command(fake_adb):
+    with CommandScheduler() as scheduler:
+        adb = ADB(scheduler=scheduler)
+        device = Device(FAKE_SERIAL, scheduler=scheduler)
+        token = CancellationToken()
+        threading.Timer(0.3, token.cancel).start()
+        start = time.monotonic()
+
+        with pytest.raises(CommandCancelled):
+            device.execute("shell sleep 10", logging=False, token=token)
+
+        assert time.monotonic() - start < 5
+        assert device.execute("shell echo ok", logging=False) == "ok"
+        assert adb.get_devices()[0].scheduler is scheduler
+
+
+def test_stream_timeout(fake_adb):
+    device = Device(FAKE_SERIAL)
+    start = time.monotonic()
+
+    with pytest.raises(TimeoutError):
+        stream = device.execute("shell exec sleep 3", False, stream=True, timeout=0.3)
+        for line in stream:
+            pass
+
+    assert time.monotonic() - start < 2.5
+
+
+def test_streams_are_scheduled_as_bulk(fake_adb, tmp_path):
+    (tmp_path / "remote").mkdir()
+    (tmp_path / "remote" / "a.txt").write_text("a")
+
+    with CommandScheduler() as scheduler:
+        device = Device(FAKE_SERIAL, scheduler=scheduler)
+        pulled = device.pull_directory(
+            str(tmp_path / "remote"), str(tmp_path / "local")
+        )
+
+        assert pulled == ["a.txt"]
+        assert scheduler.metrics().waits["bulk"].count == 1
+
+
+def test_commands_inside_open_stream(fake_adb, tmp_path):
+    (tmp_path / "remote").mkdir()
+    (tmp_path / "remote" / "a.txt").write_text("a")
+    scheduler = CommandScheduler()
+    device = Device(FAKE_SERIAL, scheduler=scheduler)
+
+    try:
+        # the stream holds the device's only interactive slot
+        with device.command_options(timeout=5):
+            for path in device.iter_all_files_in_directory(str(tmp_path / "remote")):
+                assert device.file_exists(path)
+                device.pull_file(path, str(tmp_path / "a.txt"))
+
+        assert (tmp_path / "a.txt").read_text() == "a"
+        waits = scheduler.metrics().waits
+        assert waits["interactive"].count == 1 and waits["bulk"].count == 0
+    finally:
+        # a stream that isn't closed keeps its worker
+        scheduler.shutdown(wait=False)
+
+
+def test_command_options_priority(fake_adb, tmp_path):
+    with CommandScheduler() as scheduler:
+        device = Device(FAKE_SERIAL, scheduler=scheduler)
+
+        with device.command_options(priority="background"):
+            device.execute("shell echo one", logging=False)
+        (tmp_path / "a.txt").write_text("a")
+        device.push_file(str(tmp_path / "a.txt"), str(tmp_path / "b.txt"))
+
+        waits = scheduler.metrics().waits
+        assert waits["background"].count == 1 and waits["bulk"].count == 1
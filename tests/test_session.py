@@ -0,0 +1,76 @@
+import time
+
+import pytest
+
+from adb_wrapper.adb import Device
+from adb_wrapper.session import ShellSessionError
+from tests.fakes import FAKE_SERIAL
+
+
+def test_session_reuses_shell(fake_adb):
+    device = Device(FAKE_SERIAL)
+
+    with device.session() as session:
+        pid = session.process.pid
+
+        for i in range(50):
+            assert device.execute(f"shell echo {i}", logging=False) == str(i)
+
+        assert session.process.pid == pid
+
+    assert device.shell_session is None
+    assert session.process is None
+
+
+def test_session_return_codes(fake_adb, tmp_path):
+    device = Device(FAKE_SERIAL)
+
+    with device.session():
+        assert device.is_directory(str(tmp_path))
+        assert not device.file_exists(str(tmp_path / "missing"))
+        assert device.execute("shell echo error >&2", logging=False) == "error"
+
+
+def test_session_commands_are_isolated(fake_adb):
+    device = Device(FAKE_SERIAL)
+
+    with device.session() as session:
+        cwd = device.execute("shell pwd", logging=False)
+        device.run_shell_script("cd / && NAME=leaked")
+        device.execute("shell exit 3", logging=False)
+        assert device.return_code == 3
+
+        assert device.execute("shell pwd", logging=False) == cwd
+        assert device.execute("shell echo ${NAME:-unset}", logging=False) == "unset"
+        assert session.restarts == 0
+
+
+def test_session_restarts_dead_shell(fake_adb):
+    device = Device(FAKE_SERIAL)
+
+    with device.session() as session:
+        session.process.kill()
+        session.process.wait()
+
+        assert device.execute("shell echo alive", logging=False) == "alive"
+        assert session.restarts == 1
+
+        # the shell dies while running a command
+        with pytest.raises(ShellSessionError):
+            device.execute("shell kill -9 $$", logging=False)
+
+        assert device.execute("shell echo alive", logging=False) == "alive"
+        assert session.restarts == 2
+
+
+def test_session_timeout(fake_adb):
+    device = Device(FAKE_SERIAL)
+
+    with device.session() as session:
+        start = time.monotonic()
+        with pytest.raises(TimeoutError):
+            device.execute("shell sleep 3", logging=False, timeout=0.3)
+
+        assert time.monotonic() - start < 1.5
+        assert device.execute("shell echo next", logging=False) == "next"
+        assert session.restarts == 1
@@ -0,0 +1,63 @@
+import json
+import os
+
+from adb_wrapper.adb import Device
+from adb_wrapper.transport import AdbServerTransport
+from tests.fakes import FAKE_SERIAL, FakeAdbServer, install_fake_settings
+
+profile = [
+    "global.heads_up_notifications_enabled=0",
+    "system.screen_off_timeout=600000",
+    "secure.lock_screen_show_notifications=0",
+    "secure.location_mode=0",
+]
+
+
+def test_apply_settings(tmp_path, monkeypatch):
+    install_fake_settings(
+        str(tmp_path),
+        {
+            "global": {"heads_up_notifications_enabled": "1"},
+            "system": {"screen_off_timeout": "600000"},
+            "secure": {"location_mode": "3"},
+        },
+    )
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+
+    with FakeAdbServer() as server:
+        device = Device(FAKE_SERIAL, transport=AdbServerTransport(port=server.port))
+        report = device.apply_settings(profile)
+
+        assert report.ok
+        assert report.unchanged == ["system.screen_off_timeout"]
+        assert report.changed == {
+            "global.heads_up_notifications_enabled": ("1", "0"),
+            "secure.lock_screen_show_notifications": (None, "0"),
+            "secure.location_mode": ("3", "0"),
+        }
+        assert len([r for r in server.requests if r.startswith("shell")]) == 4
+
+        # an already provisioned device costs three reads and no writes
+        server.requests.clear()
+        report = device.apply_settings(profile)
+
+        assert not report.changed
+        assert len(report.unchanged) == len(profile)
+        assert len([r for r in server.requests if r.startswith("shell")]) == 3
+
+    with open(tmp_path / "settings.json") as file:
+        assert json.load(file)["secure"]["location_mode"] == "0"
+
+
+def test_apply_settings_failures(tmp_path, monkeypatch):
+    install_fake_settings(str(tmp_path), {})
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+
+    with FakeAdbServer() as server:
+        device = Device(FAKE_SERIAL, transport=AdbServerTransport(port=server.port))
+        report = device.apply_settings(["system.font_scale=1.1"])
+
+        assert report.changed == {"system.font_scale": (None, "1.1")}
+
+        report = device.apply_settings(["system.font_scale=invalid"])
+        assert report.failed == {"system.font_scale": "Invalid value for font_scale"}
@@ -0,0 +1,66 @@
+import time
+
+import pytest
+
+from adb_wrapper.adb import Device, Package
+from adb_wrapper.transport import AdbServerTransport
+from tests.fakes import FAKE_SERIAL, FakeAdbServer
+
+
+def test_stream_lines_arrive_before_exit(fake_adb):
+    device = Device(FAKE_SERIAL)
+    lines = device.execute("shell 'echo first; sleep 1; echo second'", stream=True)
+
+    start = time.perf_counter()
+    assert next(lines) == "first"
+    assert time.perf_counter() - start < 1
+
+    assert list(lines) == ["second"]
+    assert device.return_code == 0
+
+
+def test_stream_chunks(fake_adb):
+    device = Device(FAKE_SERIAL)
+    chunks = device.execute("exec-out seq 1 2", False, stream="chunks")
+
+    assert b"".join(chunks) == b"1\n2\n"
+
+
+def test_stream_early_close_stops_command(fake_adb):
+    device = Device(FAKE_SERIAL)
+    lines = device.execute("shell exec yes", False, stream=True)
+
+    assert next(lines) == "y"
+    start = time.perf_counter()
+    lines.close()
+    assert time.perf_counter() - start < 1
+
+
+def test_stream_checks_return_code(fake_adb):
+    device = Device(FAKE_SERIAL)
+    lines = device.execute("shell 'echo error: failed; exit 3'", False, stream=True)
+
+    with pytest.raises(RuntimeError, match="failed"):
+        list(lines)
+
+
+def test_stream_transport():
+    with FakeAdbServer() as server:
+        device = Device(FAKE_SERIAL, transport=AdbServerTransport(port=server.port))
+        lines = device.execute("shell 'seq 1 3; exit 1'", False, stream=True)
+
+        assert list(lines) == ["1", "2", "3"]
+        assert device.return_code == 1
+
+
+def test_parse_package_lines():
+    lines = iter(
+        [
+            "package:/system/app/Maps/Maps.apk=com.google.android.apps.maps",
+            "package:/data/app/~~x==/org.example-y==/base.apk=org.example",
+        ]
+    )
+    packages = Package.iter_packages(lines)
+
+    assert next(packages).package_name == "com.google.android.apps.maps"
+    assert next(packages).package_path == "/data/app/~~x==/org.example-y==/base.apk"
@@ -0,0 +1,107 @@
+import os
+
+import pytest
+
+from adb_wrapper.adb import Device
+from adb_wrapper.sync import MANIFEST_NAME, FileEntry, parse_manifest_output
+from tests.fakes import FAKE_SERIAL
+
+
+def test_parse_manifest_output():
+    output = "\n".join(
+        [
+            "12 1700000000 ./DCIM/a b.jpg",
+            "find: ./private: Permission denied",
+            "3 1700000001 ./notes.txt",
+            "__marker__",
+            "0cc175b9c0f1b6a831c399e269772661  ./notes.txt",
+        ]
+    )
+
+    assert parse_manifest_output(output, "__marker__") == {
+        "DCIM/a b.jpg": FileEntry(12, 1700000000),
+        "notes.txt": FileEntry(3, 1700000001, "0cc175b9c0f1b6a831c399e269772661"),
+    }
+
+
+def make_tree(root, files):
+    for path, content in files.items():
+        path = root / path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+def pulls(log_path):
+    if not log_path.exists():
+        return []
+    return [line for line in log_path.read_text().splitlines() if " pull " in line]
+
+
+@pytest.mark.parametrize("checksum", [False, True])
+def test_sync_pull(fake_adb, tmp_path, monkeypatch, checksum):
+    log_path = tmp_path / "adb.log"
+    monkeypatch.setenv("FAKE_ADB_LOG", str(log_path))
+
+    remote, local = tmp_path / "device", tmp_path / "local"
+    make_tree(remote, {"DCIM/a.jpg": "a", "DCIM/b.jpg": "b", "notes.txt": "n"})
+    device = Device(FAKE_SERIAL)
+
+    report = device.sync(str(local), str(remote), checksum=checksum)
+    assert sorted(report.transferred) == ["DCIM/a.jpg", "DCIM/b.jpg", "notes.txt"]
+    assert (local / "DCIM" / "b.jpg").read_text() == "b"
+    assert (local / MANIFEST_NAME).exists()
+
+    # nothing changed, nothing is pulled
+    log_path.unlink()
+    report = device.sync(str(local), str(remote), checksum=checksum)
+    assert report.transferred == [] and len(report.unchanged) == 3
+    assert pulls(log_path) == []
+
+    (remote / "DCIM" / "a.jpg").write_text("changed")
+    (remote / "notes.txt").unlink()
+    make_tree(local, {"extra.txt": "x"})
+
+    report = device.sync(str(local), str(remote), delete=True, checksum=checksum)
+    assert report.transferred == ["DCIM/a.jpg"]
+    assert sorted(report.deleted) == ["extra.txt", "notes.txt"]
+    assert (local / "DCIM" / "a.jpg").read_text() == "changed"
+    assert not (local / "notes.txt").exists()
+
+
+def test_sync_push(fake_adb, tmp_path, monkeypatch):
+    remote, local = tmp_path / "device", tmp_path / "local"
+    make_tree(local, {"a.txt": "a", "nested/b.txt": "b"})
+    make_tree(remote, {"stale.txt": "s"})
+    device = Device(FAKE_SERIAL)
+
+    report = device.sync(str(local), str(remote), direction="push", delete=True)
+    assert sorted(report.transferred) == ["a.txt", "nested/b.txt"]
+    assert report.deleted == ["stale.txt"]
+    assert (remote / "nested" / "b.txt").read_text() == "b"
+    assert not (remote / "stale.txt").exists()
+
+    report = device.sync(str(local), str(remote), direction="push")
+    assert report.transferred == [] and len(report.unchanged) == 2
+
+
+def test_sync_keeps_custom_manifest(fake_adb, tmp_path):
+    remote, local = tmp_path / "device", tmp_path / "local"
+    make_tree(remote, {"a.txt": "a"})
+    manifest_path = local / "state" / "sync.json"
+    device = Device(FAKE_SERIAL)
+
+    for _ in range(2):
+        report = device.sync(
+            str(local), str(remote), delete=True, manifest_path=str(manifest_path)
+        )
+        assert report.deleted == [] and manifest_path.exists()
+
+    report = device.sync(
+        str(local), str(remote), direction="push", manifest_path=str(manifest_path)
+    )
+    assert report.transferred == [] and not (remote / "state").exists()
+
+
+def test_sync_pull_missing_directory(fake_adb, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        Device(FAKE_SERIAL).sync(str(tmp_path / "local"), str(tmp_path / "missing"))
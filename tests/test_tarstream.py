@@ -0,0 +1,61 @@
+import io
+import tarfile
+
+from adb_wrapper.adb import Device
+from adb_wrapper.tarstream import extract_stream, matches_filters
+from tests.fakes import FAKE_SERIAL
+
+
+def make_tree(root, files):
+    for path, content in files.items():
+        path = root / path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+def test_matches_filters():
+    assert matches_filters("DCIM/a.jpg", include=["*.jpg"])
+    assert not matches_filters("DCIM/a.png", include=["*.jpg"])
+    assert not matches_filters("cache/a.jpg", include=["*.jpg"], exclude=["cache/*"])
+    assert not matches_filters("DCIM/.thumbnails/a.jpg", exclude=[".thumbnails"])
+
+
+def test_extract_stream_skips_unsafe_members(tmp_path):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        for name in ("../evil.txt", "./ok.txt"):
+            info = tarfile.TarInfo(name)
+            info.size = 2
+            tar.addfile(info, io.BytesIO(b"hi"))
+
+    data = buffer.getvalue()
+    chunks = (data[i : i + 100] for i in range(0, len(data), 100))
+
+    assert extract_stream(chunks, str(tmp_path / "out")) == ["ok.txt"]
+    assert not (tmp_path / "evil.txt").exists()
+
+
+def test_pull_and_push_directory(fake_adb, tmp_path):
+    remote = tmp_path / "device" / "DCIM"
+    make_tree(
+        remote,
+        {f"Camera/IMG_{i}.jpg": str(i) for i in range(50)}
+        | {"Camera/.thumbnails/t.jpg": "t", "notes.txt": "n"},
+    )
+    device = Device(FAKE_SERIAL)
+
+    pulled = device.pull_directory(
+        str(remote), str(tmp_path / "local"), include=["*.jpg"], exclude=[".thumbnails"]
+    )
+
+    assert sorted(pulled) == sorted(f"Camera/IMG_{i}.jpg" for i in range(50))
+    assert (tmp_path / "local" / "Camera" / "IMG_7.jpg").read_text() == "7"
+    assert not (tmp_path / "local" / "notes.txt").exists()
+
+    pushed = device.push_directory(
+        str(tmp_path / "local"), str(tmp_path / "device" / "copy"), exclude=["IMG_1*"]
+    )
+
+    assert len(pushed) == 39
+    assert (tmp_path / "device" / "copy" / "Camera" / "IMG_42.jpg").read_text() == "42"
+    assert not (tmp_path / "device" / "copy" / "Camera" / "IMG_1.jpg").exists()
@@ -0,0 +1,103 @@
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from adb_wrapper.adb import CommandResult, Device
+from tests.fakes import FAKE_SERIAL, install_fake_pm
+
+THREADS = 64
+
+
+def test_command_result(fake_adb):
+    device = Device(FAKE_SERIAL)
+    output = device.execute("shell echo hello", logging=False)
+    result = device.result
+
+    assert output == result.text == "hello"
+    assert result.stdout == b"hello\n"
+    assert result.argv == ("adb", "-s", FAKE_SERIAL, "shell", "echo", "hello")
+    assert result.ok and result.exit_code == 0 and result.duration > 0
+
+    with pytest.raises(AttributeError):
+        result.exit_code = 1
+
+
+def test_one_device_from_many_threads(fake_adb, tmp_path):
+    device = Device(FAKE_SERIAL)
+    (tmp_path / "odd").mkdir()
+
+    def run(i: int):
+        results = []
+        for _ in range(2):
+            output = device.execute(f"shell echo {i}", logging=False)
+            results.append((output, device.output, device.result.text))
+
+            # an odd directory exists, an even one doesn't
+            path = tmp_path / ("odd" if i % 2 else f"even-{i}")
+            results.append(device.fetch_is_directory(str(path)))
+            results.append(device.return_code)
+        return results
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        outcomes = list(executor.map(run, range(THREADS)))
+
+    for i, results in enumerate(outcomes):
+        assert results[0] == (str(i), str(i), str(i))
+        assert results[1] == bool(i % 2)
+        assert results[2] == (0 if i % 2 else 1)
+        assert results[::3] == [results[0]] * 2
+
+
+def test_devices_in_one_pool(fake_adb, monkeypatch):
+    serials = [f"serial-{i}" for i in range(8)]
+    monkeypatch.setenv("FAKE_ADB_DEVICES", ",".join(serials))
+    devices = [Device(serial) for serial in serials]
+
+    def run(i: int):
+        device = devices[i % len(devices)]
+        device.execute(f"shell echo {device.id}", logging=False)
+        return device.id, device.output, device.result.argv[2]
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        for serial, output, argv_serial in executor.map(run, range(THREADS)):
+            assert serial == output == argv_serial
+
+
+def test_per_instance_state():
+    first, second = Device("first"), Device("second")
+    first.do_not_delete_packages.append("com.example")
+    first.system_settings["volume"] = "1"
+
+    assert second.do_not_delete_packages == []
+    assert second.system_settings == {}
+
+
+def test_pickle_device(fake_adb):
+    device = Device(FAKE_SERIAL)
+    device.execute("shell echo hello", logging=False)
+    copy = pickle.loads(pickle.dumps(device))
+
+    assert copy.id == FAKE_SERIAL and copy.output is None
+    assert copy.execute("shell echo again", logging=False) == "again"
+    assert isinstance(copy.result, CommandResult)
+
+
+def test_package_index_from_many_threads(fake_adb, tmp_path, monkeypatch):
+    packages = [{"name": f"org.example.app{i}", "path": f"/a{i}.apk"} for i in range(5)]
+    install_fake_pm(str(tmp_path), packages)
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+    log_path = tmp_path / "adb.log"
+    monkeypatch.setenv("FAKE_ADB_LOG", str(log_path))
+    device = Device(FAKE_SERIAL)
+
+    def run(i: int):
+        return len(device.get_package_index()), device.get_shell_property("ro.x")
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        outcomes = list(executor.map(run, range(16)))
+
+    # every thread sees the complete index, which is listed once
+    assert outcomes == [(5, "")] * 16
+    assert sum("pm list packages" in line for line in log_path.open()) == 1
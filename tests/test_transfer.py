@@ -0,0 +1,98 @@
+import os
+
+from adb_wrapper.adb import Device
+from adb_wrapper.transfer import (
+    TransferBatch,
+    TransferEngine,
+    parse_transfer_output,
+    plan_transfers,
+)
+from tests.fakes import FAKE_SERIAL
+
+
+def test_plan_transfers_groups_by_directory():
+    batches = plan_transfers(
+        "push",
+        ["a.jpg", "b.jpg", "c.jpg", "d.jpg"],
+        [None, "/sdcard/Other/b.jpg", "/sdcard/Other/renamed.jpg"],
+        "/sdcard/DCIM",
+        batch_size=1000,
+    )
+
+    assert [(b.sources, b.target) for b in batches] == [
+        (("c.jpg",), "/sdcard/Other/renamed.jpg"),
+        (("a.jpg", "d.jpg"), "/sdcard/DCIM"),
+        (("b.jpg",), "/sdcard/Other/b.jpg"),
+    ]
+    assert batches[1].indices == (0, 3)
+
+
+def test_parse_transfer_output():
+    batch = TransferBatch("pull", (0, 1), ("/a", "/b"), ("out/a", "out/b"), "out")
+    output = "adb: error: failed to stat remote object '/b': No such file or directory"
+
+    a, b = parse_transfer_output(batch, 1, output)
+    assert a.ok and not b.ok
+    assert "No such file" in b.output
+
+    a, b = parse_transfer_output(batch, 1, "adb: device offline")
+    assert not a.ok and not b.ok
+
+
+def test_push_and_pull_files(fake_adb, tmp_path, monkeypatch):
+    log_path = tmp_path / "adb.log"
+    monkeypatch.setenv("FAKE_ADB_LOG", str(log_path))
+
+    local = tmp_path / "local"
+    local.mkdir()
+    files = []
+    for i in range(150):
+        path = local / f"IMG_{i:04}.jpg"
+        path.write_text(str(i))
+        files.append(str(path))
+
+    device_dir = tmp_path / "device" / "DCIM"
+    device = Device(FAKE_SERIAL)
+    results = device.push_files(
+        files + [str(local / "missing.jpg")], destination_directory=str(device_dir)
+    )
+
+    assert [result.source for result in results][:150] == files
+    assert all(result.ok for result in results[:150])
+    assert not results[-1].ok and "cannot stat" in results[-1].output
+    assert (device_dir / "IMG_0149.jpg").read_text() == "149"
+
+    # one mkdir and three multi-source pushes of at most 64 files
+    commands = [line.split()[1] for line in log_path.read_text().splitlines()]
+    assert commands.count("push") == 3
+
+    pulled = tmp_path / "pulled"
+    device_files = [str(device_dir / os.path.basename(f)) for f in files]
+    results = device.pull_files(
+        device_files,
+        pc_files=[None, str(pulled / "renamed.jpg")],
+        destination_directory=str(pulled),
+    )
+
+    assert all(result.ok for result in results)
+    assert (pulled / "renamed.jpg").read_text() == "1"
+    assert (pulled / "IMG_0042.jpg").read_text() == "42"
+
+
+def test_transfer_engine_many_devices(fake_adb, tmp_path, monkeypatch):
+    serials = ["emulator-5554", "emulator-5556", "emulator-5558"]
+    monkeypatch.setenv("FAKE_ADB_DEVICES", ",".join(serials))
+    sources = []
+    for name in ("notes.txt", "todo.txt"):
+        (tmp_path / name).write_text(name)
+        sources.append(str(tmp_path / name))
+
+    results = TransferEngine(max_workers=3, max_per_device=1).push(
+        [Device(serial) for serial in serials],
+        sources,
+        destination_directory=str(tmp_path / "device"),
+    )
+
+    assert list(results) == serials
+    assert all(r.ok for device_results in results.values() for r in device_results)
+    assert (tmp_path / "device" / "todo.txt").read_text() == "todo.txt"
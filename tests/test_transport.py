@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+from adb_wrapper.adb import ADB, Device
+from adb_wrapper.scheduler import CancellationToken, CommandCancelled
+from adb_wrapper.transport import AdbServerTransport
+from tests.fakes import FAKE_SERIAL, FakeAdbServer
+
+
+def test_transport_get_devices():
+    with FakeAdbServer() as server:
+        adb = ADB(transport=AdbServerTransport(port=server.port))
+        devices = adb.get_devices()
+
+        assert [device.id for device in devices] == [FAKE_SERIAL]
+        assert devices[0].transport is adb.transport
+        assert server.requests == ["host:devices-l"]
+
+
+def test_transport_shell_command():
+    with FakeAdbServer() as server:
+        device = Device(FAKE_SERIAL, transport=AdbServerTransport(port=server.port))
+        output = device.execute("shell echo hello", logging=False)
+
+        assert output == "hello"
+        assert device.return_code == 0
+        assert server.requests == [
+            f"host:transport:{FAKE_SERIAL}",
+            "shell,v2,raw:echo hello",
+        ]
+
+
+def test_transport_shell_return_code():
+    with FakeAdbServer() as server:
+        device = Device(FAKE_SERIAL, transport=AdbServerTransport(port=server.port))
+
+        assert not device.is_directory("/definitely/not/a/directory")
+        assert device.return_code == 1
+
+
+def test_transport_legacy_shell():
+    with FakeAdbServer(shell_v2=False) as server:
+        transport = AdbServerTransport(port=server.port)
+        device = Device(FAKE_SERIAL, transport=transport)
+
+        assert device.execute("shell echo legacy; false", logging=False) == "legacy"
+        assert device.return_code == 1
+        assert not transport.shell_v2
+
+
+def test_transport_exec_out():
+    with FakeAdbServer() as server:
+        device = Device(FAKE_SERIAL, transport=AdbServerTransport(port=server.port))
+
+        assert device.execute("exec-out printf binary", logging=False) == "binary"
+
+
+def test_transport_unknown_device():
+    with FakeAdbServer() as server:
+        device = Device("missing", transport=AdbServerTransport(port=server.port))
+
+        with pytest.raises(RuntimeError, match="not found"):
+            device.execute("shell true", logging=False)
+
+
+def test_unsupported_commands_use_binary(fake_adb):
+    # nothing listens on port 1, so the command must go through the adb binary
+    transport = AdbServerTransport(port=1)
+    device = Device(FAKE_SERIAL, transport=transport)
+
+    assert not transport.supports(["adb", "-s", FAKE_SERIAL, "push", "a", "b"])
+    assert FAKE_SERIAL in device.execute("devices", logging=False)
+
+
+def test_transport_timeout_and_cancel():
+    with FakeAdbServer() as server:
+        device = Device(FAKE_SERIAL, transport=AdbServerTransport(port=server.port))
+        start = time.monotonic()
+
+        with pytest.raises(TimeoutError):
+            device.execute("shell sleep 3", logging=False, timeout=0.3)
+        with pytest.raises(TimeoutError):
+            list(device.execute("shell sleep 3", False, stream=True, timeout=0.3))
+
+        token = CancellationToken()
+        threading.Timer(0.3, token.cancel).start()
+        with pytest.raises(CommandCancelled):
+            device.execute("exec-out sleep 3", logging=False, token=token)
+
+        assert time.monotonic() - start < 2.5
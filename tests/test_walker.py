@@ -0,0 +1,90 @@
+import os
+
+from adb_wrapper.adb import Device
+from adb_wrapper.walker import RemoteEntry, TreeIndex, parse_entry
+from tests.fakes import FAKE_SERIAL
+
+
+def test_parse_entry():
+    assert parse_entry("41f9 3452 1700000000 /sdcard/DCIM") == RemoteEntry(
+        "/sdcard/DCIM", "directory", 3452, 1700000000, 0o771
+    )
+    assert parse_entry("81a4 12 1700000001 /sdcard/a b.txt").type == "file"
+    assert parse_entry("stat: permission denied") is None
+
+
+def commands(log_path):
+    return log_path.read_text().splitlines() if log_path.exists() else []
+
+
+def test_walk_and_tree_index(fake_adb, tmp_path, monkeypatch):
+    root = tmp_path / "sdcard"
+    (root / "DCIM" / "Camera").mkdir(parents=True)
+    (root / "DCIM" / "Camera" / "IMG 1.jpg").write_text("12345")
+    (root / "notes.txt").write_text("n")
+    os.symlink(root, tmp_path / "link")
+
+    device = Device(FAKE_SERIAL)
+    entries = {entry.path: entry for entry in device.walk(str(tmp_path / "link"))}
+
+    assert entries[str(tmp_path / "link")].is_directory
+    image = entries[str(tmp_path / "link" / "DCIM" / "Camera" / "IMG 1.jpg")]
+    assert image.is_file and image.size == 5
+
+    index_path = tmp_path / "index.json"
+    device.build_tree_index(str(root), path=str(index_path))
+
+    log_path = tmp_path / "adb.log"
+    monkeypatch.setenv("FAKE_ADB_LOG", str(log_path))
+
+    assert device.is_directory(str(root / "DCIM" / "Camera"))
+    assert device.file_exists(str(root / "DCIM" / "Camera" / "IMG 1.jpg"))
+    assert not device.file_exists(str(root / "missing.txt"))
+    assert device.is_valid_path(str(root / "notes.txt"))
+    assert commands(log_path) == []
+
+    # paths outside the walked root still go to the device
+    assert device.is_directory(str(tmp_path))
+    assert len(commands(log_path)) == 1
+
+    index = TreeIndex.load(str(index_path))
+    assert index.is_file(str(root / "notes.txt"))
+    assert [e.path for e in index.children(str(root / "DCIM"))] == [
+        str(root / "DCIM" / "Camera")
+    ]
+
+    device.create_directories(str(root / "new"))
+    assert device.tree_index is None
+    assert device.is_directory(str(root / "new"))
+
+
+def test_tree_index_follows_symlinks(fake_adb, tmp_path, monkeypatch):
+    root = tmp_path / "sdcard"
+    (root / "DCIM" / "Camera").mkdir(parents=True)
+    (root / "notes.txt").write_text("n")
+    os.symlink(root / "DCIM", root / "linked_dir")
+    os.symlink(root / "notes.txt", root / "linked_file")
+    os.symlink(root / "missing", root / "dangling")
+
+    device = Device(FAKE_SERIAL)
+    paths = [str(root / name) for name in ("linked_dir", "linked_file", "dangling")]
+    expected = [
+        (device.is_directory(p), device.file_exists(p), device.is_valid_path(p))
+        for p in paths
+    ]
+    assert expected[:2] == [(True, False, True), (False, True, True)]
+
+    device.build_tree_index(str(root))
+    log_path = tmp_path / "adb.log"
+    monkeypatch.setenv("FAKE_ADB_LOG", str(log_path))
+
+    # the index answers as the device does
+    assert [
+        (device.is_directory(p), device.file_exists(p), device.is_valid_path(p))
+        for p in paths
+    ] == expected
+    assert commands(log_path) == []
+
+    # the walk doesn't descend into symlinks, so paths below them aren't indexed
+    assert device.is_directory(str(root / "linked_dir" / "Camera"))
+    assert len(commands(log_path)) == 1